@@ -2,6 +2,8 @@ import streamlit as st
 import os
 from components.upload import render_uploader
 from components.chat import render_chat
+from modules.preload import STARTUP_PRELOAD, preload_in_background
+from modules.reaper import REAPER_INTERVAL_SECONDS, start_reaper_in_background
 
 # Page configuration
 st.set_page_config(
@@ -52,3 +54,11 @@ st.markdown(
     "</div>",
     unsafe_allow_html=True
 )
+
+# Load heavy dependencies (embedding model, langchain, LLM client) once the page is up
+if STARTUP_PRELOAD:
+    preload_in_background()
+
+# Delete idle sessions' files and vectors (REAPER_INTERVAL_SECONDS=0 leaves it to scripts/reap_sessions.py)
+if REAPER_INTERVAL_SECONDS > 0:
+    start_reaper_in_background()
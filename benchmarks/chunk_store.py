@@ -0,0 +1,117 @@
+"""Chunk text in the vector metadata against the local chunk store
+
+    python -m benchmarks.chunk_store --resumes 20 --pages 2 --queries 40
+
+Indexes the same resumes twice: once with the text inside each vector's metadata (the
+previous layout, CHUNK_STORE_ENABLED=false) and once with only IDs and small fields in the
+index and the text in the chunk store. It reports the JSON size of the upsert requests and
+of the query responses, which is what travels to and from Pinecone, and the retrieval
+latency including the chunk store reads.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import configure_offline, percentiles, write_results
+from benchmarks.synthetic_resumes import generate_resumes
+
+QUESTIONS = [
+    "What programming languages does the candidate know?",
+    "Summarize the work experience",
+    "Which projects were built with Python?",
+    "Where did the candidate study?",
+    "Describe experience with Kubernetes and cloud platforms",
+]
+
+
+def _measuring_index():
+    from modules.vector_index import LOCAL_INDEX_DIR, LocalVectorIndex, register_vector_index
+
+    class MeasuringIndex(LocalVectorIndex):
+        """Local index that adds up the JSON size of what Pinecone would send and receive"""
+
+        def __init__(self):
+            super().__init__(LOCAL_INDEX_DIR)
+            self.bytes = {}
+
+        def _add(self, namespace, key, payload):
+            counters = self.bytes.setdefault(namespace, {"upsert": 0, "query": 0, "query_metadata": 0, "queries": 0})
+            counters[key] += len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+        def upsert(self, vectors, namespace=None):
+            self._add(namespace, "upsert", {"vectors": vectors, "namespace": namespace})
+            return super().upsert(vectors, namespace)
+
+        def query(self, vector, top_k, namespace=None, filter=None, include_metadata=True, include_values=False):
+            res = super().query(vector, top_k, namespace, filter, include_metadata, include_values)
+            self._add(namespace, "query", res)
+            self._add(namespace, "query_metadata", [match.get("metadata") for match in res["matches"]])
+            self.bytes[namespace]["queries"] += 1
+            return res
+
+    return register_vector_index(MeasuringIndex(), "local")
+
+
+def run(args):
+    from modules.chunk_store import get_chunk_store
+    from modules.embeddings import get_embedding_service
+    from modules.ingest_pipeline import IngestPipeline
+    from modules.manifest import file_sha256, get_session_dir
+    from modules.query_handler import retrieve_context
+    from modules.vectorstore import _build_record
+
+    index = _measuring_index()
+    paths = generate_resumes(get_session_dir("chunk-store-resumes"), args.resumes, args.pages, args.seed)
+    results = {"params": vars(args), "layouts": {}}
+
+    for layout in ("inline", "store"):
+        namespace = f"chunk-store-{layout}"
+        jobs = [{"key": os.path.basename(path), "path": path, "sha256": file_sha256(path)} for path in paths]
+        store = get_chunk_store(namespace) if layout == "store" else None
+        started = time.perf_counter()
+        stats = IngestPipeline(index, namespace, get_embedding_service(), _build_record, chunk_store=store).run(jobs)
+        ingest_seconds = time.perf_counter() - started
+
+        latencies = []
+        for i in range(args.queries):
+            question = QUESTIONS[i % len(QUESTIONS)]
+            started = time.perf_counter()
+            retrieve_context(question, namespace)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        sizes = index.bytes[namespace]
+        vectors = stats["vectors_upserted"]
+        row = {
+            "vectors": vectors,
+            "ingest_seconds": round(ingest_seconds, 3),
+            "upsert_bytes_per_vector": round(sizes["upsert"] / vectors, 1),
+            "query_response_bytes": round(sizes["query"] / sizes["queries"]),
+            "query_metadata_bytes": round(sizes["query_metadata"] / sizes["queries"]),
+            "retrieval": percentiles(latencies),
+        }
+        if store is not None:
+            row["chunk_store"] = store.stats()
+        results["layouts"][layout] = row
+        print(f"{layout:>6}: {row['upsert_bytes_per_vector']:.0f} upsert bytes/vector, "
+              f"{row['query_response_bytes']} bytes per query response "
+              f"({row['query_metadata_bytes']} of them metadata), retrieval p50 {row['retrieval']['p50_ms']} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk store benchmark")
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/chunk_store.json)")
+    args = parser.parse_args()
+
+    configure_offline(tempfile.mkdtemp(prefix="chunk-store-"), PARSE_CACHE_PATH="")
+    write_results("chunk_store", run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Resume-aware chunking against the recursive character splitter
+
+    python -m benchmarks.chunking --resumes 10 --pages 2
+
+Indexes the same synthetic resumes once per chunking strategy, then asks questions whose
+answers are known from the generator (where a candidate studied, what they did at a given
+company, ...). For each strategy it reports the vector count, the retrieval hit rate
+(the answer text reaches the LLM context from the right resume) and the context tokens
+sent to the LLM. "resume+filter" also restricts retrieval to the sections a question is about.
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from benchmarks.common import configure_offline, percentiles, write_results
+from benchmarks.synthetic_resumes import generate_resumes, resume_lines
+
+_ROLE_RE = re.compile(r"^(?P<title>[^,]+), (?P<company>[^,]+), Jan (?P<start>\d{4}) - Dec (?P<end>\d{4})$")
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def resume_questions(path, number, pages, seed):
+    """(question, expected answer text) pairs for one generated resume"""
+    lines = resume_lines(number, pages, seed)
+    name = lines[0]
+    education = lines[lines.index("Education") + 1]
+    skills = lines[lines.index("Skills") + 1].split(", ")
+    roles = []
+    for i, line in enumerate(lines):
+        match = _ROLE_RE.match(line)
+        if match and i + 1 < len(lines):
+            roles.append((match, lines[i + 1]))
+    companies = [match["company"] for match, _ in roles]
+    unique_roles = [(match, bullet) for match, bullet in roles if companies.count(match["company"]) == 1]
+
+    rng = random.Random(number)
+    questions = [
+        (f"Where did {name} study?", education.split(", ")[1]),
+        (f"What degree does {name} hold?", education.split(", ")[0]),
+        (f"Which skills does {name} list?", rng.choice(skills)),
+    ]
+    for match, bullet in rng.sample(unique_roles, min(2, len(unique_roles))):
+        questions.append((f"What did {name} do at {match['company']}?", bullet[2:42]))
+        questions.append((f"When did {name} work at {match['company']}?", f"Jan {match['start']}"))
+    return [(question, expected, path) for question, expected in questions]
+
+
+def _index(paths, namespace, strategy):
+    from modules.chunk_store import get_chunk_store
+    from modules.embeddings import get_embedding_service
+    from modules.ingest_pipeline import IngestPipeline
+    from modules.manifest import file_sha256
+    from modules.vector_index import get_vector_index
+    from modules.vectorstore import _build_record
+
+    jobs = [{"key": os.path.basename(path), "path": path, "sha256": file_sha256(path)} for path in paths]
+    pipeline = IngestPipeline(get_vector_index(), namespace, get_embedding_service(), _build_record,
+                              chunk_store=get_chunk_store(namespace), chunk_strategy=strategy)
+    return pipeline.run(jobs)
+
+
+def _evaluate(questions, namespace, section_filter):
+    from modules.context_packing import estimate_tokens
+    from modules.query_handler import question_sections, retrieve_context
+
+    hits = 0
+    tokens = []
+    latencies = []
+    for question, expected, path in questions:
+        started = time.perf_counter()
+        sections = (question_sections(question) or None) if section_filter else None
+        docs, _, _ = retrieve_context(question, namespace, sections=sections)
+        latencies.append((time.perf_counter() - started) * 1000)
+        # Sources resolve to the namespace's upload folder; the PDFs themselves live elsewhere here
+        context = " ".join(doc.page_content for doc in docs
+                           if os.path.basename(doc.metadata.get("source", "")) == os.path.basename(path))
+        hits += _normalize(expected) in _normalize(context)
+        tokens.append(sum(estimate_tokens(doc.page_content) for doc in docs))
+    return {
+        "hit_rate": round(hits / len(questions), 3),
+        "context_tokens_mean": round(sum(tokens) / len(tokens), 1),
+        "retrieval": percentiles(latencies),
+    }
+
+
+def run(args):
+    from modules.manifest import get_session_dir
+
+    paths = generate_resumes(get_session_dir("chunking"), args.resumes, args.pages, args.seed)
+    questions = [q for number, path in enumerate(paths) for q in resume_questions(path, number, args.pages, args.seed)]
+    results = {"params": vars(args), "questions": len(questions), "strategies": {}}
+
+    variants = [("recursive", "recursive", False), ("resume", "resume", False), ("resume+filter", "resume", True)]
+    indexed = {}
+    for name, strategy, section_filter in variants:
+        namespace = f"chunking-{strategy}"
+        if strategy not in indexed:
+            stats = _index(paths, namespace, strategy)
+            indexed[strategy] = {"vectors": stats["vectors_upserted"],
+                                 "vectors_per_resume": round(stats["vectors_upserted"] / len(paths), 1)}
+        row = dict(indexed[strategy], **_evaluate(questions, namespace, section_filter))
+        results["strategies"][name] = row
+        print(f"{name:>14}: {row['vectors']:>5} vectors, hit rate {row['hit_rate']:.1%}, "
+              f"~{row['context_tokens_mean']:.0f} context tokens per question")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunking strategy benchmark")
+    parser.add_argument("--resumes", type=int, default=10, help="resumes in the session")
+    parser.add_argument("--pages", type=int, default=2, help="pages per resume")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/chunking.json)")
+    args = parser.parse_args()
+
+    configure_offline(tempfile.mkdtemp(prefix="chunking-"), PARSE_CACHE_PATH="")
+    write_results("chunking", run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
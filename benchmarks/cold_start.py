@@ -0,0 +1,129 @@
+"""Cold start of a new app process: import-time breakdown and time to first render
+
+    python -m benchmarks.cold_start --runs 5 --budget-seconds 3
+
+Each run starts a fresh interpreter that imports streamlit and executes app.py once with
+streamlit's AppTest, the same work a new replica does before its first page is served.
+The import report comes from `python -X importtime` over the modules app.py imports.
+The process exits non-zero when the median time to first render exceeds --budget-seconds,
+or when a heavy dependency (torch, langchain, pinecone, ...) is imported before first use.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import configure_offline, percentiles, write_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that must load on first use, never at startup
+HEAVY_PACKAGES = (
+    "torch", "transformers", "sentence_transformers", "onnxruntime", "langchain", "langchain_core",
+    "langchain_community", "langchain_huggingface", "langchain_groq", "pinecone", "groq", "pypdf",
+)
+
+_RENDER_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout=120)
+app.run()
+rendered = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_ms": (imported - started) * 1000,
+    "script_run_ms": (rendered - imported) * 1000,
+    "exceptions": [str(e.value) for e in app.exception],
+}))
+"""
+
+
+def _render_once():
+    started = time.perf_counter()
+    # Preloading starts after the first render and would only add noise here
+    env = dict(os.environ, STARTUP_PRELOAD="false", EMBEDDING_WARMUP="false")
+    completed = subprocess.run(
+        [sys.executable, "-c", _RENDER_SCRIPT], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    run = json.loads(completed.stdout.strip().splitlines()[-1])
+    run["first_render_ms"] = (time.perf_counter() - started) * 1000
+    return run
+
+
+def import_report(modules=("components.upload", "components.chat", "modules.preload"), top=15):
+    """Cumulative import time per module from `python -X importtime`"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        if not self_us.isdigit():
+            continue
+        rows.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+
+    packages = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        packages[package] = round(packages.get(package, 0) + row["self_ms"], 2)
+    return {
+        "total_ms": round(sum(row["self_ms"] for row in rows), 2),
+        "slowest_modules": sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top],
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]),
+        "heavy_imported": sorted({row["module"].split(".")[0] for row in rows} & set(HEAVY_PACKAGES)),
+    }
+
+
+def run(args):
+    imports = import_report()
+    print(f"Imports: {imports['total_ms']:.0f} ms")
+    for package, ms in list(imports["packages"].items())[:8]:
+        print(f"  {package:<24} {ms:8.1f} ms")
+    if imports["heavy_imported"]:
+        print(f"Heavy packages imported at startup: {', '.join(imports['heavy_imported'])}")
+
+    runs = [_render_once() for _ in range(args.runs)]
+    first_render = percentiles([r["first_render_ms"] for r in runs])
+    print(f"Time to first render: p50 {first_render['p50_ms']} ms, max {first_render['max_ms']} ms "
+          f"(budget {args.budget_seconds * 1000:.0f} ms)")
+    results = {
+        "params": vars(args),
+        "imports": imports,
+        "first_render": first_render,
+        "streamlit_import": percentiles([r["streamlit_import_ms"] for r in runs]),
+        "script_run": percentiles([r["script_run_ms"] for r in runs]),
+        "exceptions": sorted({e for r in runs for e in r["exceptions"]}),
+    }
+    results["passed"] = (
+        first_render["p50_ms"] <= args.budget_seconds * 1000
+        and not imports["heavy_imported"]
+        and not results["exceptions"]
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-seconds", type=float, default=3.0, help="allowed median time to first render")
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/cold_start.json)")
+    args = parser.parse_args()
+
+    configure_offline(tempfile.mkdtemp(prefix="cold-start-"))
+    results = run(args)
+    write_results("cold_start", results, args.output)
+    if not results["passed"]:
+        print("❌ Cold start is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
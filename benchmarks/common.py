@@ -0,0 +1,96 @@
+"""Helpers shared by the offline benchmarks"""
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+
+def configure_offline(workdir, **overrides):
+    """Point the app at local, network-free backends under `workdir`
+
+    Must run before any `modules.*` import, since they read their settings at import time.
+    Variables already set in the environment win, so any default can be overridden.
+    """
+    defaults = {
+        "UPLOAD_ROOT": os.path.join(workdir, "uploaded_docs"),
+        "VECTOR_BACKEND": "local",
+        "LOCAL_INDEX_DIR": os.path.join(workdir, "vector_index"),
+        "EMBEDDING_BACKEND": "fake",
+        "EMBEDDING_CACHE_PATH": "",
+        "PARSE_CACHE_PATH": os.path.join(workdir, "parsed.sqlite"),
+        "LLM_BACKEND": "fake",
+    }
+    defaults.update({key: str(value) for key, value in overrides.items()})
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def percentiles(values_ms):
+    """p50/p95/p99 (nearest rank), mean and max of latencies in milliseconds"""
+    if not values_ms:
+        return {"count": 0}
+    ordered = sorted(values_ms)
+
+    def rank(p):
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p * len(ordered))) - 1))], 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "mean_ms": round(sum(ordered) / len(ordered), 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def _max_rss_mb(who):
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its largest finished child (parse workers)"""
+    return {
+        "self": _max_rss_mb(resource.RUSAGE_SELF),
+        "children": _max_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(name, results, output=None):
+    """Write results plus environment details as JSON, for comparing runs across commits"""
+    report = {
+        "benchmark": name,
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "env": {key: value for key, value in os.environ.items() if key.isupper() and (
+            key.startswith(("EMBEDDING_", "INGEST_", "UPSERT_", "VECTOR_", "LLM_", "FAKE_", "CONTEXT_",
+                            "ANSWER_CACHE_", "FAN_OUT_", "PROFILE_ROUTER_", "PARSE_CACHE_", "CHUNK_",
+                            "RESUME_CHUNK_", "RETRIEVAL_", "HYBRID_", "BM25_"))
+        )},
+        "results": results,
+    }
+    output = output or os.path.join("benchmarks", "results", f"{name}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Wrote {output}")
+    return report
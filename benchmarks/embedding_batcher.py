@@ -0,0 +1,89 @@
+"""Query-embedding throughput with and without cross-session micro-batching
+
+    python -m benchmarks.embedding_batcher --callers 1 8 32 --seconds 5
+
+Each caller thread embeds distinct questions back to back, like concurrent chat users.
+By default the fake encoder models a CPU model's cost as a fixed per-call overhead plus
+a per-text cost; set EMBEDDING_BACKEND=huggingface to measure the real model instead.
+"""
+import argparse
+import tempfile
+import threading
+import time
+
+from benchmarks.common import configure_offline, peak_rss_mb, percentiles, write_results
+
+
+def _run_callers(service, callers, seconds):
+    latencies = [[] for _ in range(callers)]
+    stop = time.perf_counter() + seconds
+
+    def caller(slot):
+        n = 0
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            service.embed_query(f"caller {slot} question {n}: who has worked with Kubernetes and Python?")
+            latencies[slot].append((time.perf_counter() - started) * 1000)
+            n += 1
+
+    threads = [threading.Thread(target=caller, args=(slot,)) for slot in range(callers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    flat = [latency for per_caller in latencies for latency in per_caller]
+    return {
+        "queries": len(flat),
+        "queries_per_second": round(len(flat) / elapsed, 1),
+        "latency": percentiles(flat),
+    }
+
+
+def run(args):
+    from modules.embeddings import EmbeddingService, _model_name
+
+    # No cache, so every question reaches the encoder
+    direct = EmbeddingService(model_name=_model_name())
+    batched = EmbeddingService(model_name=_model_name(), query_batching=True)
+    direct.warm_up()
+    batched._model = direct._model
+
+    results = {"params": vars(args), "callers": {}}
+    for callers in args.callers:
+        row = {
+            "direct": _run_callers(direct, callers, args.seconds),
+            "batched": _run_callers(batched, callers, args.seconds),
+        }
+        row["speedup"] = round(
+            row["batched"]["queries_per_second"] / max(row["direct"]["queries_per_second"], 1e-9), 2
+        )
+        results["callers"][str(callers)] = row
+        print(f"{callers:>3} callers: direct {row['direct']['queries_per_second']:>8} q/s "
+              f"(p50 {row['direct']['latency']['p50_ms']} ms), batched {row['batched']['queries_per_second']:>8} q/s "
+              f"(p50 {row['batched']['latency']['p50_ms']} ms), x{row['speedup']}")
+    results["batcher"] = batched.batcher.stats()
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query embedding micro-batching benchmark")
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=5, help="duration of each run")
+    parser.add_argument("--call-ms", type=float, default=8, help="fake encoder cost per call")
+    parser.add_argument("--text-ms", type=float, default=0.5, help="fake encoder cost per text")
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/embedding_batcher.json)")
+    args = parser.parse_args()
+
+    configure_offline(
+        tempfile.gettempdir(),
+        FAKE_EMBEDDING_MS_PER_CALL=args.call_ms,
+        FAKE_EMBEDDING_MS_PER_TEXT=args.text_ms,
+    )
+    write_results("embedding_batcher", run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Offline end-to-end benchmark of the ingest and query paths
+
+    python -m benchmarks.end_to_end --resumes 30 --pages 2 --queries 50
+
+Runs headless against the local vector index, the fake embedding model and the
+fake LLM, so it needs no network, GPU or API keys. Set EMBEDDING_BACKEND=huggingface
+to include the real encoder (the model must already be downloaded).
+"""
+import argparse
+import itertools
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import configure_offline, peak_rss_mb, percentiles, write_results
+from benchmarks.synthetic_resumes import generate_resumes
+
+QUESTIONS = [
+    "What programming languages does {name} know?",
+    "Summarize {name}'s work experience",
+    "Which projects did {name} build with Python?",
+    "What did {name} study and where?",
+    "Describe {name}'s experience with Kubernetes and cloud platforms",
+    "What is {name}'s most recent job title?",
+    "Explain how {name} reduced latency or costs in past roles",
+    "Who has worked on a data platform?",
+]
+FAN_OUT_QUESTIONS = [
+    "Compare all candidates' Python experience",
+    "Rank every candidate by cloud experience",
+]
+
+
+def _candidate_names(session_id):
+    from modules.manifest import SessionManifest
+
+    names = [profile.get("name") for profile in SessionManifest(session_id).profiles().values()]
+    return [name for name in names if name] or ["the candidate"]
+
+
+def _ingest(paths, session_id):
+    from modules.vectorstore import upload_pdfs_to_vectorstore
+
+    started = time.perf_counter()
+    result = upload_pdfs_to_vectorstore(paths, session_id)
+    wall = time.perf_counter() - started
+    stats = result["stats"]
+    return {
+        "files": result["files_count"],
+        "pages": stats["pages"],
+        "chunks": stats["chunks_parsed"],
+        "vectors": stats["vectors_upserted"],
+        "wall_seconds": round(wall, 3),
+        "pages_per_second": round(stats["pages"] / wall, 1),
+        "chunks_per_second": round(stats["chunks_parsed"] / wall, 1),
+        "vectors_per_second": round(stats["vectors_upserted"] / wall, 1),
+        "stage_seconds": stats["stage_seconds"],
+        "upsert_batches": stats["upsert_batches"],
+        "upsert_batch_ms_max": stats["upsert_batch_ms_max"],
+        "files_parse_cached": stats["files_parse_cached"],
+    }
+
+
+def _time_questions(questions, session_id, fan_out):
+    from modules.query_handler import ask_question, stream_question
+
+    latencies, first_token, routed, cached = [], [], 0, 0
+    for question in questions:
+        started = time.perf_counter()
+        result = ask_question(question, session_id, fan_out=fan_out)
+        latencies.append((time.perf_counter() - started) * 1000)
+        routed += bool(result.get("routed"))
+        cached += bool(result.get("cached"))
+
+        started = time.perf_counter()
+        tokens = iter(stream_question(question, session_id, fan_out=fan_out))
+        next(tokens, None)
+        first_token.append((time.perf_counter() - started) * 1000)
+        for _ in tokens:
+            pass
+    return {
+        "latency": percentiles(latencies),
+        "time_to_first_token": percentiles(first_token),
+        "routed": routed,
+        "cached": cached,
+    }
+
+
+def _share_uploads(paths, session_id):
+    from modules.blob_store import get_blob_store
+    from modules.manifest import get_session_dir
+
+    session_dir = get_session_dir(session_id)
+    os.makedirs(session_dir, exist_ok=True)
+    shared = []
+    for path in paths:
+        dest = os.path.join(session_dir, os.path.basename(path))
+        with open(path, "rb") as f:
+            get_blob_store().save(f, dest)
+        shared.append(dest)
+    return shared
+
+
+def run(args):
+    from modules.embeddings import get_embedding_service
+    from modules.manifest import get_session_dir
+    from modules.vector_index import get_vector_index
+
+    session_id = "benchmark"
+    session_dir = get_session_dir(session_id)
+    print(f"📄 Generating {args.resumes} resumes of {args.pages} page(s)")
+    paths = generate_resumes(session_dir, args.resumes, args.pages, args.seed)
+
+    results = {"params": vars(args)}
+    results["ingest"] = _ingest(paths, session_id)
+
+    started = time.perf_counter()
+    _ingest(paths, session_id)
+    results["reupload_unchanged_seconds"] = round(time.perf_counter() - started, 3)
+
+    # Another session uploading the same resumes reuses the stored bytes and parsed pages
+    results["ingest_shared"] = _ingest(_share_uploads(paths, "benchmark-shared"), "benchmark-shared")
+
+    names = _candidate_names(session_id)
+    # Untimed first question loads the prompt template and LLM client
+    _time_questions(["What is this resume about?"], session_id, fan_out=False)
+    templates = itertools.cycle(QUESTIONS)
+    questions = [next(templates).format(name=names[i % len(names)]) for i in range(args.queries)]
+    results["query"] = _time_questions(questions, session_id, fan_out=False)
+
+    if args.fan_out_queries:
+        fan_out = [FAN_OUT_QUESTIONS[i % len(FAN_OUT_QUESTIONS)] for i in range(args.fan_out_queries)]
+        results["fan_out_query"] = _time_questions(fan_out, session_id, fan_out=True)
+
+    results["embedding"] = get_embedding_service().stats()
+    results["upsert"] = get_vector_index().upsert_stats()
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingest + query benchmark")
+    parser.add_argument("--resumes", type=int, default=20, help="number of synthetic resumes")
+    parser.add_argument("--pages", type=int, default=2, help="pages per resume")
+    parser.add_argument("--queries", type=int, default=40, help="single-retrieval questions to time")
+    parser.add_argument("--fan-out-queries", type=int, default=4, help="per-candidate questions to time")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="fake LLM time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=10, help="fake LLM delay per token")
+    parser.add_argument("--embedding-ms", type=float, default=0, help="fake encoder cost per text")
+    parser.add_argument("--answer-cache", action="store_true", help="keep the answer cache on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="keep generated files here instead of a temporary directory")
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/end_to_end.json)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="resume-bench-")
+    configure_offline(
+        workdir,
+        FAKE_LLM_LATENCY_MS=args.llm_latency_ms,
+        FAKE_LLM_TOKEN_MS=args.llm_token_ms,
+        FAKE_EMBEDDING_MS_PER_TEXT=args.embedding_ms,
+        ANSWER_CACHE_ENABLED="true" if args.answer_cache else "false",
+    )
+    try:
+        results = run(args)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = write_results("end_to_end", results, args.output)
+    ingest = report["results"]["ingest"]
+    query = report["results"]["query"]["latency"]
+    print(f"Ingest: {ingest['pages_per_second']} pages/s, {ingest['chunks_per_second']} chunks/s, "
+          f"{ingest['vectors_per_second']} vectors/s")
+    print(f"Query: p50 {query.get('p50_ms')} ms, p95 {query.get('p95_ms')} ms, p99 {query.get('p99_ms')} ms")
+    print(f"Peak RSS: {report['results']['peak_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Hybrid BM25 + vector retrieval against vector-only retrieval
+
+    python -m benchmarks.hybrid_retrieval --resumes 20 --pages 2
+
+Indexes synthetic resumes once (with the BM25 index alongside the vectors, as uploads do),
+then asks the chunking benchmark's questions plus exact-skill questions ("What did <name>
+build with C++ and CI/CD?") whose answer is the one experience bullet naming both skills.
+Each variant reports the retrieval hit rate (the answer text reaches the LLM context from
+the right resume), the context tokens sent to the LLM and the retrieval latency. The fake
+embeddings are a hashed bag of words and so already partly lexical; real embeddings blur
+exact terms more, so the gap here understates what BM25 adds.
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from benchmarks.chunking import resume_questions
+from benchmarks.common import configure_offline, percentiles, write_results
+from benchmarks.synthetic_resumes import generate_resumes, resume_lines
+
+_BULLET_RE = re.compile(r"^- (?P<verb>\w+) .+? using (?P<first>[^,]+), (?P<second>[^,]+), ")
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def skill_questions(path, number, pages, seed, limit=3):
+    """(question, expected answer text, path) for bullets naming a pair of skills only once in the resume"""
+    lines = resume_lines(number, pages, seed)
+    name = lines[0]
+    bullets = [(line, _BULLET_RE.match(line)) for line in lines]
+    bullets = [(line, match) for line, match in bullets if match]
+    pairs = [(match["first"], match["second"]) for _, match in bullets]
+    unique = [(line, match) for line, match in bullets if pairs.count((match["first"], match["second"])) == 1]
+    rng = random.Random(number)
+    return [
+        (f"What did {name} build with {match['first']} and {match['second']}?", line[2:42], path)
+        for line, match in rng.sample(unique, min(limit, len(unique)))
+    ]
+
+
+def _index(paths, namespace):
+    from modules.bm25_index import get_bm25_index
+    from modules.chunk_store import get_chunk_store
+    from modules.embeddings import get_embedding_service
+    from modules.ingest_pipeline import IngestPipeline
+    from modules.manifest import file_sha256
+    from modules.vector_index import get_vector_index
+    from modules.vectorstore import _build_record
+
+    jobs = [{"key": os.path.basename(path), "path": path, "sha256": file_sha256(path)} for path in paths]
+    sparse_index = get_bm25_index(namespace)
+    started = time.perf_counter()
+    stats = IngestPipeline(get_vector_index(), namespace, get_embedding_service(), _build_record,
+                           chunk_store=get_chunk_store(namespace), sparse_index=sparse_index).run(jobs)
+    return stats, time.perf_counter() - started, sparse_index.stats()
+
+
+def _evaluate(questions, namespace, mode, top_k, fused_k, scoped):
+    from modules import query_handler
+    from modules.context_packing import estimate_tokens
+
+    # Settings are read at import time; switch them per variant
+    query_handler.RETRIEVAL_MODE = mode
+    query_handler.RETRIEVAL_TOP_K = top_k
+    query_handler.HYBRID_TOP_K = fused_k
+
+    hits = {}
+    tokens = []
+    latencies = []
+    for kind, question, expected, path in questions:
+        started = time.perf_counter()
+        docs, _, _ = query_handler.retrieve_context(question, namespace, sources=[path] if scoped else None)
+        latencies.append((time.perf_counter() - started) * 1000)
+        context = " ".join(doc.page_content for doc in docs
+                           if os.path.basename(doc.metadata.get("source", "")) == os.path.basename(path))
+        hits.setdefault(kind, []).append(_normalize(expected) in _normalize(context))
+        tokens.append(sum(estimate_tokens(doc.page_content) for doc in docs))
+    row = {f"hit_rate_{kind}": round(sum(found) / len(found), 3) for kind, found in hits.items()}
+    row["hit_rate"] = round(sum(sum(found) for found in hits.values()) / len(questions), 3)
+    row["context_tokens_mean"] = round(sum(tokens) / len(tokens), 1)
+    row["retrieval"] = percentiles(latencies)
+    return row
+
+
+def run(args):
+    from modules.manifest import get_session_dir
+
+    namespace = "hybrid"
+    paths = generate_resumes(get_session_dir(namespace), args.resumes, args.pages, args.seed)
+    questions = []
+    for number, path in enumerate(paths):
+        questions += [("general", *q) for q in resume_questions(path, number, args.pages, args.seed)]
+        questions += [("skill", *q) for q in skill_questions(path, number, args.pages, args.seed)]
+    stats, ingest_seconds, sparse_stats = _index(paths, namespace)
+    results = {
+        "params": vars(args), "questions": len(questions), "vectors": stats["vectors_upserted"],
+        "ingest_seconds": round(ingest_seconds, 3), "bm25": sparse_stats, "variants": {},
+    }
+    print(f"Indexed {stats['vectors_upserted']} chunks in {ingest_seconds:.2f}s; BM25: {sparse_stats}")
+
+    variants = [("dense@20", "dense", 20, None), ("dense@10", "dense", 10, None)]
+    variants += [(f"hybrid@{k}", "hybrid", 20, k) for k in args.fused_k]
+    for scope in ("session", "candidate"):
+        print("Questions over the whole session:" if scope == "session" else
+              "Questions scoped to the candidate's resume (screening, fan-out):")
+        for name, mode, top_k, fused_k in variants:
+            row = _evaluate(questions, namespace, mode, top_k if fused_k is None else args.dense_k, fused_k or 0,
+                            scope == "candidate")
+            results["variants"].setdefault(scope, {})[name] = row
+            print(f"{name:>10}: hit rate {row['hit_rate']:.1%} (skills {row['hit_rate_skill']:.1%}, "
+                  f"general {row['hit_rate_general']:.1%}), ~{row['context_tokens_mean']:.0f} context tokens, "
+                  f"retrieval p50 {row['retrieval']['p50_ms']} ms / p95 {row['retrieval']['p95_ms']} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid retrieval benchmark")
+    parser.add_argument("--resumes", type=int, default=20, help="resumes in the session")
+    parser.add_argument("--pages", type=int, default=2, help="pages per resume")
+    parser.add_argument("--dense-k", type=int, default=20, help="vector matches fused in hybrid variants")
+    parser.add_argument("--fused-k", type=int, nargs="+", default=[8, 12, 16], help="fused top-k values to try")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/hybrid_retrieval.json)")
+    args = parser.parse_args()
+
+    configure_offline(tempfile.mkdtemp(prefix="hybrid-"), PARSE_CACHE_PATH="")
+    write_results("hybrid_retrieval", run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Parity and throughput of the ONNX Runtime embedding backend against the torch model
+
+    python -m benchmarks.onnx_embeddings --chunks 2000
+
+Embeds synthetic resume chunks with sentence-transformers (torch), ONNX fp32 and ONNX int8.
+It reports chunks/s for each backend and the cosine similarity of every ONNX vector to
+its torch counterpart. The process exits non-zero when the worst cosine falls below
+--min-cosine (int8) or --min-cosine-fp32, so it can gate CI. Needs the model already
+downloaded plus requirements.txt and requirements-onnx.txt.
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.common import peak_rss_mb, percentiles, write_results
+from benchmarks.synthetic_resumes import resume_lines
+
+
+def _chunks(count, size=500, overlap=50):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap)
+    chunks, number = [], 0
+    while len(chunks) < count:
+        chunks.extend(splitter.split_text("\n".join(resume_lines(number, pages=2))))
+        number += 1
+    return chunks[:count]
+
+
+def _measure(name, load, texts, batch_size):
+    started = time.perf_counter()
+    model = load()
+    model.embed_documents(texts[:8])
+    load_seconds = time.perf_counter() - started
+
+    vectors, batch_ms = [], []
+    started = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        batch_started = time.perf_counter()
+        vectors.extend(model.embed_documents(texts[i:i + batch_size]))
+        batch_ms.append((time.perf_counter() - batch_started) * 1000)
+    elapsed = time.perf_counter() - started
+    print(f"{name:>10}: {len(texts) / elapsed:8.1f} chunks/s (load {load_seconds:.1f}s)")
+    return vectors, {
+        "load_seconds": round(load_seconds, 2),
+        "chunks_per_second": round(len(texts) / elapsed, 1),
+        "batch": percentiles(batch_ms),
+    }
+
+
+def _parity(reference, vectors):
+    import numpy as np
+
+    a = np.asarray(reference, dtype=np.float32)
+    b = np.asarray(vectors, dtype=np.float32)
+    cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    norms = np.linalg.norm(b, axis=1)
+    return {
+        "cosine_min": round(float(cosine.min()), 6),
+        "cosine_mean": round(float(cosine.mean()), 6),
+        "cosine_p1": round(float(np.percentile(cosine, 1)), 6),
+        "norm_max_deviation": round(float(np.abs(norms - 1).max()), 6),
+    }
+
+
+def run(args):
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from modules.onnx_embeddings import OnnxEmbeddings
+
+    texts = _chunks(args.chunks)
+    results = {"params": vars(args), "backends": {}, "parity": {}}
+
+    def torch_model():
+        return HuggingFaceEmbeddings(
+            model_name=args.model,
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={'normalize_embeddings': True}
+        )
+
+    reference, results["backends"]["torch"] = _measure("torch", torch_model, texts, args.batch_size)
+    for quantize in ("none", "int8"):
+        name = f"onnx-{quantize}"
+        vectors, results["backends"][name] = _measure(
+            name, lambda: OnnxEmbeddings(args.model, quantize=quantize), texts, args.batch_size
+        )
+        results["parity"][name] = _parity(reference, vectors)
+        print(f"{name:>10}: cosine to torch min {results['parity'][name]['cosine_min']:.5f}, "
+              f"mean {results['parity'][name]['cosine_mean']:.5f}")
+
+    results["passed"] = (
+        results["parity"]["onnx-none"]["cosine_min"] >= args.min_cosine_fp32
+        and results["parity"]["onnx-int8"]["cosine_min"] >= args.min_cosine
+    )
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX embedding parity and throughput")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="worst allowed int8 cosine to torch")
+    parser.add_argument("--min-cosine-fp32", type=float, default=0.9999, help="worst allowed fp32 cosine to torch")
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/onnx_embeddings.json)")
+    args = parser.parse_args()
+
+    results = run(args)
+    write_results("onnx_embeddings", results, args.output)
+    if not results["passed"]:
+        print("❌ ONNX embeddings deviate from the torch model more than allowed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
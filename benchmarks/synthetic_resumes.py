@@ -0,0 +1,142 @@
+"""Generate synthetic resume PDFs for benchmarks
+
+    python -m benchmarks.synthetic_resumes --count 50 --pages 2 --output /tmp/resumes
+"""
+import argparse
+import os
+import random
+import textwrap
+
+FIRST_NAMES = ["Aarav", "Priya", "John", "Maria", "Wei", "Fatima", "Lucas", "Aisha", "Kenji", "Sofia",
+               "Omar", "Elena", "Rahul", "Grace", "Diego", "Hana", "Noah", "Zara", "Ivan", "Leila"]
+LAST_NAMES = ["Sharma", "Smith", "Garcia", "Chen", "Khan", "Silva", "Tanaka", "Rossi", "Okafor", "Novak",
+              "Kapoor", "Muller", "Haddad", "Kim", "Lopez", "Ivanova", "Brown", "Patel", "Nguyen", "Costa"]
+SKILLS = ["Python", "Java", "Go", "Rust", "C++", "TypeScript", "React", "Django", "FastAPI", "Kubernetes",
+          "Docker", "AWS", "GCP", "Terraform", "PostgreSQL", "MongoDB", "Redis", "Kafka", "Spark", "Airflow",
+          "PyTorch", "TensorFlow", "scikit-learn", "LangChain", "SQL", "Linux", "Git", "CI/CD", "GraphQL", "Figma"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Data Scientist", "ML Engineer", "Backend Developer",
+          "Frontend Developer", "DevOps Engineer", "Data Engineer", "Product Analyst", "Research Intern"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech", "Hooli",
+             "Pied Piper", "Vandelay Imports", "Soylent Systems", "Cyberdyne", "Tyrell Analytics"]
+DEGREES = ["B.Tech in Computer Science", "B.Sc in Mathematics", "M.Sc in Data Science", "MBA",
+           "M.Tech in Artificial Intelligence", "B.E. in Electronics"]
+UNIVERSITIES = ["IIT Delhi", "Stanford University", "University of Toronto", "TU Munich", "NUS",
+                "University of Lagos", "Tsinghua University", "University of Sao Paulo"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Shipped", "Scaled", "Maintained"]
+OBJECTS = ["a payments API", "the data platform", "an internal search service", "the recommendation model",
+           "CI pipelines", "a real-time analytics dashboard", "the customer onboarding flow",
+           "a document ingestion pipeline", "the monitoring stack"]
+RESULTS = ["cutting latency by {n}%", "serving {n}k requests per minute", "saving {n} hours a week",
+           "raising conversion by {n}%", "reducing cloud spend by {n}%", "for {n} enterprise customers"]
+
+LINES_PER_PAGE = 60
+LINE_WIDTH = 95
+
+
+def _bullet(rng):
+    result = rng.choice(RESULTS).format(n=rng.randint(5, 90))
+    skills = ", ".join(rng.sample(SKILLS, 2))
+    return f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {skills}, {result}."
+
+
+def resume_lines(number, pages=1, seed=0):
+    """Text lines of one synthetic resume, roughly `pages` pages long"""
+    rng = random.Random(seed * 100003 + number)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}{number}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        f"linkedin.com/in/{first.lower()}-{last.lower()}-{number}",
+        "",
+        "Summary",
+        *textwrap.wrap(
+            f"{rng.choice(TITLES)} with a focus on {rng.choice(OBJECTS)} and {rng.choice(OBJECTS)}. "
+            f"Comfortable across {', '.join(rng.sample(SKILLS, 4))}.",
+            LINE_WIDTH
+        ),
+        "",
+        "Skills",
+        ", ".join(rng.sample(SKILLS, rng.randint(6, 12))),
+        "",
+        "Education",
+        f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)}, {rng.randint(2005, 2020)}",
+        "",
+        "Experience",
+    ]
+    year = 2025
+    target = pages * LINES_PER_PAGE
+    while len(lines) < target - 2:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}, Jan {start} - Dec {year}")
+        for _ in range(rng.randint(3, 6)):
+            lines.extend(textwrap.wrap(_bullet(rng), LINE_WIDTH))
+        lines.append("")
+        year = start
+    return lines[:target]
+
+
+def _escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """Write a minimal text-only PDF with one page per list of lines"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        content = ["BT", "/F1 10 Tf", "12 TL", "50 750 Td"]
+        content += [f"({_escape(line)}) Tj T*" for line in lines]
+        content.append("ET")
+        stream = "\n".join(content).encode("latin-1", "replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def generate_resumes(directory, count, pages=1, seed=0):
+    """Write `count` resume PDFs of `pages` pages each and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for number in range(count):
+        lines = resume_lines(number, pages, seed)
+        path = os.path.join(directory, f"resume_{number:04d}.pdf")
+        write_pdf(path, [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)])
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="synthetic_resumes")
+    args = parser.parse_args()
+    paths = generate_resumes(args.output, args.count, args.pages, args.seed)
+    print(f"Wrote {len(paths)} resumes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
 import streamlit as st
-from modules.query_handler import ask_question
+from modules.query_handler import stream_question
+from modules.telemetry import TELEMETRY_DEBUG_PANEL
 from modules.vectorstore import get_session_id
 
+def render_trace(summary):
+    """Per-stage timing breakdown of one question"""
+    with st.expander("🔬 Timing breakdown"):
+        st.caption(f"Total {summary['wall_ms']:.0f} ms")
+        st.table([
+            {"stage": name, "ms": round(stage["ms"], 1), "calls": stage["calls"]}
+            for name, stage in summary["stages"].items()
+        ])
+        if summary["counters"]:
+            st.json(summary["counters"])
+
 def render_chat():
     """Render the chat interface"""
     
@@ -13,7 +25,7 @@ def render_chat():
         st.session_state.messages = []
     
     # Display chat history
-    for message in st.session_state.messages:
+    for position, message in enumerate(st.session_state.messages, 1):
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
             
@@ -22,6 +34,10 @@ def render_chat():
                 with st.expander("📎 View Sources"):
                     for i, source in enumerate(message["sources"], 1):
                         st.text(f"{i}. {source}")
+
+            # Breakdown of the last question only
+            if message.get("trace") and position == len(st.session_state.messages):
+                render_trace(message["trace"])
     
     # Chat input
     if prompt := st.chat_input("Ask about the resumes... (e.g., 'Name all candidates', 'Compare their skills')"):
@@ -32,37 +48,47 @@ def render_chat():
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Get assistant response
+        # Get assistant response, rendered token by token as it is generated
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    result = ask_question(prompt, session_id)
-                    response = result.get("response", "Sorry, I couldn't process your question.")
-                    sources = result.get("sources", [])
-                    
-                    st.markdown(response)
-                    
-                    # Show sources
-                    if sources:
-                        with st.expander("📎 View Sources"):
-                            for i, source in enumerate(sources, 1):
-                                st.text(f"{i}. {source}")
-                    
-                    # Add assistant message to chat history
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": response,
-                        "sources": sources
-                    })
-                    
-                except Exception as e:
-                    error_msg = f"Error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": error_msg,
-                        "sources": []
-                    })
+            try:
+                answer = stream_question(prompt, session_id)
+                st.write_stream(answer)
+                response = answer.response or "Sorry, I couldn't process your question."
+                sources = answer.sources
+                if answer.cached:
+                    st.caption("⚡ Answered from cache")
+                elif answer.routed:
+                    st.caption("📇 Answered from resume profiles")
+                if answer.candidates:
+                    st.caption(f"🧩 Answered per candidate ({answer.candidates} resumes)")
+
+                # Show sources
+                if sources:
+                    with st.expander("📎 View Sources"):
+                        for i, source in enumerate(sources, 1):
+                            st.text(f"{i}. {source}")
+
+                trace = None
+                if TELEMETRY_DEBUG_PANEL and answer.trace is not None:
+                    trace = answer.trace.summary()
+                    render_trace(trace)
+
+                # Add assistant message to chat history
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": response,
+                    "sources": sources,
+                    "trace": trace
+                })
+
+            except Exception as e:
+                error_msg = f"Error: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": error_msg,
+                    "sources": []
+                })
     
     # Clear chat button in sidebar
     if st.sidebar.button("🗑️ Clear Chat History"):
@@ -1,10 +1,14 @@
 import streamlit as st
 import os
-from modules.vectorstore import upload_pdfs_to_vectorstore, get_session_id, clear_session_data
+from modules.blob_store import get_blob_store
+from modules.jobs import DONE, FAILED, INGEST_POLL_SECONDS, JobLimitError, QUEUED, get_job_queue
+from modules.manifest import get_session_dir
+from modules.sessions import QuotaExceededError, check_upload_quota, record_activity
+from modules.vectorstore import get_session_id, clear_session_data, delete_document
 
 def list_uploaded_documents(session_id):
     """List PDFs for current session"""
-    upload_dir = f"./uploaded_docs/{session_id}"
+    upload_dir = get_session_dir(session_id)
     if not os.path.exists(upload_dir):
         return []
     
@@ -23,6 +27,58 @@ def list_uploaded_documents(session_id):
     files.sort(key=lambda x: x['filename'])
     return files
 
+def _job_progress_text(job, queue):
+    if job.state == QUEUED:
+        ahead = queue.position(job)
+        return f"Queued ({ahead} upload(s) ahead)" if ahead else "Queued"
+    progress = job.progress
+    if not progress:
+        return "Starting..."
+    return (
+        f"Parsed {progress['files_parsed']}/{progress['files_total']} files · "
+        f"embedded {progress['chunks_embedded']}/{progress['chunks_parsed']} chunks · "
+        f"stored {progress['vectors_upserted']} vectors"
+    )
+
+def _render_finished_jobs(jobs):
+    """Report each finished upload once"""
+    seen = st.session_state.setdefault("reported_jobs", set())
+    for job in jobs:
+        if job.active or job.id in seen:
+            continue
+        seen.add(job.id)
+        if job.state == DONE:
+            st.success(
+                f"✅ Indexed {job.result['files_count']} new PDF file(s), "
+                f"{len(job.result['skipped_files'])} already up to date"
+            )
+        elif job.state == FAILED:
+            st.error(f"Error uploading files: {job.error}")
+
+@st.fragment(run_every=INGEST_POLL_SECONDS)
+def _poll_upload_jobs(session_id):
+    """Refresh upload progress without rerunning the whole page"""
+    queue = get_job_queue()
+    jobs = queue.session_jobs(session_id)
+    active = [job for job in jobs if job.active]
+    if not active:
+        # Rerun the page so the document list and chat see the new files
+        st.rerun()
+    for job in active:
+        total = max(job.progress.get("files_total", 0), 1)
+        st.progress(
+            min(job.progress.get("files_indexed", 0) / total, 1.0),
+            text=f"{len(job.file_paths)} file(s): {_job_progress_text(job, queue)}"
+        )
+
+def render_upload_jobs(session_id):
+    """Progress of this session's background uploads; polls only while one is pending"""
+    jobs = get_job_queue().session_jobs(session_id)
+    with st.sidebar:
+        _render_finished_jobs(jobs)
+        if any(job.active for job in jobs):
+            _poll_upload_jobs(session_id)
+
 def render_uploader():
     st.sidebar.header("📚 Document Manager")
     
@@ -41,6 +97,13 @@ def render_uploader():
         for doc in uploaded_docs:
             with st.sidebar.expander(f"📄 {doc['filename']}"):
                 st.write(f"**Size:** {doc['size_mb']} MB")
+                if st.button("Remove", key=f"remove_{doc['filename']}"):
+                    try:
+                        delete_document(doc['path'], session_id)
+                        os.remove(doc['path'])
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error removing file: {str(e)}")
     else:
         st.sidebar.info("📭 No documents uploaded yet")
     
@@ -61,44 +124,50 @@ def render_uploader():
             st.sidebar.text(f"  • {f.name}")
     
     if st.sidebar.button("Upload to Database") and uploaded_files:
-        with st.spinner(f"Uploading {len(uploaded_files)} file(s)..."):
-            try:
-                # Create session-specific directory
-                upload_dir = f"./uploaded_docs/{session_id}"
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                saved_files = []
-                for uploaded_file in uploaded_files:
-                    file_path = os.path.join(upload_dir, uploaded_file.name)
-                    with open(file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    saved_files.append(file_path)
-                
-                # Process and upload to vector store with session isolation
-                result = upload_pdfs_to_vectorstore(saved_files, session_id)
-                
-                st.sidebar.success(f"✅ Successfully processed {len(uploaded_files)} PDF file(s)")
-                st.sidebar.write("Files processed:")
-                for fname in [f.name for f in uploaded_files]:
-                    st.sidebar.write(f"  • {fname}")
-                
-                st.sidebar.info("ℹ️ Only your uploaded documents are visible to you")
-                
-                # Clear the uploader and refresh
-                st.rerun()
-                
-            except Exception as e:
-                st.sidebar.error(f"Error uploading files: {str(e)}")
+        try:
+            check_upload_quota(session_id, [(f.name, f.size) for f in uploaded_files])
+
+            # Create session-specific directory
+            upload_dir = get_session_dir(session_id)
+            os.makedirs(upload_dir, exist_ok=True)
+            record_activity(session_id, force=True)
+
+            # Stream into the shared content-addressed store; the session folder links to it
+            store = get_blob_store()
+            saved_files = []
+            for uploaded_file in uploaded_files:
+                file_path = os.path.join(upload_dir, uploaded_file.name)
+                uploaded_file.seek(0)
+                store.save(uploaded_file, file_path)
+                saved_files.append(file_path)
+
+            # Index in the shared background queue so this page stays responsive
+            job = get_job_queue().submit(session_id, saved_files)
+            if job.submissions > 1:
+                st.sidebar.info("ℹ️ These files are already being uploaded")
+            else:
+                st.sidebar.info(f"📥 Queued {len(saved_files)} file(s) for indexing")
+            st.sidebar.info("ℹ️ Only your uploaded documents are visible to you")
+
+        except (JobLimitError, QuotaExceededError) as e:
+            st.sidebar.warning(str(e))
+        except Exception as e:
+            st.sidebar.error(f"Error uploading files: {str(e)}")
+
+    render_upload_jobs(session_id)
 
     # Allow user to clear their own session data (namespace + uploaded files)
     if st.sidebar.button("🧹 Clear my session data"):
+        if get_job_queue().has_active(session_id):
+            st.sidebar.warning("Wait for your uploads to finish before clearing the session")
+            return
         with st.spinner("Clearing your session data..."):
             try:
                 # Clear vectors in Pinecone for this session
                 clear_session_data(session_id)
 
                 # Remove uploaded files for this session
-                upload_dir = f"./uploaded_docs/{session_id}"
+                upload_dir = get_session_dir(session_id)
                 if os.path.exists(upload_dir):
                     for fname in os.listdir(upload_dir):
                         fp = os.path.join(upload_dir, fname)
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "64"))
+
+
+def _dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class AnswerCache:
+    """Per-session cache of answers, matched by question similarity and the exact context used"""
+
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+                 max_entries=ANSWER_CACHE_SIZE):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._sessions = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def lookup(self, session_id, question_vector, chunk_ids):
+        """Return a cached {"response", "sources"} for a similar question over the same chunks"""
+        chunk_ids = frozenset(chunk_ids)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._sessions.get(session_id)
+            best_key, best_score = None, self.threshold
+            if entries:
+                for key, entry in list(entries.items()):
+                    if now - entry["created"] > self.ttl_seconds:
+                        del entries[key]
+                        self._stats["expired"] += 1
+                        continue
+                    if entry["chunk_ids"] != chunk_ids:
+                        continue
+                    # Embeddings are normalized, so the dot product is the cosine similarity
+                    score = _dot(question_vector, entry["vector"])
+                    if score >= best_score:
+                        best_key, best_score = key, score
+            if best_key is None:
+                self._stats["misses"] += 1
+                return None
+            entries.move_to_end(best_key)
+            self._stats["hits"] += 1
+            entry = entries[best_key]
+            return {"response": entry["response"], "sources": list(entry["sources"]), "similarity": best_score}
+
+    def generation(self, session_id):
+        """Token changed by every invalidation; answers computed across a change are not stored"""
+        with self._lock:
+            return self._generations.get(session_id, 0)
+
+    def store(self, session_id, question, question_vector, chunk_ids, response, sources, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generations.get(session_id, 0):
+                return
+            entries = self._sessions.setdefault(session_id, OrderedDict())
+            entries[question] = {
+                "vector": list(question_vector),
+                "chunk_ids": frozenset(chunk_ids),
+                "response": response,
+                "sources": list(sources),
+                "created": time.monotonic()
+            }
+            entries.move_to_end(question)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, session_id):
+        """Forget every answer for a session whose documents changed"""
+        with self._lock:
+            self._generations[session_id] = self._generations.get(session_id, 0) + 1
+            if self._sessions.pop(session_id, None):
+                self._stats["invalidations"] += 1
+
+    def forget(self, session_id):
+        """Drop the answers of a session that has been cleared or reaped"""
+        with self._lock:
+            # The counter stays behind (one int per session) so answers still in flight are not stored
+            self._generations[session_id] = self._generations.get(session_id, 0) + 1
+            if self._sessions.pop(session_id, None):
+                self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["sessions"] = len(self._sessions)
+            stats["entries"] = sum(len(entries) for entries in self._sessions.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_cache = AnswerCache() if ANSWER_CACHE_ENABLED else None
+
+
+def get_answer_cache():
+    """Return the process-wide answer cache, or None when ANSWER_CACHE_ENABLED=false"""
+    return _cache
+
+
+def invalidate_session_answers(session_id):
+    if _cache is not None:
+        _cache.invalidate(session_id)
+
+
+def forget_session_answers(session_id):
+    if _cache is not None:
+        _cache.forget(session_id)
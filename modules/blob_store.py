@@ -0,0 +1,112 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from dotenv import load_dotenv
+from modules.manifest import UPLOAD_ROOT, remember_sha256
+
+load_dotenv()
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(UPLOAD_ROOT, ".blobs"))
+BLOB_WRITE_CHUNK_KB = int(os.getenv("BLOB_WRITE_CHUNK_KB", "1024"))
+# Unreferenced blobs younger than this are kept, so a blob is never collected between write and link
+BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", "600"))
+
+
+class BlobStore:
+    """Uploaded files stored once by SHA-256, shared by every session that uploads them
+
+    A session's copy is a hard link to the blob, so sessions keep their own file names
+    and can delete their copy independently. The link count doubles as the reference count:
+    a blob only the store links to is garbage. Where hard links are unavailable (e.g. the
+    session folder is on another filesystem) the blob is copied instead.
+    """
+
+    def __init__(self, root=BLOB_STORE_DIR, chunk_size=BLOB_WRITE_CHUNK_KB * 1024):
+        self.root = root
+        self.chunk_size = chunk_size
+        self._tmp_dir = os.path.join(root, "tmp")
+
+    def path(self, content_hash):
+        return os.path.join(self.root, content_hash[:2], f"{content_hash}.pdf")
+
+    def put_stream(self, stream):
+        """Write a file-like object to the store in chunks, hashing as it goes; returns (sha256, size)"""
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(self._tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                for block in iter(lambda: stream.read(self.chunk_size), b""):
+                    digest.update(block)
+                    f.write(block)
+                    size += len(block)
+            content_hash = digest.hexdigest()
+            path = self.path(content_hash)
+            if os.path.exists(path):
+                # Identical bytes are already stored; refresh the age the garbage collector sees
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                remember_sha256(path, content_hash)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return content_hash, size
+
+    def link(self, content_hash, dest):
+        """Make `dest` refer to the stored blob, replacing whatever was there"""
+        tmp_dest = f"{dest}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.link(self.path(content_hash), tmp_dest)
+        except OSError:
+            shutil.copyfile(self.path(content_hash), tmp_dest)
+        os.replace(tmp_dest, dest)
+        remember_sha256(dest, content_hash)
+
+    def save(self, stream, dest):
+        """Store an upload and link it at `dest`; returns its SHA-256"""
+        content_hash, _ = self.put_stream(stream)
+        self.link(content_hash, dest)
+        return content_hash
+
+    def collect_garbage(self, grace_seconds=BLOB_GC_GRACE_SECONDS):
+        """Delete blobs no session links to any more; returns (files, bytes) removed"""
+        removed = freed = 0
+        cutoff = time.time() - grace_seconds
+        if not os.path.isdir(self.root):
+            return removed, freed
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if prefix == "tmp" or not os.path.isdir(directory):
+                continue
+            for filename in os.listdir(directory):
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_nlink > 1 or stat.st_mtime > cutoff:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+        return removed, freed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    """Return the process-wide upload store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BlobStore()
+    return _store
@@ -0,0 +1,306 @@
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import uuid
+from array import array
+from dotenv import load_dotenv
+from modules.manifest import get_session_dir
+from modules.vector_index import _matches_filter
+
+load_dotenv()
+
+BM25_INDEX_ENABLED = os.getenv("BM25_INDEX_ENABLED", "true").lower() == "true"
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+BM25_COMPACT_RATIO = float(os.getenv("BM25_COMPACT_RATIO", "0.5"))
+BM25_DIRNAME = ".bm25"
+
+_LOG_FILENAME = "postings.log"
+# Keeps skill-style tokens whole: c++, c#, node.js, ci/cd, saa-c03, scikit-learn
+_TOKEN_RE = re.compile(r"[a-z0-9](?:[a-z0-9+#./\-]*[a-z0-9+#])?")
+_PART_RE = re.compile(r"[./\-]")
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from had has have how i in is it its of on or our that the their "
+    "them they this to was were what when where which who whom why will with you your".split()
+)
+
+
+def tokenize(text):
+    """Lowercased terms; compound tokens such as "saa-c03" also yield their parts ("saa", "c03")"""
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        terms.append(token)
+        if _PART_RE.search(token):
+            terms.extend(part for part in _PART_RE.split(token) if part and part not in _STOPWORDS)
+    return terms
+
+
+class BM25Index:
+    """BM25 keyword index over the chunks of one namespace, for exact terms dense retrieval misses
+
+    Postings are compact arrays per term (document numbers as uint32, term frequencies as
+    uint16), appended to as chunks are indexed, so uploads update the index incrementally.
+    Each document also keeps its small vector metadata, which lets searches use the same
+    filters as the vector index. The index is persisted as an append-only log of documents
+    (term counts, not text), metadata updates and deletions, replayed on load; deleted documents are skipped
+    at search time and dropped by rewriting the log once they make up BM25_COMPACT_RATIO.
+    Like the chunk store, a namespace has one writer; readers in other processes catch up
+    from the log when it changes.
+    """
+
+    def __init__(self, directory, k1=BM25_K1, b=BM25_B, compact_ratio=BM25_COMPACT_RATIO):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self._lock = threading.Lock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self._ids = []
+        self._numbers = {}
+        self._metadata = []
+        self._lengths = array("I")
+        self._postings = {}
+        self._live_length = 0
+        self._log_pos = 0
+        self._log_inode = None
+
+    @property
+    def _log_path(self):
+        return os.path.join(self.directory, _LOG_FILENAME)
+
+    def _load(self):
+        """Replay the log from where the last read stopped"""
+        try:
+            f = open(self._log_path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._log_inode:
+                # New or rewritten log: start over
+                self._reset()
+                self._log_inode = inode
+            f.seek(self._log_pos)
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                self._log_pos += len(line.encode("utf-8"))
+                entry = json.loads(line)
+                if "deleted" in entry:
+                    self._remove(entry["deleted"])
+                elif "updated" in entry:
+                    self._update(entry["updated"], entry["metadata"])
+                else:
+                    self._insert(entry["id"], entry["terms"], entry["metadata"])
+
+    def _changed_elsewhere(self):
+        try:
+            stat = os.stat(self._log_path)
+        except OSError:
+            return False
+        return stat.st_ino != self._log_inode or stat.st_size != self._log_pos
+
+    def _insert(self, vector_id, terms, metadata):
+        self._remove([vector_id])
+        number = len(self._ids)
+        self._ids.append(vector_id)
+        self._numbers[vector_id] = number
+        self._metadata.append(metadata)
+        length = sum(terms.values())
+        self._lengths.append(length)
+        self._live_length += length
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("H"))
+            postings[0].append(number)
+            postings[1].append(min(frequency, 65535))
+
+    def _remove(self, ids):
+        for vector_id in ids:
+            number = self._numbers.pop(vector_id, None)
+            if number is not None:
+                self._ids[number] = None
+                self._metadata[number] = None
+                self._live_length -= self._lengths[number]
+
+    def _update(self, ids, metadata):
+        for vector_id in ids:
+            number = self._numbers.get(vector_id)
+            if number is not None:
+                self._metadata[number] = dict(self._metadata[number], **metadata)
+
+    def _append(self, entries):
+        os.makedirs(self.directory, exist_ok=True)
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            if f.tell() > self._log_pos:
+                # A line half-written by a crashed writer; everything before it has been read
+                f.truncate(self._log_pos)
+            f.write(lines)
+            self._log_inode = os.fstat(f.fileno()).st_ino
+        self._log_pos += len(lines.encode("utf-8"))
+
+    def add(self, items):
+        """Index (vector ID, text, metadata) triples; an ID indexed before is replaced"""
+        entries = []
+        for vector_id, text, metadata in items:
+            terms = {}
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0) + 1
+            entries.append({"id": vector_id, "terms": terms, "metadata": metadata})
+        if not entries:
+            return
+        with self._lock:
+            if self._changed_elsewhere():
+                self._load()
+            self._append(entries)
+            for entry in entries:
+                self._insert(entry["id"], entry["terms"], entry["metadata"])
+            self._maybe_compact()
+
+    def delete(self, ids):
+        with self._lock:
+            if self._changed_elsewhere():
+                self._load()
+            doomed = [vector_id for vector_id in ids if vector_id in self._numbers]
+            if not doomed:
+                return
+            self._append([{"deleted": doomed}])
+            self._remove(doomed)
+            self._maybe_compact()
+
+    def update_metadata(self, ids, metadata):
+        """Set these metadata fields on indexed chunks, as VectorIndex.update_metadata does on their vectors"""
+        with self._lock:
+            if self._changed_elsewhere():
+                self._load()
+            present = [vector_id for vector_id in ids if vector_id in self._numbers]
+            if not present:
+                return
+            self._append([{"updated": present, "metadata": metadata}])
+            self._update(present, metadata)
+
+    def _maybe_compact(self):
+        dead = len(self._ids) - len(self._numbers)
+        if dead and dead >= self.compact_ratio * len(self._ids):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the log with only live documents and renumber them; caller holds the lock"""
+        live = {}
+        with open(self._log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                entry = json.loads(line)
+                if "deleted" in entry:
+                    for vector_id in entry["deleted"]:
+                        live.pop(vector_id, None)
+                elif "updated" in entry:
+                    for vector_id in entry["updated"]:
+                        if vector_id in live:
+                            document = json.loads(live[vector_id])
+                            document["metadata"] = dict(document["metadata"], **entry["metadata"])
+                            live[vector_id] = json.dumps(document, ensure_ascii=False) + "\n"
+                else:
+                    live.pop(entry["id"], None)
+                    live[entry["id"]] = line
+        tmp_path = f"{self._log_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(live.values()))
+        os.replace(tmp_path, self._log_path)
+        self._reset()
+        self._load()
+
+    def search(self, query, top_k, filter=None):
+        """Best `top_k` chunks for the query's terms as [{"id", "score", "metadata"}], best first"""
+        import numpy as np
+
+        terms = set(tokenize(query))
+        with self._lock:
+            if self._changed_elsewhere():
+                self._load()
+            live = len(self._numbers)
+            if not live or not terms:
+                return []
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+            norms = self.k1 * (1 - self.b + self.b * lengths / (self._live_length / live))
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                documents = np.frombuffer(postings[0], dtype=np.uint32)
+                frequencies = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+                # Postings of deleted documents count toward document frequency until compaction
+                idf = math.log(1 + (live - len(documents) + 0.5) / (len(documents) + 0.5))
+                scores[documents] += idf * frequencies * (self.k1 + 1) / (frequencies + norms[documents])
+            candidates = np.flatnonzero(scores > 0)
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+            hits = []
+            for number in ranked:
+                metadata = self._metadata[number]
+                if metadata is None or (filter and not _matches_filter(metadata, filter)):
+                    continue
+                hits.append({"id": self._ids[number], "score": float(scores[number]), "metadata": metadata})
+                if len(hits) == top_k:
+                    break
+            return hits
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._numbers),
+                "deleted": len(self._ids) - len(self._numbers),
+                "terms": len(self._postings),
+                "postings": sum(len(postings[0]) for postings in self._postings.values()),
+            }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_bm25_index(namespace):
+    """Return the BM25 index of a namespace, kept next to its uploads in the session folder"""
+    with _indexes_lock:
+        index = _indexes.get(namespace)
+        if index is None:
+            index = _indexes[namespace] = BM25Index(os.path.join(get_session_dir(namespace), BM25_DIRNAME))
+        return index
+
+
+def forget_bm25_index(namespace):
+    """Delete a namespace's BM25 index and drop it from memory"""
+    with _indexes_lock:
+        index = _indexes.pop(namespace, None)
+    if index is None:
+        index = BM25Index(os.path.join(get_session_dir(namespace), BM25_DIRNAME))
+    index.clear()
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse ranked ID lists: each ID scores the sum of 1 / (k + rank) over the lists it appears in
+
+    Returns [(id, score)] best first. Only ranks matter, so BM25 and cosine scores need no
+    calibration against each other.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, vector_id in enumerate(ranking, 1):
+            scores[vector_id] = scores.get(vector_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
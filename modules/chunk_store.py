@@ -0,0 +1,260 @@
+import glob
+import mmap
+import os
+import shutil
+import threading
+import uuid
+from dotenv import load_dotenv
+from modules.manifest import get_session_dir
+
+load_dotenv()
+
+CHUNK_STORE_ENABLED = os.getenv("CHUNK_STORE_ENABLED", "true").lower() == "true"
+CHUNK_STORE_COMPACT_RATIO = float(os.getenv("CHUNK_STORE_COMPACT_RATIO", "0.5"))
+CHUNK_STORE_DIRNAME = ".chunks"
+
+_INDEX_FILENAME = "index.log"
+
+
+class ChunkStore:
+    """Chunk text of one namespace, so the vector index only holds IDs and small metadata
+
+    Text is appended to a UTF-8 blob that reads go through a memory map of; an append-only
+    log maps each vector ID to its (offset, length) in the blob. The log's first line names
+    the blob, which lets compaction switch to a rewritten blob with a single rename. Deleted
+    and overwritten text stays in the blob until it makes up CHUNK_STORE_COMPACT_RATIO of it.
+    Like the session manifest, a namespace has one writer (the process holding its session
+    lock); readers in other processes notice its changes from the log's size and inode.
+    """
+
+    def __init__(self, directory, compact_ratio=CHUNK_STORE_COMPACT_RATIO):
+        self.directory = directory
+        self.compact_ratio = compact_ratio
+        self._lock = threading.Lock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self._offsets = {}
+        self._blob_name = None
+        self._blob_size = 0
+        self._dead_bytes = 0
+        self._log_pos = 0
+        self._log_inode = None
+        self._map = None
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, _INDEX_FILENAME)
+
+    def _blob_path(self, name=None):
+        return os.path.join(self.directory, name or self._blob_name)
+
+    def _load(self):
+        """Read the index log from where the last read stopped"""
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            self._log_inode = os.fstat(f.fileno()).st_ino
+            header = f.readline()
+            if not header.endswith("\n"):
+                return
+            blob_name = header.split("\t")[1].strip()
+            if blob_name != self._blob_name:
+                # Compacted by another process since the last read
+                self._reset()
+                self._blob_name = blob_name
+                self._log_pos = f.tell()
+            f.seek(self._log_pos)
+            for line in f:
+                if not line.endswith("\n"):
+                    # Half-written by a writer that is still going (or crashed); read it next time
+                    break
+                self._log_pos += len(line.encode("utf-8"))
+                vector_id, offset, length = line.rstrip("\n").split("\t")
+                self._apply(vector_id, int(offset), int(length))
+        self._blob_size = os.path.getsize(self._blob_path())
+
+    def _apply(self, vector_id, offset, length):
+        previous = self._offsets.pop(vector_id, None)
+        if previous is not None:
+            self._dead_bytes += previous[1]
+        if length >= 0:
+            self._offsets[vector_id] = (offset, length)
+
+    def _start(self):
+        """Create an empty blob and log; caller holds the lock"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._blob_name = f"text.{uuid.uuid4().hex[:8]}.bin"
+        open(self._blob_path(), "wb").close()
+        header = f"blob\t{self._blob_name}\n"
+        with open(self._index_path, "w", encoding="utf-8") as f:
+            f.write(header)
+            self._log_inode = os.fstat(f.fileno()).st_ino
+        self._log_pos = len(header.encode("utf-8"))
+
+    def _append_log(self, lines):
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+        self._log_pos += sum(len(line.encode("utf-8")) for line in lines)
+
+    def put(self, items):
+        """Store (vector ID, text) pairs, replacing any earlier text under the same IDs"""
+        if not items:
+            return
+        encoded = [(vector_id, text.encode("utf-8")) for vector_id, text in items]
+        with self._lock:
+            if self._blob_name is None:
+                self._start()
+            # Text first, then the log entries pointing at it, so a crash leaves no dangling entry
+            with open(self._blob_path(), "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(b"".join(data for _, data in encoded))
+            lines = []
+            for vector_id, data in encoded:
+                lines.append(f"{vector_id}\t{offset}\t{len(data)}\n")
+                self._apply(vector_id, offset, len(data))
+                offset += len(data)
+            self._append_log(lines)
+            self._blob_size = offset
+            self._maybe_compact()
+
+    def delete(self, ids):
+        with self._lock:
+            doomed = [vector_id for vector_id in ids if vector_id in self._offsets]
+            if not doomed:
+                return
+            for vector_id in doomed:
+                self._apply(vector_id, 0, -1)
+            self._append_log([f"{vector_id}\t0\t-1\n" for vector_id in doomed])
+            self._maybe_compact()
+
+    def get_many(self, ids):
+        """{vector ID: text} for the IDs present, decoded straight from the memory map"""
+        with self._lock:
+            if self._changed_elsewhere():
+                self._load()
+            if self._map is None or len(self._map) < self._blob_size:
+                self._remap()
+            texts = {}
+            if self._map is None:
+                return texts
+            view = memoryview(self._map)
+            try:
+                for vector_id in ids:
+                    location = self._offsets.get(vector_id)
+                    if location is not None:
+                        offset, length = location
+                        texts[vector_id] = str(view[offset:offset + length], "utf-8")
+            finally:
+                view.release()
+            return texts
+
+    def _changed_elsewhere(self):
+        """Whether another process appended to or compacted the log since it was last read"""
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return False
+        return stat.st_ino != self._log_inode or stat.st_size != self._log_pos
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._blob_name is None or not self._blob_size:
+            return
+        with open(self._blob_path(), "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _maybe_compact(self):
+        if self._dead_bytes and self._dead_bytes >= self.compact_ratio * self._blob_size:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the live text into a new blob and switch the log over to it; caller holds the lock"""
+        old_blob = self._blob_path()
+        if self._map is None or len(self._map) < self._blob_size:
+            self._remap()
+        new_name = f"text.{uuid.uuid4().hex[:8]}.bin"
+        offsets = {}
+        position = 0
+        with open(self._blob_path(new_name), "wb") as f:
+            for vector_id, (offset, length) in sorted(self._offsets.items(), key=lambda item: item[1][0]):
+                f.write(self._map[offset:offset + length])
+                offsets[vector_id] = (position, length)
+                position += length
+        header = f"blob\t{new_name}\n"
+        lines = [header] + [f"{vector_id}\t{offset}\t{length}\n" for vector_id, (offset, length) in offsets.items()]
+        tmp_path = f"{self._index_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(lines))
+        os.replace(tmp_path, self._index_path)
+        self._log_inode = os.stat(self._index_path).st_ino
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        os.remove(old_blob)
+        self._offsets = offsets
+        self._blob_name = new_name
+        self._blob_size = position
+        self._dead_bytes = 0
+        self._log_pos = sum(len(line.encode("utf-8")) for line in lines)
+        # Blobs a crashed compaction left behind
+        for path in glob.glob(os.path.join(self.directory, "text.*.bin")):
+            if os.path.basename(path) != new_name:
+                os.remove(path)
+
+    def clear(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+            self._reset()
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._offsets), "bytes": self._blob_size, "dead_bytes": self._dead_bytes}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_chunk_store(namespace):
+    """Return the chunk store of a namespace, kept next to its uploads in the session folder"""
+    with _stores_lock:
+        store = _stores.get(namespace)
+        if store is None:
+            store = _stores[namespace] = ChunkStore(os.path.join(get_session_dir(namespace), CHUNK_STORE_DIRNAME))
+        return store
+
+
+def forget_chunk_store(namespace):
+    """Delete a namespace's chunk text and drop its open store"""
+    with _stores_lock:
+        store = _stores.pop(namespace, None)
+    if store is None:
+        store = ChunkStore(os.path.join(get_session_dir(namespace), CHUNK_STORE_DIRNAME))
+    store.clear()
+
+
+def attach_text(matches, namespace):
+    """Give each query match its chunk text and the full path of its source file
+
+    Vectors hold only a source ID (the file name) and no text; both are filled in here from
+    the namespace's chunk store and upload folder. Vectors stored before the chunk store
+    already carry their text and full path and are passed through. Returns the matches.
+    """
+    missing = [match["id"] for match in matches if "text" not in (match.get("metadata") or {})]
+    texts = get_chunk_store(namespace).get_many(missing) if missing else {}
+    session_dir = get_session_dir(namespace)
+    for match in matches:
+        metadata = dict(match.get("metadata") or {})
+        if "text" not in metadata:
+            metadata["text"] = texts.get(match["id"], "")
+        source = metadata.get("source")
+        if source and os.path.basename(source) == source:
+            metadata["source"] = os.path.join(session_dir, source)
+        match["metadata"] = metadata
+    return matches
@@ -0,0 +1,180 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+CONTEXT_DUPLICATE_SIMILARITY = float(os.getenv("CONTEXT_DUPLICATE_SIMILARITY", "0.95"))
+HEADER_TOKENS = 30
+
+
+def estimate_tokens(text):
+    """Rough LLaMA token count (about four characters per token for English)"""
+    return max(1, len(text) // 4)
+
+
+def strip_overlap(previous, current, min_overlap=10, max_overlap=200):
+    """Drop the start of `current` that repeats the end of `previous` (splitter overlap)"""
+    limit = min(len(previous), len(current), max_overlap)
+    for size in range(limit, min_overlap - 1, -1):
+        if previous.endswith(current[:size]):
+            return current[size:].lstrip()
+    return current
+
+
+class Segment:
+    """One or more adjacent chunks of a source merged into a single passage"""
+
+    def __init__(self, match):
+        metadata = match["metadata"]
+        self.source = metadata.get("source", "unknown")
+        self.page = metadata.get("page", 0)
+        self.chunk = metadata.get("chunk")
+        self.last_chunk = self.chunk
+        self.text = metadata.get("text", "").strip()
+        self.metadata = metadata
+        self.ids = [match["id"]]
+        self.score = match.get("score", 0) or 0
+        self.vectors = [match.get("values")] if match.get("values") else []
+
+    def follows(self, match):
+        metadata = match["metadata"]
+        return (
+            self.last_chunk is not None
+            and metadata.get("chunk") == self.last_chunk + 1
+            and metadata.get("page", 0) == self.page
+        )
+
+    def extend(self, match):
+        metadata = match["metadata"]
+        self.text = f"{self.text} {strip_overlap(self.text, metadata.get('text', '').strip())}".strip()
+        self.last_chunk = metadata.get("chunk")
+        self.ids.append(match["id"])
+        self.score = max(self.score, match.get("score", 0) or 0)
+        if match.get("values"):
+            self.vectors.append(match["values"])
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.text)
+
+
+def merge_adjacent(matches):
+    """Merge consecutive chunks of the same page into segments, removing duplicated overlap"""
+    ordered = sorted(
+        matches,
+        key=lambda m: (m["metadata"].get("page", 0), m["metadata"].get("chunk", -1))
+    )
+    segments = []
+    for match in ordered:
+        if not match["metadata"].get("text", "").strip():
+            continue
+        if segments and segments[-1].follows(match):
+            segments[-1].extend(match)
+        else:
+            segments.append(Segment(match))
+    return segments
+
+
+def _segment_vectors(segments):
+    import numpy as np
+
+    vectors = []
+    for segment in segments:
+        mean = np.mean(np.asarray(segment.vectors, dtype=np.float32), axis=0)
+        norm = np.linalg.norm(mean)
+        vectors.append(mean / norm if norm else mean)
+    return np.vstack(vectors)
+
+
+def mmr_order(segments, query_vector, lambda_mult=CONTEXT_MMR_LAMBDA,
+              duplicate_similarity=CONTEXT_DUPLICATE_SIMILARITY):
+    """Order segments by maximal marginal relevance, dropping near-duplicates"""
+    import numpy as np
+
+    if len(segments) < 2 or query_vector is None or any(not s.vectors for s in segments):
+        return sorted(segments, key=lambda s: s.score, reverse=True)
+
+    vectors = _segment_vectors(segments)
+    relevance = vectors @ np.asarray(query_vector, dtype=np.float32)
+    similarity = vectors @ vectors.T
+    remaining = list(range(len(segments)))
+    selected = []
+    while remaining:
+        if selected:
+            redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining), dtype=np.float32)
+        scores = lambda_mult * relevance[remaining] - (1 - lambda_mult) * redundancy
+        best = int(np.argmax(scores))
+        pick = remaining.pop(best)
+        if selected and redundancy[best] >= duplicate_similarity:
+            continue
+        selected.append(pick)
+    return [segments[i] for i in selected]
+
+
+def _attach_vectors(by_source, embed_many):
+    """Embed the text of matches that came without a vector, for sources MMR has to order
+
+    A source that merges into a single segment needs no vectors. The texts were embedded
+    at upload, so these are normally embedding cache hits rather than vectors fetched
+    from the index with every query.
+    """
+    missing = [
+        match for source_matches in by_source.values() if len(merge_adjacent(source_matches)) > 1
+        for match in source_matches if not match.get("values") and match["metadata"].get("text", "").strip()
+    ]
+    if missing:
+        for match, vector in zip(missing, embed_many([match["metadata"]["text"] for match in missing])):
+            match["values"] = vector
+
+
+def pack_context(matches, query_vector, token_budget=CONTEXT_TOKEN_BUDGET, embed_many=None):
+    """Choose segments per source within a token budget, taking turns across sources
+
+    Matches without vectors are embedded with `embed_many` where MMR needs them.
+    Returns [(source, [Segment, ...])] with sources ordered by best score and
+    segments in reading order.
+    """
+    by_source = {}
+    for match in matches:
+        by_source.setdefault(match["metadata"].get("source", "unknown"), []).append(match)
+    if embed_many is not None:
+        _attach_vectors(by_source, embed_many)
+
+    ranked = {}
+    for source, source_matches in by_source.items():
+        segments = merge_adjacent(source_matches)
+        if segments:
+            ranked[source] = mmr_order(segments, query_vector)
+
+    sources = sorted(ranked, key=lambda src: max(s.score for s in ranked[src]), reverse=True)
+    chosen = {source: [] for source in sources}
+    used = HEADER_TOKENS * len(sources)
+    fair_share = max(64, (token_budget - used) // max(len(sources), 1))
+
+    # Round-robin so every candidate gets context before anyone gets a second helping
+    progress = True
+    while progress:
+        progress = False
+        for source in sources:
+            queue = ranked[source]
+            while queue:
+                segment = queue.pop(0)
+                if not chosen[source] and used + segment.tokens > token_budget:
+                    # Every candidate gets at least its best passage, trimmed to a fair share
+                    segment.text = segment.text[:fair_share * 4]
+                if used + segment.tokens <= token_budget or not chosen[source]:
+                    chosen[source].append(segment)
+                    used += segment.tokens
+                    progress = True
+                    break
+
+    packed = []
+    for source in sources:
+        if chosen[source]:
+            segments = sorted(chosen[source], key=lambda s: (s.page, s.chunk if s.chunk is not None else -1))
+            packed.append((source, segments))
+    return packed
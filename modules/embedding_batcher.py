@@ -0,0 +1,105 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from typing import Callable, List
+
+load_dotenv()
+
+EMBEDDING_QUERY_BATCHING = os.getenv("EMBEDDING_QUERY_BATCHING", "true").lower() == "true"
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "2"))
+EMBEDDING_BATCH_MAX = int(os.getenv("EMBEDDING_BATCH_MAX", "32"))
+
+
+class EmbeddingBatcher:
+    """Coalesces single-text embedding requests from all sessions into batched encode calls
+
+    Requests that arrive while an encode is running are picked up together by the next one.
+    Under load (the previous batch had company) a batch also waits up to `window_ms` for
+    more requests; at low load a lone request is encoded immediately.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], List[List[float]]],
+                 window_ms: float = EMBEDDING_BATCH_WINDOW_MS, max_batch: int = EMBEDDING_BATCH_MAX):
+        self.encode = encode
+        self.window_ms = window_ms
+        self.max_batch = max(1, max_batch)
+        self._requests = queue.Queue()
+        self._last_batch = 1
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "texts_encoded": 0, "max_batch_seen": 0}
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text; the future resolves to its vector"""
+        self._ensure_started()
+        future = Future()
+        self._requests.put((text, future))
+        return future
+
+    def embed(self, text: str, timeout: float = None) -> List[float]:
+        return self.submit(text).result(timeout)
+
+    def _collect(self):
+        batch = [self._requests.get()]
+        window_ms = self.window_ms if self._last_batch > 1 else 0
+        deadline = time.perf_counter() + window_ms / 1000
+        while len(batch) < self.max_batch:
+            try:
+                # Take whatever queued up during the previous encode without waiting
+                batch.append(self._requests.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Identical questions asked at the same moment are encoded once
+            waiting = {}
+            for text, future in batch:
+                if future.set_running_or_notify_cancel():
+                    waiting.setdefault(text, []).append(future)
+            self._last_batch = len(batch)
+            if not waiting:
+                continue
+            texts = list(waiting)
+            try:
+                vectors = self.encode(texts)
+            except Exception as e:
+                for futures in waiting.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+            for text, vector in zip(texts, vectors):
+                for future in waiting[text]:
+                    future.set_result(vector)
+            with self._stats_lock:
+                self._stats["requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["texts_encoded"] += len(texts)
+                self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(texts))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["mean_batch"] = round(stats["texts_encoded"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from modules.telemetry import log_event
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies share a cache entry"""
+    return " ".join(text.split())
+
+
+def cache_key(text: str, model_name: str) -> str:
+    """Content address for an embedding: hash of model name plus normalized text"""
+    payload = f"{model_name}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: in-memory LRU in front of an optional SQLite file"""
+
+    def __init__(self, model_name: str, max_items: int = 50000, path: Optional[str] = None,
+                 max_disk_items: int = 500000):
+        self.model_name = model_name
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items
+        self.path = path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if path:
+            self._open_disk(path)
+
+    def _open_disk(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+            "used INTEGER NOT NULL DEFAULT (strftime('%s', 'now')))"
+        )
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'model_name'").fetchone()
+        if row is None or row[0] != self.model_name:
+            # Vectors from another model are useless; start over
+            self._db.execute("DELETE FROM embeddings")
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('model_name', ?)",
+                (self.model_name,)
+            )
+            if row is not None:
+                log_event(f"♻️ Embedding cache invalidated: model changed from {row[0]} to {self.model_name}",
+                          event="embedding_cache.invalidated", previous_model=row[0], model=self.model_name)
+        self._db.commit()
+
+    @staticmethod
+    def _pack(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _unpack(blob: bytes) -> List[float]:
+        values = array("f")
+        values.frombytes(blob)
+        return values.tolist()
+
+    def _remember(self, key: str, vector: List[float]):
+        """Insert into the memory tier; caller holds the lock"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_many(self, texts: List[str]) -> Dict[int, List[float]]:
+        """Return cached vectors by position in `texts`"""
+        keys = [cache_key(text, self.model_name) for text in texts]
+        found = {}
+        missing = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[i] = vector
+                    self._stats["hits"] += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            if missing and self._db is not None:
+                rows = []
+                unique_keys = list(missing)
+                for start in range(0, len(unique_keys), 500):
+                    part = unique_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    rows.extend(self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                    ).fetchall())
+                if rows:
+                    self._db.executemany(
+                        "UPDATE embeddings SET used = strftime('%s', 'now') WHERE key = ?",
+                        [(key,) for key, _ in rows]
+                    )
+                    self._db.commit()
+                for key, blob in rows:
+                    vector = self._unpack(blob)
+                    self._remember(key, vector)
+                    for i in missing.pop(key):
+                        found[i] = vector
+                        self._stats["disk_hits"] += 1
+
+            self._stats["misses"] += sum(len(positions) for positions in missing.values())
+        return found
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = cache_key(text, self.model_name)
+                vector = list(vector)
+                self._remember(key, vector)
+                rows.append((key, self._pack(vector)))
+
+            if rows and self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+                )
+                count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                overflow = count - self.max_disk_items
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY used ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._stats["evictions"] += overflow
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+            if self._db is not None:
+                stats["disk_items"] = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
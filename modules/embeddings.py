@@ -0,0 +1,237 @@
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from dotenv import load_dotenv
+from typing import List
+from modules.embedding_batcher import EMBEDDING_QUERY_BATCHING, EmbeddingBatcher
+from modules.embedding_cache import EmbeddingCache, normalize_text
+from modules.telemetry import count, log_event
+
+load_dotenv()
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface").lower()
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+EMBEDDING_CACHE_DISK_SIZE = int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "500000"))
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+FAKE_EMBEDDING_MS_PER_TEXT = float(os.getenv("FAKE_EMBEDDING_MS_PER_TEXT", "0"))
+FAKE_EMBEDDING_MS_PER_CALL = float(os.getenv("FAKE_EMBEDDING_MS_PER_CALL", "0"))
+
+
+class FakeEmbeddings:
+    """Offline stand-in for the sentence-transformer: normalized hashed bag of words
+
+    Texts sharing words get similar vectors, so retrieval still behaves sensibly.
+    """
+
+    def __init__(self, dimension=EMBEDDING_DIMENSION, ms_per_text=FAKE_EMBEDDING_MS_PER_TEXT,
+                 ms_per_call=FAKE_EMBEDDING_MS_PER_CALL):
+        self.dimension = dimension
+        self.ms_per_text = ms_per_text
+        # Fixed cost per encode call, like a real model's per-batch overhead
+        self.ms_per_call = ms_per_call
+        # A CPU model already uses every core, so concurrent encode calls queue up behind each other
+        self._busy = threading.Lock()
+
+    def _embed(self, text):
+        vector = [0.0] * self.dimension
+        for word in re.findall(r"\w+", text.lower()):
+            h = zlib.crc32(word.encode("utf-8"))
+            vector[h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else vector
+
+    def embed_documents(self, texts):
+        if self.ms_per_text or self.ms_per_call:
+            with self._busy:
+                time.sleep((self.ms_per_call + self.ms_per_text * len(texts)) / 1000)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class EmbeddingService:
+    """Process-wide embedding model shared by the ingest and query paths"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, cache: EmbeddingCache = None,
+                 query_batching: bool = False):
+        self.model_name = model_name
+        self.cache = cache
+        # Single-query embeds from concurrent sessions share encode calls
+        self.batcher = EmbeddingBatcher(self._encode) if query_batching else None
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "load_seconds": 0.0,
+            "encode_calls": 0,
+            "encode_texts": 0,
+            "encode_seconds": 0.0,
+        }
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def _get_model(self):
+        """Load the model once; concurrent callers wait for the first load"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    if EMBEDDING_BACKEND == "fake":
+                        self._model = FakeEmbeddings()
+                    elif EMBEDDING_BACKEND == "onnx":
+                        from modules.onnx_embeddings import OnnxEmbeddings
+
+                        self._model = OnnxEmbeddings(EMBEDDING_MODEL_NAME)
+                    elif EMBEDDING_BACKEND == "huggingface":
+                        from langchain_huggingface import HuggingFaceEmbeddings
+
+                        self._model = HuggingFaceEmbeddings(
+                            model_name=self.model_name,
+                            model_kwargs={'device': 'cpu'},
+                            encode_kwargs={'normalize_embeddings': True}
+                        )
+                    else:
+                        raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+                    elapsed = time.perf_counter() - start
+                    with self._stats_lock:
+                        self._stats["load_seconds"] = elapsed
+                    log_event(f"🧠 Loaded embedding model {self.model_name} in {elapsed:.2f}s",
+                              event="embedding.model_loaded", model=self.model_name, seconds=round(elapsed, 3))
+        return self._model
+
+    def warm_up(self):
+        """Load the model and run one encode so the first real request is hot"""
+        self._encode(["warm up"])
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        model = self._get_model()
+        start = time.perf_counter()
+        vectors = model.embed_documents(texts)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._stats["encode_calls"] += 1
+            self._stats["encode_texts"] += len(texts)
+            self._stats["encode_seconds"] += elapsed
+        return vectors
+
+    def embed_many(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> List[List[float]]:
+        """Embed texts in fixed-size batches, encoding only cache misses"""
+        if self.cache is None:
+            vectors = []
+            for i in range(0, len(texts), batch_size):
+                vectors.extend(self._encode(texts[i:i + batch_size]))
+            return vectors
+
+        found = self.cache.get_many(texts)
+        count("embedding_cache_hits", len(found))
+        count("embedding_cache_misses", len(texts) - len(found))
+        # Encode each distinct missing text once (whitespace does not change the tokens)
+        pending = {}
+        for i, text in enumerate(texts):
+            if i not in found:
+                pending.setdefault(normalize_text(text), []).append(i)
+
+        missing = list(pending)
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            encoded = self._encode(batch)
+            self.cache.put_many(batch, encoded)
+            for text, vector in zip(batch, encoded):
+                for i in pending[text]:
+                    found[i] = vector
+
+        return [found[i] for i in range(len(texts))]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_many(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.batcher is None:
+            return self.embed_many([text])[0]
+        if self.cache is not None:
+            found = self.cache.get_many([text])
+            count("embedding_cache_hits" if found else "embedding_cache_misses")
+            if found:
+                return found[0]
+        text = normalize_text(text)
+        vector = self.batcher.embed(text)
+        if self.cache is not None:
+            self.cache.put_many([text], [vector])
+        return vector
+
+    def stats(self) -> dict:
+        """Load and encode timings for this process"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["model_name"] = self.model_name
+        stats["loaded"] = self.is_loaded
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.batcher is not None:
+            stats["query_batching"] = self.batcher.stats()
+        if stats["encode_texts"]:
+            stats["texts_per_second"] = round(stats["encode_texts"] / max(stats["encode_seconds"], 1e-9), 1)
+        return stats
+
+
+_service = None
+_service_lock = threading.Lock()
+_warmup_thread = None
+
+
+def _model_name() -> str:
+    # Fake vectors must never be served from a cache built by the real model
+    if EMBEDDING_BACKEND == "fake":
+        return f"fake-hash-{EMBEDDING_DIMENSION}"
+    if EMBEDDING_BACKEND == "onnx":
+        # Close to the torch vectors but not bit-identical, so cached separately
+        from modules.onnx_embeddings import ONNX_QUANTIZE
+
+        return f"{EMBEDDING_MODEL_NAME}#onnx-{ONNX_QUANTIZE}"
+    return EMBEDDING_MODEL_NAME
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Return the shared embedding service, creating it on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                cache = None
+                if EMBEDDING_CACHE_SIZE > 0:
+                    cache = EmbeddingCache(
+                        _model_name(),
+                        max_items=EMBEDDING_CACHE_SIZE,
+                        path=EMBEDDING_CACHE_PATH or None,
+                        max_disk_items=EMBEDDING_CACHE_DISK_SIZE
+                    )
+                _service = EmbeddingService(
+                    model_name=_model_name(),
+                    cache=cache,
+                    query_batching=EMBEDDING_QUERY_BATCHING
+                )
+    return _service
+
+
+def warm_up_in_background() -> threading.Thread:
+    """Start loading the shared model without blocking the caller (once per process)"""
+    global _warmup_thread
+    service = get_embedding_service()
+    with _service_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=service.warm_up,
+                name="embedding-warmup",
+                daemon=True
+            )
+            _warmup_thread.start()
+    return _warmup_thread
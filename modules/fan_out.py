@@ -0,0 +1,196 @@
+import asyncio
+import contextvars
+import os
+import queue
+import re
+import threading
+from dotenv import load_dotenv
+from modules.chunk_store import attach_text
+from modules.context_packing import pack_context
+from modules.embeddings import get_embedding_service
+from modules.llm import agenerate_answer
+from modules.manifest import SessionManifest, get_session_dir, source_filter
+from modules.telemetry import count, log_event, span
+from modules.vector_index import get_vector_index
+
+load_dotenv()
+
+FAN_OUT_MODE = os.getenv("FAN_OUT_MODE", "auto").lower()
+FAN_OUT_CONCURRENCY = int(os.getenv("FAN_OUT_CONCURRENCY", "4"))
+FAN_OUT_QUERY_CONCURRENCY = int(os.getenv("FAN_OUT_QUERY_CONCURRENCY", "8"))
+FAN_OUT_TOP_K = int(os.getenv("FAN_OUT_TOP_K", "8"))
+FAN_OUT_TOKEN_BUDGET = int(os.getenv("FAN_OUT_TOKEN_BUDGET", "1500"))
+
+# Questions about every candidate, where a single global top-k would miss people
+_FAN_OUT_RE = re.compile(
+    r"\b(compare|comparison|versus|vs\.?|rank|ranking|shortlist)\b"
+    r"|\b(all|each|every|both)\b.*\b(candidates?|applicants?|resumes?|people)\b",
+    re.IGNORECASE
+)
+
+_CANDIDATE_INSTRUCTION = (
+    "(The context holds only {name}'s resume. Answer for this candidate only and do not add a "
+    "candidate heading; the answers for all candidates are combined afterwards.)"
+)
+
+
+class Candidate:
+    """One distinct resume in a session; identical uploads share a candidate and its vectors"""
+
+    def __init__(self, name, filenames, paths):
+        self.name = name
+        self.filenames = filenames
+        self.paths = paths
+        self.context = ""
+        self.sources = []
+        self.chunk_ids = []
+        self.answer = None
+
+
+def session_candidates(session_id):
+    """Distinct resumes in a session, ordered by display name"""
+    manifest = SessionManifest(session_id)
+    session_dir = get_session_dir(session_id)
+    by_hash = {}
+    for filename in sorted(manifest.files):
+        by_hash.setdefault(manifest.files[filename]["sha256"], []).append(filename)
+
+    candidates = []
+    for filenames in by_hash.values():
+        profile = manifest.files[filenames[0]].get("profile") or {}
+        candidates.append(Candidate(
+            profile.get("name") or filenames[0],
+            filenames,
+            [os.path.join(session_dir, filename) for filename in filenames]
+        ))
+    return sorted(candidates, key=lambda c: c.name.lower())
+
+
+def should_fan_out(question, candidate_count):
+    """FAN_OUT_MODE=auto fans out comparison / all-candidate questions over two or more resumes"""
+    if FAN_OUT_MODE == "never" or candidate_count < 2:
+        return False
+    return FAN_OUT_MODE == "always" or bool(_FAN_OUT_RE.search(question))
+
+
+def _format_candidate_context(source, segments):
+    source_filename = source.split('/')[-1] if '/' in source else source
+    header = f"\n{'='*60}\n📄 RESUME SOURCE: {source_filename}\n{'='*60}\n"
+    return "\n\n".join([header] + [segment.text for segment in segments])
+
+
+async def _retrieve(index, candidate, question_vector, session_id, semaphore):
+    async with semaphore:
+        with span("vector_query"):
+            res = await asyncio.to_thread(
+                index.query,
+                vector=question_vector,
+                top_k=FAN_OUT_TOP_K,
+                include_metadata=True,
+                namespace=session_id,
+                filter=source_filter(candidate.paths)
+            )
+    matches = attach_text(res["matches"], session_id)
+    count("chunks_retrieved", len(matches))
+    packed = pack_context(matches, question_vector, token_budget=FAN_OUT_TOKEN_BUDGET,
+                          embed_many=get_embedding_service().embed_many)
+    candidate.context = "\n\n".join(_format_candidate_context(source, segments) for source, segments in packed)
+    candidate.sources = [source for source, _ in packed]
+    candidate.chunk_ids = [chunk for _, segments in packed for segment in segments for chunk in segment.ids]
+
+
+async def _retrieve_all(index, candidates, question_vector, session_id):
+    semaphore = asyncio.Semaphore(FAN_OUT_QUERY_CONCURRENCY)
+    await asyncio.gather(*(
+        _retrieve(index, candidate, question_vector, session_id, semaphore) for candidate in candidates
+    ))
+
+
+def retrieve_candidates(question, session_id, candidates=None):
+    """Query the index once per candidate (concurrently) and pack each candidate's own context
+
+    Returns the candidates, the question embedding and the IDs of every chunk used.
+    """
+    candidates = candidates if candidates is not None else session_candidates(session_id)
+    with span("query_embed"):
+        question_vector = get_embedding_service().embed_query(question)
+    asyncio.run(_retrieve_all(get_vector_index(), candidates, question_vector, session_id))
+
+    chunk_ids = [chunk for candidate in candidates for chunk in candidate.chunk_ids]
+    covered = sum(1 for candidate in candidates if candidate.context)
+    log_event(f"🧩 Fan-out retrieval covered {covered}/{len(candidates)} candidates ({len(chunk_ids)} chunks)",
+              event="fan_out.retrieval", session_id=session_id, candidates=len(candidates), covered=covered,
+              chunks=len(chunk_ids))
+    return candidates, question_vector, chunk_ids
+
+
+async def _answer(candidate, question, semaphore, on_answer):
+    if candidate.context:
+        async with semaphore:
+            candidate.answer = await agenerate_answer(
+                candidate.context,
+                f"{question}\n\n{_CANDIDATE_INSTRUCTION.format(name=candidate.name)}"
+            )
+    if on_answer is not None:
+        on_answer(candidate)
+
+
+async def _answer_all(candidates, question, on_answer):
+    semaphore = asyncio.Semaphore(FAN_OUT_CONCURRENCY)
+    await asyncio.gather(*(_answer(candidate, question, semaphore, on_answer) for candidate in candidates))
+
+
+def format_candidate_answer(position, candidate):
+    """One candidate's section of the merged answer"""
+    files = ", ".join(candidate.filenames)
+    body = candidate.answer.strip() if candidate.answer else "*No relevant content found in this resume.*"
+    return f"**Candidate {position}: {candidate.name}** ({files})\n\n{body}"
+
+
+def reduce_answers(candidates):
+    """Merge the per-candidate answers under one heading each, in candidate order"""
+    return "\n\n---\n\n".join(format_candidate_answer(i, c) for i, c in enumerate(candidates, 1))
+
+
+def map_candidates(candidates, question):
+    """Answer the question for every candidate with at most FAN_OUT_CONCURRENCY LLM calls in flight"""
+    asyncio.run(_answer_all(candidates, question, None))
+    return reduce_answers(candidates)
+
+
+def stream_candidates(candidates, question):
+    """Yield each candidate's section as soon as it and every earlier candidate are answered"""
+    finished = queue.Queue()
+    errors = []
+
+    def run():
+        try:
+            asyncio.run(_answer_all(candidates, question, finished.put))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            finished.put(None)
+
+    # Carry the question's trace into the worker thread
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(run,), name="fan-out", daemon=True)
+    worker.start()
+
+    positions = {id(candidate): i for i, candidate in enumerate(candidates)}
+    ready = set()
+    next_position = 0
+    while True:
+        candidate = finished.get()
+        if candidate is None:
+            break
+        ready.add(positions[id(candidate)])
+        while next_position in ready:
+            separator = "\n\n---\n\n" if next_position else ""
+            yield separator + format_candidate_answer(next_position + 1, candidates[next_position])
+            next_position += 1
+    worker.join()
+    if errors:
+        raise errors[0]
+
+
+def candidate_sources(candidates):
+    return list(dict.fromkeys(source for candidate in candidates for source in candidate.sources))
@@ -0,0 +1,366 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+from modules.vector_index import UPSERT_BATCH_SIZE
+
+load_dotenv()
+
+INGEST_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "32"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "256"))
+# "resume" follows resume sections and entries; "recursive" is the plain character splitter
+CHUNK_STRATEGY = os.getenv("CHUNK_STRATEGY", "resume").lower()
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+_DONE = object()
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def _split_recursive(pages):
+    from langchain_core.documents import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+    docs = [Document(page_content=text, metadata={"page": page}) for text, page in pages]
+    return [(chunk.page_content, chunk.metadata.get("page", 0), None)
+            for chunk in text_splitter.split_documents(docs)]
+
+
+def split_pages(pages, strategy=CHUNK_STRATEGY):
+    """Split (text, page) pairs into (text, page, sections) chunks; sections is None for "recursive" """
+    if strategy == "resume":
+        from modules.resume_chunker import split_resume
+
+        return split_resume(pages)
+    if strategy == "recursive":
+        return _split_recursive(pages)
+    raise ValueError(f"Unknown CHUNK_STRATEGY: {strategy}")
+
+
+def chunking_key(strategy=CHUNK_STRATEGY):
+    """Identifies the chunking settings, so cached chunks are only reused under the same ones"""
+    if strategy == "resume":
+        from modules.resume_chunker import RESUME_CHUNK_MAX_TOKENS
+
+        return f"resume/{RESUME_CHUNK_MAX_TOKENS}"
+    return f"recursive/{CHUNK_SIZE}/{CHUNK_OVERLAP}"
+
+
+def parse_pdf(file_path, strategy=CHUNK_STRATEGY):
+    """Parse a PDF into pages, (text, page, sections) chunks and a candidate profile; runs inside a worker process"""
+    from langchain_community.document_loaders import PyPDFLoader
+    from modules.profiles import extract_profile
+
+    started = time.perf_counter()
+    pages = [(doc.page_content, doc.metadata.get("page", 0)) for doc in PyPDFLoader(file_path).load()]
+    loaded = time.perf_counter()
+    chunks = split_pages(pages, strategy)
+    return {
+        "pages": pages,
+        "chunks": chunks,
+        "profile": extract_profile([text for text, _ in pages]),
+        "timings": {"pdf_load": loaded - started, "split": time.perf_counter() - loaded}
+    }
+
+
+def _from_cache(cache, content_hash, strategy=CHUNK_STRATEGY):
+    """A parse_pdf-shaped result from the shared cache, re-splitting cached pages if needed"""
+    entry = cache.get(content_hash) if cache is not None else None
+    if entry is None:
+        return None
+    key = chunking_key(strategy)
+    timings = {}
+    if key not in entry["chunks"]:
+        started = time.perf_counter()
+        entry["chunks"][key] = split_pages(entry["pages"], strategy)
+        timings["split"] = time.perf_counter() - started
+        cache.put(content_hash, entry)
+    return {
+        "pages": entry["pages"],
+        "chunks": [tuple(chunk) for chunk in entry["chunks"][key]],
+        "profile": entry["profile"],
+        "timings": timings,
+    }
+
+
+def get_parse_pool():
+    """Process pool shared by all uploads so workers are started once"""
+    global _parse_pool
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                if INGEST_PARSE_WORKERS > 0:
+                    _parse_pool = ProcessPoolExecutor(max_workers=INGEST_PARSE_WORKERS)
+                else:
+                    # INGEST_PARSE_WORKERS=0 parses in a thread instead of separate processes
+                    _parse_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-parse")
+    return _parse_pool
+
+
+class IngestPipeline:
+    """Streams files through parse -> embed -> upsert with bounded queues between stages
+
+    Upsert batches go to the index's shared upsert pool, which bounds how many are in flight.
+    """
+
+    def __init__(self, index, namespace, embed_model, build_record, parse_cache=None, chunk_store=None,
+                 sparse_index=None, chunk_strategy=CHUNK_STRATEGY,
+                 embed_batch_size=INGEST_EMBED_BATCH_SIZE,
+                 upsert_batch_size=UPSERT_BATCH_SIZE,
+                 queue_size=INGEST_QUEUE_SIZE):
+        self.index = index
+        self.namespace = namespace
+        self.embed_model = embed_model
+        self.build_record = build_record
+        self.parse_cache = parse_cache
+        self.chunk_store = chunk_store
+        self.sparse_index = sparse_index
+        self.chunk_strategy = chunk_strategy
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.chunk_queue = queue.Queue(maxsize=queue_size)
+        self._upsert_futures = []
+        self.stop = threading.Event()
+        self.error = None
+        self.completed_files = []
+        self._remaining = {}
+        self._pending_jobs = []
+        self._pending_vectors = []
+        self._lock = threading.Lock()
+        self.progress = {
+            "files_total": 0,
+            "files_parsed": 0,
+            "files_parse_cached": 0,
+            "files_indexed": 0,
+            "pages": 0,
+            "chunks_parsed": 0,
+            "chunks_embedded": 0,
+            "vectors_upserted": 0,
+            "upsert_batches": 0,
+            "upsert_batch_ms_max": 0.0,
+            "stage_seconds": {"parse": 0.0, "pdf_load": 0.0, "split": 0.0, "embed": 0.0, "upsert": 0.0},
+        }
+
+    def _fail(self, exc):
+        with self._lock:
+            if self.error is None:
+                self.error = exc
+        self.stop.set()
+
+    def _put(self, q, item):
+        """Blocking put that gives up when another stage has failed"""
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _parse_stage(self, jobs):
+        try:
+            pool = get_parse_pool()
+            max_in_flight = max(1, INGEST_PARSE_WORKERS) + 1
+            pending = {}
+            jobs = list(jobs)
+            while (jobs or pending) and not self.stop.is_set():
+                while jobs and len(pending) < max_in_flight:
+                    job = jobs.pop(0)
+                    started = time.perf_counter()
+                    # Bytes any session has uploaded before skip the PDF parser entirely
+                    parsed = _from_cache(self.parse_cache, job["sha256"], self.chunk_strategy)
+                    if parsed is not None:
+                        with self._lock:
+                            self.progress["files_parse_cached"] += 1
+                        if not self._accept_parsed(job, parsed, started):
+                            return
+                        continue
+                    pending[pool.submit(parse_pdf, job["path"], self.chunk_strategy)] = (job, started)
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, started = pending.pop(future)
+                    parsed = future.result()
+                    if self.parse_cache is not None:
+                        self.parse_cache.put(job["sha256"], {
+                            "pages": parsed["pages"],
+                            "profile": parsed["profile"],
+                            "chunks": {chunking_key(self.chunk_strategy): parsed["chunks"]},
+                        })
+                    if not self._accept_parsed(job, parsed, started):
+                        return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(self.chunk_queue, _DONE)
+
+    def _accept_parsed(self, job, parsed, started):
+        """Queue a parsed file's chunks for embedding; False once the pipeline has stopped"""
+        chunks = parsed["chunks"]
+        job["profile"] = parsed["profile"]
+        with self._lock:
+            self.progress["stage_seconds"]["parse"] += time.perf_counter() - started
+            for stage, seconds in parsed["timings"].items():
+                self.progress["stage_seconds"][stage] += seconds
+            self.progress["files_parsed"] += 1
+            self.progress["chunks_parsed"] += len(chunks)
+            self.progress["pages"] += len({page for _, page, _ in chunks})
+            self._remaining[job["key"]] = len(chunks)
+            job["chunks"] = len(chunks)
+        if not chunks:
+            self._file_done(job)
+            return True
+        for ordinal, (text, page, sections) in enumerate(chunks):
+            record = self.build_record(job, ordinal, text, page, sections)
+            if not self._put(self.chunk_queue, (job, record)):
+                return False
+        return True
+
+    def _embed_stage(self):
+        try:
+            finished = False
+            while not finished and not self.stop.is_set():
+                item = self._get(self.chunk_queue)
+                if item is _DONE:
+                    break
+                batch = [item]
+                # Take whatever is already queued, up to one micro-batch
+                while len(batch) < self.embed_batch_size:
+                    try:
+                        item = self.chunk_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        finished = True
+                        break
+                    batch.append(item)
+                self._embed_batch(batch)
+            if not self.stop.is_set():
+                self._flush_upserts()
+            # Wait for outstanding batches so the stage ends when every file is recorded as stored
+            self._reap_upserts(wait=True)
+        except Exception as e:
+            self._fail(e)
+
+    def _embed_batch(self, batch):
+        started = time.perf_counter()
+        embeddings = self.embed_model.embed_many([record["text"] for _, record in batch])
+        with self._lock:
+            self.progress["stage_seconds"]["embed"] += time.perf_counter() - started
+            self.progress["chunks_embedded"] += len(batch)
+        if self.chunk_store is not None:
+            # Text goes to the local chunk store before its vector exists; the index gets IDs and small fields
+            self.chunk_store.put([(record["id"], record["text"]) for _, record in batch])
+            metadatas = [{key: value for key, value in record["metadata"].items() if key != "text"}
+                         for _, record in batch]
+        else:
+            # Without a chunk store the text has nowhere else to come back from
+            metadatas = [record["metadata"] for _, record in batch]
+        if self.sparse_index is not None:
+            self.sparse_index.add([
+                (record["id"], record["text"], metadata) for (_, record), metadata in zip(batch, metadatas)
+            ])
+        for (job, record), embedding, metadata in zip(batch, embeddings, metadatas):
+            self._pending_jobs.append(job)
+            self._pending_vectors.append({"id": record["id"], "values": embedding, "metadata": metadata})
+        while len(self._pending_vectors) >= self.upsert_batch_size:
+            self._flush_upserts(self.upsert_batch_size)
+
+    def _flush_upserts(self, limit=None):
+        """Submit buffered vectors as one upsert batch"""
+        limit = limit or len(self._pending_vectors)
+        if not limit:
+            return
+        jobs, self._pending_jobs = self._pending_jobs[:limit], self._pending_jobs[limit:]
+        vectors, self._pending_vectors = self._pending_vectors[:limit], self._pending_vectors[limit:]
+        future = self.index.submit_upsert(vectors, namespace=self.namespace)
+        self._upsert_futures.append((future, jobs, len(vectors)))
+        self._reap_upserts()
+
+    def _reap_upserts(self, wait=False):
+        """Record finished upsert batches; with `wait`, block until all of them have finished
+
+        Results are handled here on the embed thread rather than in a done callback: futures
+        wake their waiters before running callbacks, so a callback could still be recording
+        files after the stage had ended and run() had returned.
+        """
+        pending = []
+        for future, jobs, count in self._upsert_futures:
+            if wait or future.done():
+                future.exception()
+                self._upsert_done(future, jobs, count)
+            else:
+                pending.append((future, jobs, count))
+        self._upsert_futures = pending
+
+    def _upsert_done(self, future, jobs, count):
+        if future.exception() is not None:
+            self._fail(future.exception())
+            return
+        latency_ms = future.result()
+        with self._lock:
+            self.progress["stage_seconds"]["upsert"] += latency_ms / 1000
+            self.progress["vectors_upserted"] += count
+            self.progress["upsert_batches"] += 1
+            self.progress["upsert_batch_ms_max"] = round(max(self.progress["upsert_batch_ms_max"], latency_ms), 1)
+        for job in jobs:
+            self._chunk_stored(job)
+
+    def _chunk_stored(self, job):
+        with self._lock:
+            self._remaining[job["key"]] -= 1
+            done = self._remaining[job["key"]] == 0
+        if done:
+            self._file_done(job)
+
+    def _file_done(self, job):
+        with self._lock:
+            self.completed_files.append(job)
+            self.progress["files_indexed"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            progress = dict(self.progress)
+            progress["stage_seconds"] = {k: round(v, 3) for k, v in self.progress["stage_seconds"].items()}
+        return progress
+
+    def run(self, jobs, on_progress=None, poll_interval=0.2):
+        """Run all stages concurrently; blocks until every file is stored or a stage fails"""
+        jobs = list(jobs)
+        self.progress["files_total"] = len(jobs)
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._parse_stage, args=(jobs,), name="ingest-parse", daemon=True),
+                   threading.Thread(target=self._embed_stage, name="ingest-embed", daemon=True)]
+        for thread in threads:
+            thread.start()
+        # Progress callbacks run on the caller's thread so UI code can update safely
+        while True:
+            alive = [thread for thread in threads if thread.is_alive()]
+            if not alive:
+                break
+            alive[0].join(timeout=poll_interval)
+            if on_progress:
+                on_progress(self.snapshot())
+        progress = self.snapshot()
+        progress["wall_seconds"] = round(time.perf_counter() - started, 3)
+        if on_progress:
+            on_progress(progress)
+        if self.error is not None:
+            raise self.error
+        return progress
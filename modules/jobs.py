@@ -0,0 +1,216 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dotenv import load_dotenv
+from modules.manifest import file_sha256
+from modules.sessions import record_activity
+from modules.telemetry import get_metrics, log_event
+from modules.vectorstore import upload_pdfs_to_vectorstore
+
+load_dotenv()
+
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+INGEST_JOBS_PER_SESSION = int(os.getenv("INGEST_JOBS_PER_SESSION", "2"))
+INGEST_JOB_QUEUE_LIMIT = int(os.getenv("INGEST_JOB_QUEUE_LIMIT", "100"))
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "200"))
+INGEST_POLL_SECONDS = float(os.getenv("INGEST_POLL_SECONDS", "1"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobLimitError(Exception):
+    """Raised when a session (or the whole process) already has too many ingestion jobs pending"""
+
+
+class IngestJob:
+    """One batch of uploaded files being indexed for a session"""
+
+    def __init__(self, session_id, file_paths, key):
+        self.id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.file_paths = list(file_paths)
+        self.key = key
+        self.state = QUEUED
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.submissions = 1
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def active(self):
+        return self.state in (QUEUED, RUNNING)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "files": [os.path.basename(path) for path in self.file_paths],
+            "state": self.state,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "submissions": self.submissions,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class IngestJobQueue:
+    """Process-wide ingestion queue with a bounded worker pool
+
+    Identical submissions (same session, same file names and contents) still queued or
+    running are coalesced into one job, and each session may only have a few jobs pending.
+    A session's jobs run one at a time, so a worker never sits waiting on that session's lock.
+    """
+
+    def __init__(self, ingest, workers=INGEST_JOB_WORKERS, per_session_limit=INGEST_JOBS_PER_SESSION,
+                 queue_limit=INGEST_JOB_QUEUE_LIMIT, history=INGEST_JOB_HISTORY):
+        self.ingest = ingest
+        self.workers = max(1, workers)
+        self.per_session_limit = per_session_limit
+        self.queue_limit = queue_limit
+        self.history = history
+        self._jobs = OrderedDict()
+        self._queued = []
+        self._active_keys = {}
+        self._running_sessions = set()
+        self._threads = []
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def job_key(session_id, file_paths):
+        return session_id, tuple(sorted((os.path.basename(path), file_sha256(path)) for path in file_paths))
+
+    def submit(self, session_id, file_paths):
+        """Queue files for indexing and return the job (an existing one if the batch is already pending)"""
+        key = self.job_key(session_id, file_paths)
+        with self._cond:
+            existing = self._active_keys.get(key)
+            if existing is not None:
+                existing.submissions += 1
+                get_metrics().inc("ingest_jobs_coalesced")
+                return existing
+
+            pending = [job for job in self._jobs.values() if job.active]
+            if sum(1 for job in pending if job.session_id == session_id) >= self.per_session_limit:
+                raise JobLimitError(
+                    f"This session already has {self.per_session_limit} upload(s) in progress; "
+                    "wait for them to finish"
+                )
+            if len(pending) >= self.queue_limit:
+                raise JobLimitError("The server is busy indexing other uploads; try again shortly")
+
+            job = IngestJob(session_id, file_paths, key)
+            self._jobs[job.id] = job
+            self._queued.append(job)
+            self._active_keys[key] = job
+            self._prune()
+            self._start_workers()
+            self._cond.notify()
+        get_metrics().inc("ingest_jobs_submitted")
+        log_event(f"📥 Queued ingestion job {job.id} with {len(file_paths)} file(s) (Session: {session_id[:8]}...)",
+                  event="ingest_job.queued", session_id=session_id, job_id=job.id, files=len(file_paths))
+        return job
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"ingest-job-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self):
+        for job in self._queued:
+            if job.session_id not in self._running_sessions:
+                self._queued.remove(job)
+                return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                job.state = RUNNING
+                job.started = time.time()
+                self._running_sessions.add(job.session_id)
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._running_sessions.discard(job.session_id)
+                    if self._active_keys.get(job.key) is job:
+                        del self._active_keys[job.key]
+                    self._cond.notify_all()
+
+    def _run(self, job):
+        def on_progress(progress):
+            job.progress = progress
+
+        # A long upload keeps its session alive even if the user has closed the page
+        record_activity(job.session_id, force=True)
+        try:
+            job.result = self.ingest(job.file_paths, job.session_id, on_progress=on_progress)
+            job.state = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.state = FAILED
+            get_metrics().inc("ingest_jobs_failed")
+            log_event(f"❌ Ingestion job {job.id} failed: {e}", event="ingest_job.failed",
+                      level=logging.ERROR, session_id=job.session_id, job_id=job.id, error=repr(e))
+        finally:
+            job.finished = time.time()
+            record_activity(job.session_id, force=True)
+
+    def _prune(self):
+        # Keep every pending job and the most recent finished ones
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def session_jobs(self, session_id):
+        """The session's known jobs, oldest first"""
+        with self._cond:
+            return [job for job in self._jobs.values() if job.session_id == session_id]
+
+    def has_active(self, session_id):
+        return any(job.active for job in self.session_jobs(session_id))
+
+    def position(self, job):
+        """Number of queued jobs ahead of this one"""
+        with self._cond:
+            return self._queued.index(job) if job in self._queued else 0
+
+    def stats(self):
+        with self._cond:
+            states = [job.state for job in self._jobs.values()]
+        return {state: states.count(state) for state in (QUEUED, RUNNING, DONE, FAILED)}
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide ingestion queue, started on first use"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = IngestJobQueue(upload_pdfs_to_vectorstore)
+    return _queue
@@ -1,23 +1,20 @@
-from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
-from langchain_groq import ChatGroq
+import asyncio
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from modules.context_packing import estimate_tokens
+from modules.rate_limits import get_call_limit
+from modules.telemetry import count, current_trace, span
 
 load_dotenv()
 
-def get_llm_chain(retriever):
-    """Create LLM chain with retriever"""
-    
-    llm = ChatGroq(
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-        model_name="llama-3.3-70b-versatile",
-        temperature=0.0
-    )
-
-    prompt = PromptTemplate(
-        input_variables=["context", "question"],
-        template="""
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq").lower()
+LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "llama-3.3-70b-versatile")
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))
+FAKE_LLM_TOKEN_MS = float(os.getenv("FAKE_LLM_TOKEN_MS", "10"))
+
+RESUME_PROMPT_TEMPLATE = """
     About this bot: You are **Noddy Bot**, an expert AI decision making system assistant specialized in analyzing and extracting information from candidate resumes. the developer of the bot is **Abeer Kapoor**
 
     ---
@@ -86,12 +83,118 @@ def get_llm_chain(retriever):
 
     **Answer**:
     """
-    )
-
-    return RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=retriever,
-        chain_type_kwargs={"prompt": prompt},
-        return_source_documents=True
-    )
+
+_llm = None
+_prompt = None
+_lock = threading.Lock()
+
+
+class _FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeStreamingLLM:
+    """Offline stand-in for ChatGroq with a configurable time to first token and per-token delay"""
+
+    def __init__(self, latency_ms=FAKE_LLM_LATENCY_MS, token_ms=FAKE_LLM_TOKEN_MS):
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+
+    def _answer(self, prompt):
+        question = prompt.rsplit("**User Question**:", 1)[-1].split("---", 1)[0].strip()
+        return f"Fake answer to '{question}' using a {len(prompt)}-character prompt."
+
+    def stream(self, prompt):
+        time.sleep(self.latency_ms / 1000)
+        for i, word in enumerate(self._answer(prompt).split(" ")):
+            if i:
+                time.sleep(self.token_ms / 1000)
+            yield _FakeMessage(word if i == 0 else " " + word)
+
+    def invoke(self, prompt):
+        return _FakeMessage("".join(chunk.content for chunk in self.stream(prompt)))
+
+    async def ainvoke(self, prompt):
+        answer = self._answer(prompt)
+        await asyncio.sleep((self.latency_ms + self.token_ms * answer.count(" ")) / 1000)
+        return _FakeMessage(answer)
+
+
+def get_llm():
+    """Return the process-wide chat model (LLM_BACKEND=groq|fake)"""
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                if LLM_BACKEND == "fake":
+                    _llm = FakeStreamingLLM()
+                elif LLM_BACKEND == "groq":
+                    from langchain_groq import ChatGroq
+
+                    _llm = ChatGroq(
+                        groq_api_key=os.getenv("GROQ_API_KEY"),
+                        model_name=LLM_MODEL_NAME,
+                        temperature=0.0
+                    )
+                else:
+                    raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
+    return _llm
+
+
+def get_prompt():
+    """Return the resume QA prompt, built once per process"""
+    global _prompt
+    if _prompt is None:
+        from langchain.prompts import PromptTemplate
+
+        _prompt = PromptTemplate(
+            input_variables=["context", "question"],
+            template=RESUME_PROMPT_TEMPLATE
+        )
+    return _prompt
+
+
+def build_prompt(context, question):
+    return get_prompt().format(context=context, question=question)
+
+
+def stream_answer(context, question):
+    """Yield answer text as the model produces it"""
+    prompt = build_prompt(context, question)
+    prompt_tokens = estimate_tokens(prompt)
+    count("prompt_tokens", prompt_tokens)
+    active = current_trace()
+    started = time.perf_counter()
+    parts = []
+    with get_call_limit("llm").slot(prompt_tokens), span("llm"):
+        for chunk in get_llm().stream(prompt):
+            if chunk.content:
+                if not parts and active is not None:
+                    active.add_span("first_token", time.perf_counter() - started, started)
+                parts.append(chunk.content)
+                yield chunk.content
+    count("completion_tokens", estimate_tokens("".join(parts)) if parts else 0)
+
+
+def generate_answer(context, question):
+    """Return the full answer text in one call"""
+    prompt = build_prompt(context, question)
+    prompt_tokens = estimate_tokens(prompt)
+    count("prompt_tokens", prompt_tokens)
+    with get_call_limit("llm").slot(prompt_tokens), span("llm"):
+        answer = get_llm().invoke(prompt).content
+    count("completion_tokens", estimate_tokens(answer))
+    return answer
+
+
+async def agenerate_answer(context, question):
+    """Return the full answer text without blocking the event loop"""
+    prompt = build_prompt(context, question)
+    prompt_tokens = estimate_tokens(prompt)
+    count("prompt_tokens", prompt_tokens)
+    async with get_call_limit("llm").aslot(prompt_tokens):
+        with span("llm"):
+            answer = (await get_llm().ainvoke(prompt)).content
+    count("completion_tokens", estimate_tokens(answer))
+    return answer
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+UPLOAD_ROOT = os.getenv("UPLOAD_ROOT", "./uploaded_docs")
+MANIFEST_FILENAME = ".manifest.json"
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+# Hashes of files written by the upload store, keyed by inode, size and mtime
+_known_hashes = OrderedDict()
+_known_hashes_lock = threading.Lock()
+_KNOWN_HASHES_MAX = 4096
+
+
+def get_session_dir(session_id):
+    """Directory holding this session's uploaded PDFs and bookkeeping files"""
+    return os.path.join(UPLOAD_ROOT, session_id)
+
+
+def session_lock(session_id):
+    """Per-session lock so concurrent uploads do not race on the manifest"""
+    with _locks_guard:
+        if session_id not in _locks:
+            _locks[session_id] = threading.RLock()
+        return _locks[session_id]
+
+
+def _file_identity(file_path):
+    stat = os.stat(file_path)
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def remember_sha256(file_path, content_hash):
+    """Record a hash computed while writing the file, so file_sha256 need not read it again"""
+    key = _file_identity(file_path)
+    with _known_hashes_lock:
+        _known_hashes[key] = content_hash
+        _known_hashes.move_to_end(key)
+        while len(_known_hashes) > _KNOWN_HASHES_MAX:
+            _known_hashes.popitem(last=False)
+
+
+def file_sha256(file_path, block_size=1024 * 1024):
+    """Hash a file's contents without reading it into memory at once"""
+    key = _file_identity(file_path)
+    with _known_hashes_lock:
+        known = _known_hashes.get(key)
+    if known is not None:
+        return known
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(content_hash, ordinal):
+    """Stable vector ID for the n-th chunk of a file's contents"""
+    return f"{content_hash[:32]}-{ordinal}"
+
+
+def source_id(file_path):
+    """The `source` stored with a file's vectors: its name in the session folder"""
+    return os.path.basename(file_path)
+
+
+def source_filter(file_paths):
+    """Metadata filter matching the chunks of these files
+
+    Vectors stored before source IDs hold the full path instead, so both forms match.
+    """
+    values = list(file_paths) + [source_id(path) for path in file_paths]
+    return {"source": {"$in": list(dict.fromkeys(values))}}
+
+
+class SessionManifest:
+    """Record of which files are indexed in a session namespace and under which vector IDs"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.path = os.path.join(get_session_dir(session_id), MANIFEST_FILENAME)
+        self.files = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    def get(self, filename):
+        return self.files.get(filename)
+
+    def add(self, filename, content_hash, chunk_count, profile=None):
+        self.files[filename] = {"sha256": content_hash, "chunks": chunk_count, "profile": profile}
+
+    def profiles(self):
+        """Candidate profiles extracted at ingest time, keyed by filename"""
+        return {filename: entry["profile"] for filename, entry in self.files.items() if entry.get("profile")}
+
+    def remove(self, filename):
+        return self.files.pop(filename, None)
+
+    def find_by_hash(self, content_hash):
+        """Name of an already indexed file with identical contents, if any"""
+        for filename, entry in self.files.items():
+            if entry["sha256"] == content_hash:
+                return filename
+        return None
+
+    def vector_ids(self, filename):
+        entry = self.files.get(filename)
+        if not entry:
+            return []
+        return [chunk_id(entry["sha256"], i) for i in range(entry["chunks"])]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.files = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+from dotenv import load_dotenv
+from typing import List
+
+load_dotenv()
+
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./.cache/onnx")
+ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "int8").lower()
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+ONNX_BATCH_SIZE = int(os.getenv("ONNX_BATCH_SIZE", "32"))
+# sentence-transformers truncates all-MiniLM-L6-v2 inputs at 256 tokens
+DEFAULT_MAX_LENGTH = 256
+
+MODEL_FILENAME = "model.onnx"
+QUANTIZED_FILENAME = "model.int8.onnx"
+CONFIG_FILENAME = "onnx_config.json"
+
+_export_lock = threading.Lock()
+
+
+def model_dir(model_name, root=ONNX_MODEL_DIR):
+    """Directory holding the exported model and tokenizer for `model_name`"""
+    return os.path.join(root, model_name.replace("/", "__"))
+
+
+def model_path(directory, quantize=ONNX_QUANTIZE):
+    return os.path.join(directory, QUANTIZED_FILENAME if quantize == "int8" else MODEL_FILENAME)
+
+
+def export_onnx(model_name, directory, quantize=ONNX_QUANTIZE):
+    """Export a sentence-transformers model to ONNX (and int8) once; needs torch only for the export"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(directory, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    tokenizer.save_pretrained(directory)
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    fp32_path = os.path.join(directory, MODEL_FILENAME)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+
+    if quantize == "int8":
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(fp32_path, os.path.join(directory, QUANTIZED_FILENAME), weight_type=QuantType.QInt8)
+
+    with open(os.path.join(directory, CONFIG_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "max_length": st_model.max_seq_length or DEFAULT_MAX_LENGTH,
+            "inputs": input_names,
+            "pad_token": tokenizer.pad_token,
+            "pad_id": tokenizer.pad_token_id,
+        }, f, indent=2)
+    return directory
+
+
+class OnnxEmbeddings:
+    """all-MiniLM-style sentence embeddings on ONNX Runtime: mean pooling + L2 normalization
+
+    Matches HuggingFaceEmbeddings(encode_kwargs={'normalize_embeddings': True}) without
+    importing torch at runtime.
+    """
+
+    def __init__(self, model_name, directory=None, quantize=ONNX_QUANTIZE, threads=ONNX_THREADS,
+                 batch_size=ONNX_BATCH_SIZE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        directory = directory or model_dir(model_name)
+        path = model_path(directory, quantize)
+        if not os.path.exists(path):
+            with _export_lock:
+                if not os.path.exists(path):
+                    export_onnx(model_name, directory, quantize)
+
+        with open(os.path.join(directory, CONFIG_FILENAME), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.inputs = config["inputs"]
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_length"])
+        self.tokenizer.enable_padding(pad_id=config["pad_id"], pad_token=config["pad_token"])
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+    def _encode_batch(self, texts):
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        features = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: features[name] for name in self.inputs})[0]
+
+        # Mean over real tokens, then unit length (sentence-transformers Pooling + Normalize)
+        mask = features["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        # Group similar lengths so short texts are not padded to the longest one
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            positions = order[start:start + self.batch_size]
+            encoded = self._encode_batch([texts[i] for i in positions])
+            for i, vector in zip(positions, encoded):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dotenv import load_dotenv
+from typing import Optional
+from modules.telemetry import log_event
+
+load_dotenv()
+
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", "./.cache/parsed.sqlite")
+PARSE_CACHE_MAX_MB = float(os.getenv("PARSE_CACHE_MAX_MB", "256"))
+# Bump when parsing changes so stale page text is not reused
+PARSER_VERSION = 2
+
+
+class ParseCache:
+    """Parsed PDFs (page text, chunks and profile) keyed by the file's SHA-256
+
+    Identical bytes uploaded by any session are parsed once. Entries live in a SQLite file,
+    so every process on the host shares them, and the least recently used are evicted once
+    the compressed payloads exceed `max_bytes`. Chunks are stored per chunking setting
+    under "chunks", e.g. {"resume/160": [[text, page, sections], ...]}.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _key(content_hash: str) -> str:
+        return f"{content_hash}:v{PARSER_VERSION}"
+
+    def get(self, content_hash: str) -> Optional[dict]:
+        key = self._key(content_hash)
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM parsed WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE parsed SET used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self._stats["hits"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, content_hash: str, parsed: dict):
+        payload = zlib.compress(json.dumps(parsed).encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO parsed (key, payload, size, used) VALUES (?, ?, ?, ?)",
+                (self._key(content_hash), payload, len(payload), time.time())
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the total size fits; caller holds the lock"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM parsed").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM parsed ORDER BY used"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM parsed WHERE key = ?", doomed)
+        self._stats["evictions"] += len(doomed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"], stats["bytes"] = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parsed"
+            ).fetchone()
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """Return the shared parse cache, or None when PARSE_CACHE_PATH is empty"""
+    global _cache
+    if _cache is None and PARSE_CACHE_PATH:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache(PARSE_CACHE_PATH, int(PARSE_CACHE_MAX_MB * 1024 * 1024))
+                log_event(f"🗂️ Parse cache at {PARSE_CACHE_PATH} ({_cache.stats()['entries']} entries)",
+                          event="parse_cache.opened", path=PARSE_CACHE_PATH)
+    return _cache
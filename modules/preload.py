@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from modules.telemetry import get_metrics, log_event
+
+load_dotenv()
+
+STARTUP_PRELOAD = os.getenv("STARTUP_PRELOAD", "true").lower() == "true"
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "true").lower() == "true"
+
+_preload_thread = None
+_preload_lock = threading.Lock()
+
+
+def _import_langchain():
+    from langchain_core.documents import Document  # noqa: F401
+    from langchain_community.document_loaders import PyPDFLoader  # noqa: F401
+    from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: F401
+
+
+def _preload_steps():
+    from modules.embeddings import warm_up_in_background
+    from modules.llm import get_llm, get_prompt
+    from modules.vector_index import get_vector_index
+
+    steps = [
+        ("langchain", _import_langchain),
+        ("prompt", get_prompt),
+        ("llm", get_llm),
+        ("vector_index", get_vector_index),
+    ]
+    if EMBEDDING_WARMUP:
+        # The model load is the slowest step; it gets its own thread and runs alongside the rest
+        steps.insert(0, ("embedding_model", warm_up_in_background))
+    return steps
+
+
+def _preload():
+    started = time.perf_counter()
+    for name, step in _preload_steps():
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            # Preloading is best effort; the first real request reports the error properly
+            log_event(f"⚠️ Preloading {name} failed: {e}", event="startup.preload_failed", step=name, error=repr(e))
+            continue
+        get_metrics().observe(name, time.perf_counter() - step_started, operation="preload")
+    log_event(f"🔥 Preloaded dependencies in {time.perf_counter() - started:.2f}s", event="startup.preloaded",
+              seconds=round(time.perf_counter() - started, 3))
+
+
+def preload_in_background() -> threading.Thread:
+    """Import heavy dependencies and build shared clients off the request path (once per process)
+
+    Called after the first page render, so the first question or upload finds them ready
+    without the page waiting for them.
+    """
+    global _preload_thread
+    with _preload_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=_preload, name="startup-preload", daemon=True)
+            _preload_thread.start()
+    return _preload_thread
@@ -0,0 +1,152 @@
+import re
+from datetime import date
+
+# Section headings as listed in the resume reading guidelines of the QA prompt
+SECTION_HEADINGS = {
+    "summary": ["summary", "objective", "profile", "about me", "professional summary", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "internships", "internship", "employment"],
+    "education": ["education", "academic background", "academics", "qualifications", "educational qualifications"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "skill set", "soft skills",
+               "tools", "technologies", "languages", "programming languages"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses & certifications",
+                       "courses", "training"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments"],
+}
+
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[\s.-]?)?(?:\(?\d{2,5}\)?[\s.-]?)?\d{3,5}[\s.-]?\d{4,5}")
+LINK_RE = re.compile(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com)/[A-Za-z0-9_/.-]+", re.IGNORECASE)
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+_DATE = r"(?:(?P<{p}m>[A-Za-z]{{3,9}}\.?|\d{{1,2}})[\s/.-]+)?(?P<{p}y>(?:19|20)\d{{2}})"
+DATE_RANGE_RE = re.compile(
+    _DATE.format(p="s") + r"\s*(?:-|–|—|to|till|until)\s*(?:" + _DATE.format(p="e") +
+    r"|(?P<present>present|current|now|date|ongoing))",
+    re.IGNORECASE
+)
+
+
+def section_for_heading(line):
+    """Section name if the line is a resume heading such as "WORK EXPERIENCE" or "Skills: Python" """
+    if ":" in line:
+        line = line.split(":", 1)[0]
+    cleaned = re.sub(r"[^a-z& ]", "", line.lower()).strip()
+    if not cleaned or len(cleaned) > 40:
+        return None
+    return _HEADING_LOOKUP.get(cleaned)
+
+
+def split_sections(lines):
+    """Group lines under the most recent heading; text before any heading is the "header" section"""
+    sections = {"header": []}
+    current = "header"
+    for line in lines:
+        heading = section_for_heading(line)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            # "Skills: Python, SQL" keeps the text after the colon
+            if ":" in line and line.split(":", 1)[1].strip():
+                sections[current].append(line.split(":", 1)[1].strip())
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _guess_name(lines):
+    for line in lines[:8]:
+        candidate = line.strip()
+        if not candidate or EMAIL_RE.search(candidate) or re.search(r"\d", candidate):
+            continue
+        if section_for_heading(candidate):
+            continue
+        words = candidate.replace(",", " ").split()
+        if 2 <= len(words) <= 4 and all(re.fullmatch(r"[A-Za-z.'-]+", w) for w in words):
+            return " ".join(w.capitalize() if w.isupper() else w for w in words)
+    return None
+
+
+def _split_skills(lines):
+    skills = []
+    for line in lines:
+        # "Languages: Python, Java" -> "Python, Java"
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        # A spaced slash separates skills; a bare one is part of a name (CI/CD, TCP/IP, PL/SQL)
+        for item in re.split(r"[,;|•·▪●]|\s{2,}|\s[-/]\s", line):
+            item = item.strip(" .-\t")
+            if item and len(item) <= 40 and not section_for_heading(item):
+                skills.append(item)
+    return list(dict.fromkeys(skills))
+
+
+def _month(value):
+    if not value:
+        return 1
+    if value.isdigit():
+        return min(max(int(value), 1), 12)
+    return _MONTHS.get(value[:3].lower(), 1)
+
+
+def find_date_ranges(text, today=None):
+    """Date ranges like "Jan 2020 - Present" or "2018 – 2021" as (start, end) month tuples"""
+    today = today or date.today()
+    ranges = []
+    for match in DATE_RANGE_RE.finditer(text):
+        start = (int(match.group("sy")), _month(match.group("sm")))
+        if match.group("present"):
+            end = (today.year, today.month)
+        else:
+            end = (int(match.group("ey")), _month(match.group("em")) if match.group("em") else 12)
+        if end >= start:
+            ranges.append({"text": match.group(0).strip(), "start": list(start), "end": list(end)})
+    return ranges
+
+
+def total_years(ranges):
+    """Years covered by the union of date ranges (overlapping roles are not double counted)"""
+    intervals = sorted((r["start"][0] * 12 + r["start"][1], r["end"][0] * 12 + r["end"][1]) for r in ranges)
+    months = 0
+    current_start, current_end = None, None
+    for start, end in intervals:
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        months += current_end - current_start
+    return round(months / 12, 1)
+
+
+def extract_profile(pages):
+    """Build a compact candidate profile from a resume's page texts"""
+    text = "\n".join(pages)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    sections = split_sections(lines)
+
+    phones = []
+    for match in PHONE_RE.finditer("\n".join(sections.get("header", []) + lines[:15])):
+        digits = re.sub(r"\D", "", match.group(0))
+        if 10 <= len(digits) <= 15 and not re.fullmatch(r"(19|20)\d{2}(19|20)\d{2}", digits[:8]):
+            phones.append(match.group(0).strip())
+
+    experience_ranges = find_date_ranges("\n".join(sections.get("experience", [])))
+
+    return {
+        "name": _guess_name(lines),
+        "emails": list(dict.fromkeys(EMAIL_RE.findall(text))),
+        "phones": list(dict.fromkeys(phones)),
+        "links": list(dict.fromkeys(LINK_RE.findall(text))),
+        "skills": _split_skills(sections.get("skills", [])),
+        "education": sections.get("education", [])[:6],
+        "certifications": sections.get("certifications", [])[:10],
+        "experience_ranges": experience_ranges,
+        "years_experience": total_years(experience_ranges),
+    }
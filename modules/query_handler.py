@@ -1,122 +1,529 @@
+import logging
 import os
+import re
 from dotenv import load_dotenv
-from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
-from pinecone import Pinecone
-from modules.llm import get_llm_chain
-from langchain.schema import BaseRetriever
-from pydantic import Field
-from typing import List, Optional
+from modules.answer_cache import get_answer_cache
+from modules.bm25_index import BM25_INDEX_ENABLED, get_bm25_index, reciprocal_rank_fusion
+from modules.chunk_store import attach_text
+from modules.context_packing import estimate_tokens, pack_context
+from modules.llm import generate_answer, stream_answer
+from modules.embeddings import get_embedding_service
+from modules.fan_out import (
+    FAN_OUT_MODE, candidate_sources, map_candidates, retrieve_candidates, session_candidates,
+    should_fan_out, stream_candidates
+)
+from modules.manifest import SessionManifest, get_session_dir, source_filter
+from modules.telemetry import count, log_event, span, trace
+from modules.vector_index import get_vector_index
+from typing import TYPE_CHECKING, Iterator, List
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
 
 load_dotenv()
 
-class SimpleRetriever(BaseRetriever):
-    tags: Optional[List[str]] = Field(default_factory=list)
-    metadata: Optional[dict] = Field(default_factory=dict)
+NO_DOCUMENTS_RESPONSE = "I couldn't find any relevant information in the uploaded documents."
+PROFILE_ROUTER_ENABLED = os.getenv("PROFILE_ROUTER_ENABLED", "true").lower() == "true"
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "20"))
+RETRIEVAL_SECTION_FILTER = os.getenv("RETRIEVAL_SECTION_FILTER", "false").lower() == "true"
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+HYBRID_TOP_K = int(os.getenv("HYBRID_TOP_K", "16"))
+HYBRID_SPARSE_K = int(os.getenv("HYBRID_SPARSE_K", "20"))
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
 
-    def __init__(self, documents: List[Document]):
-        super().__init__()
-        self._docs = documents
+# Questions that need reasoning over the resumes always go to the LLM
+_OPEN_ENDED_RE = re.compile(
+    r"\b(compare|comparison|why|explain|summari[sz]e|describe|rate|rank|best|better|suitable|fit|recommend|"
+    r"evaluate|assess|strengths?|weakness(es)?|how (good|well)|tell me about|opinion)\b",
+    re.IGNORECASE
+)
+_NAMES_RE = re.compile(
+    r"\b(name|names|list|who are|show)\b.*\b(candidates?|applicants?|resumes?|people)\b"
+    r"|\bhow many (candidates|applicants|resumes)\b",
+    re.IGNORECASE
+)
+_FILTER_RE = re.compile(
+    r"\b(?:who|which (?:candidates?|applicants?|people)|anyone|any candidates?|candidates?)\b.*?"
+    r"\b(?:knows?|has|have|with|uses?|using|skilled in|experienced? (?:in|with))\s+(?P<term>[^?]+?)"
+    r"(?:\s+(?:skills?|experience|knowledge))?\s*\??$",
+    re.IGNORECASE
+)
+_FIELD_PATTERNS = [
+    ("emails", re.compile(r"\be-?mails?\b", re.IGNORECASE)),
+    ("phones", re.compile(r"\b(phone|mobile|contact numbers?|phone numbers?)\b", re.IGNORECASE)),
+    ("links", re.compile(r"\b(linkedin|github)\b", re.IGNORECASE)),
+    ("years_experience", re.compile(r"\b(years? of (work )?experience|how many years|total experience)\b", re.IGNORECASE)),
+    ("skills", re.compile(r"\bskills?\b", re.IGNORECASE)),
+    ("education", re.compile(r"\b(education|degrees?|qualifications?|universit(y|ies)|college)\b", re.IGNORECASE)),
+]
+# Questions clearly about one resume section; "experience" and "skills" overlap too much to filter on
+_SECTION_PATTERNS = [
+    ("education", re.compile(r"\b(education|degrees?|stud(y|ied)|universit(y|ies)|college|graduat\w*|gpa)\b",
+                             re.IGNORECASE)),
+    ("certifications", re.compile(r"\b(certifi\w*|licen[cs]es?|courses?)\b", re.IGNORECASE)),
+    ("projects", re.compile(r"\bprojects?\b", re.IGNORECASE)),
+    ("achievements", re.compile(r"\b(achievements?|awards?|honou?rs?|accomplishments?)\b", re.IGNORECASE)),
+]
+_FIELD_LABELS = {
+    "emails": "Email",
+    "phones": "Phone",
+    "links": "Links",
+    "years_experience": "Years of experience",
+    "skills": "Skills",
+    "education": "Education",
+}
 
-    def _get_relevant_documents(self, query: str) -> List[Document]:
-        return self._docs
 
-def ask_question(question: str, session_id: str):
-    """Process a question and return answer with sources (session-isolated)"""
-    try:
-        print(f"🔍 User query: {question} (Session: {session_id[:8]}...)")
-        
-        # Initialize Pinecone
-        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        index = pc.Index(os.getenv("PINECONE_INDEX_NAME", "babybot-medical-index"))
-        
-        # Initialize embeddings
-        embed_model = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-        
-        # Embed the query
+def question_sections(question: str) -> List[str]:
+    """Resume sections a question is specifically about, e.g. ["education"] for "Where did she study?" """
+    return [section for section, pattern in _SECTION_PATTERNS if pattern.search(question)]
+
+
+def retrieve_context(question: str, session_id: str, sections: List[str] = None, sources: List[str] = None):
+    """Retrieve this session's most relevant chunks, balanced across source documents
+
+    `sections` limits retrieval to chunks tagged with those resume sections (with
+    RETRIEVAL_SECTION_FILTER=true they are inferred from the question). If nothing is
+    tagged with them, for example in files chunked before sections existed, all chunks
+    are searched. `sources` limits retrieval to those files' chunks.
+    With RETRIEVAL_MODE=hybrid the vector matches are fused with the session's BM25
+    keyword matches, so chunks naming an exact skill or certification are found even
+    when their embedding is not close to the question's.
+    Returns the context documents, the question embedding and the IDs of the chunks used.
+    """
+    # Shared vector index (Pinecone or local, see VECTOR_BACKEND)
+    index = get_vector_index()
+
+    # Shared embedding model (loaded once per process)
+    embed_model = get_embedding_service()
+
+    # Embed the query
+    with span("query_embed"):
         embedded_query = embed_model.embed_query(question)
-        
-        # Query Pinecone with session namespace (only this user's documents)
+
+    if sections is None and RETRIEVAL_SECTION_FILTER:
+        sections = question_sections(question)
+    file_filter = source_filter(sources) if sources else None
+    section_filter = {"section": {"$in": sections}} if sections else None
+    query_filter = {"$and": [file_filter, section_filter]} if file_filter and section_filter \
+        else file_filter or section_filter
+
+    # Query the index with session namespace (only this user's documents)
+    with span("vector_query"):
         res = index.query(
-            vector=embedded_query, 
-            top_k=20, 
+            vector=embedded_query,
+            top_k=RETRIEVAL_TOP_K,
             include_metadata=True,
-            namespace=session_id
+            namespace=session_id,
+            filter=query_filter
         )
-        
-        print(f"📊 Retrieved {len(res['matches'])} chunks from Pinecone")
-        
-        # Group chunks by source document
-        chunks_by_source = {}
-        for match in res["matches"]:
-            text = match["metadata"].get("text", "").strip()
-            if text:
-                source = match["metadata"].get("source", "unknown")
-                if source not in chunks_by_source:
-                    chunks_by_source[source] = []
-                chunks_by_source[source].append({
-                    "text": text,
-                    "metadata": match["metadata"],
-                    "score": match.get("score", 0)
-                })
-        
-        print(f"📁 Found chunks from {len(chunks_by_source)} different documents: {list(chunks_by_source.keys())}")
-        
-        # Build documents with clear source separation
-        docs = []
-        chunks_per_doc = max(3, 10 // len(chunks_by_source)) if chunks_by_source else 10
-        
-        for source, chunks in chunks_by_source.items():
-            # Sort chunks by relevance score
-            chunks.sort(key=lambda x: x["score"], reverse=True)
-            
-            # Add header to identify source
-            source_filename = source.split('/')[-1] if '/' in source else source
-            header_doc = Document(
-                page_content=f"\n{'='*60}\n📄 RESUME SOURCE: {source_filename}\n{'='*60}\n",
-                metadata={"source": source, "type": "header"}
+        if sections and not res["matches"]:
+            query_filter = file_filter
+            res = index.query(
+                vector=embedded_query,
+                top_k=RETRIEVAL_TOP_K,
+                include_metadata=True,
+                namespace=session_id,
+                filter=query_filter
             )
-            docs.append(header_doc)
-            
-            # Add top chunks from this resume
-            for chunk in chunks[:chunks_per_doc]:
-                docs.append(Document(
-                    page_content=chunk["text"],
-                    metadata=chunk["metadata"]
-                ))
-        
-        print(f"✅ Using {len(docs)} documents from {len(chunks_by_source)} source file(s)")
-        
+    matches = res["matches"]
+    count("chunks_retrieved", len(matches))
+
+    log_event(f"📊 Retrieved {len(matches)} chunks from the vector index",
+              event="retrieval.matches", session_id=session_id, matches=len(matches))
+
+    if RETRIEVAL_MODE == "hybrid" and BM25_INDEX_ENABLED:
+        with span("sparse_query"):
+            sparse = get_bm25_index(session_id).search(question, HYBRID_SPARSE_K, query_filter)
+        count("sparse_chunks_retrieved", len(sparse))
+        matches = _fuse(matches, sparse)
+
+    with span("context_build"):
+        # The index returns IDs and small fields; the text comes from the local chunk store
+        matches = attach_text(matches, session_id)
+        docs, chunk_ids, packed = _build_documents(matches, embedded_query, embed_model)
+
+    tokens = sum(estimate_tokens(doc.page_content) for doc in docs)
+    count("context_tokens", tokens)
+    log_event(
+        f"✅ Using {len(docs)} documents (~{tokens} tokens) from {len(packed)} source file(s): {[source for source, _ in packed]}",
+        event="retrieval.context", session_id=session_id, documents=len(docs), tokens=tokens,
+        sources=[source for source, _ in packed]
+    )
+
+    return docs, embedded_query, chunk_ids
+
+
+def _fuse(dense, sparse, top_k=None, rrf_k=None):
+    """Keep the best chunks of the vector and BM25 rankings by reciprocal rank fusion
+
+    Each kept match's score becomes its fused score, which is what context packing
+    ranks by.
+    """
+    top_k = HYBRID_TOP_K if top_k is None else top_k
+    rrf_k = HYBRID_RRF_K if rrf_k is None else rrf_k
+    by_id = {match["id"]: match for match in sparse}
+    by_id.update((match["id"], match) for match in dense)
+    fused = reciprocal_rank_fusion([[match["id"] for match in dense], [match["id"] for match in sparse]], rrf_k)
+    matches = []
+    for vector_id, score in fused[:top_k]:
+        # Pinecone matches are ScoredVector models, which dict() cannot copy
+        match = by_id[vector_id]
+        matches.append({"id": vector_id, "score": score, "values": match.get("values"),
+                        "metadata": dict(match.get("metadata") or {})})
+    return matches
+
+
+def _build_documents(matches, embedded_query, embed_model):
+    # langchain_core costs ~0.5 s to import, so it stays off the app's startup path
+    from langchain_core.documents import Document
+
+    # Merge adjacent chunks, drop redundant ones and share the token budget across resumes
+    packed = pack_context(matches, embedded_query, embed_many=embed_model.embed_many)
+
+    # Build documents with clear source separation
+    docs = []
+    chunk_ids = []
+
+    for source, segments in packed:
+        # Add header to identify source
+        source_filename = source.split('/')[-1] if '/' in source else source
+        header_doc = Document(
+            page_content=f"\n{'='*60}\n📄 RESUME SOURCE: {source_filename}\n{'='*60}\n",
+            metadata={"source": source, "type": "header"}
+        )
+        docs.append(header_doc)
+
+        # Add the selected passages from this resume in reading order
+        for segment in segments:
+            docs.append(Document(
+                page_content=segment.text,
+                metadata={"source": source, "page": segment.page}
+            ))
+            chunk_ids.extend(segment.ids)
+
+    return docs, chunk_ids, packed
+
+
+def _cache_generation(session_id: str):
+    cache = get_answer_cache()
+    return cache.generation(session_id) if cache is not None else None
+
+
+def _cached_answer(session_id: str, question_vector, chunk_ids):
+    cache = get_answer_cache()
+    if cache is None:
+        return None
+    hit = cache.lookup(session_id, question_vector, chunk_ids)
+    count("answer_cache_hits" if hit else "answer_cache_misses")
+    if hit:
+        log_event(f"⚡ Answer cache hit (similarity {hit['similarity']:.3f})",
+                  event="answer_cache.hit", session_id=session_id, similarity=round(hit["similarity"], 4))
+    return hit
+
+
+def _remember_answer(question: str, session_id: str, question_vector, chunk_ids, response, sources, generation):
+    cache = get_answer_cache()
+    if cache is not None and response:
+        cache.store(session_id, question, question_vector, chunk_ids, response, sources, generation=generation)
+
+
+def _display_name(filename, profile):
+    return profile.get("name") or filename
+
+
+def _mentioned_candidates(question, profiles):
+    """Filenames of candidates the question names (first or last name), if any"""
+    words = {w.lower() for w in re.findall(r"[A-Za-z]+", question)}
+    mentioned = []
+    for filename, profile in profiles.items():
+        name_parts = [part.lower() for part in (profile.get("name") or "").split() if len(part) >= 3]
+        if name_parts and words.intersection(name_parts):
+            mentioned.append(filename)
+    return mentioned
+
+
+def _format_field(field, value):
+    if field == "years_experience":
+        return f"{value:g} years (from listed date ranges)" if value else None
+    if not value:
+        return None
+    return ", ".join(value) if field in ("emails", "phones", "links", "skills") else "; ".join(value)
+
+
+def route_question(question: str, session_id: str, sources: List[str] = None):
+    """Answer simple lookup/filter questions from ingest-time resume profiles
+
+    Returns {"response", "sources"} or None when the question needs retrieval and the LLM.
+    `sources` restricts the answer to those files.
+    """
+    if not PROFILE_ROUTER_ENABLED or _OPEN_ENDED_RE.search(question):
+        return None
+
+    profiles = SessionManifest(session_id).profiles()
+    session_dir = get_session_dir(session_id)
+    if sources is not None:
+        profiles = {f: p for f, p in profiles.items() if os.path.join(session_dir, f) in sources}
+    if not profiles:
+        return None
+
+    def answer(lines, filenames):
+        return {
+            "response": "\n".join(lines),
+            "sources": [os.path.join(session_dir, filename) for filename in filenames]
+        }
+
+    targets = _mentioned_candidates(question, profiles) or sorted(profiles)
+    fields = [field for field, pattern in _FIELD_PATTERNS if pattern.search(question)]
+
+    # "Who knows Kubernetes?" -> candidates whose skills list it. A question naming another
+    # field ("Which candidates have a phone number?") is a lookup of that field instead
+    match = _FILTER_RE.search(question)
+    if match and fields in ([], ["skills"]):
+        term = match.group("term").strip().lower()
+        if term and term not in ("the most", "most", "experience", "skills"):
+            hits = [
+                filename for filename in sorted(profiles)
+                if any(term == skill.lower() or re.search(rf"(?<!\w){re.escape(term)}(?!\w)", skill.lower())
+                       for skill in profiles[filename].get("skills", []))
+            ]
+            # Skills extraction is heuristic, so only a positive match is trusted
+            if hits:
+                lines = [f"Candidates listing **{match.group('term').strip()}** in their skills:"]
+                lines += [f"- **{_display_name(f, profiles[f])}** ({f})" for f in hits]
+                return answer(lines, hits)
+            return None
+
+    if len(fields) == 1:
+        field = fields[0]
+        lines = []
+        for filename in targets:
+            value = _format_field(field, profiles[filename].get(field))
+            if value is None:
+                # Not found by the extractor: let retrieval look through the full text
+                return None
+            lines.append(f"- **{_display_name(filename, profiles[filename])}**: {value}")
+        return answer([f"**{_FIELD_LABELS[field]}**"] + lines, targets)
+
+    if not fields and _NAMES_RE.search(question):
+        names = [_display_name(filename, profiles[filename]) for filename in sorted(profiles)]
+        lines = [f"There are {len(names)} candidate(s) in your uploaded resumes:"]
+        lines += [f"{i}. **{name}** ({filename})" for i, (name, filename) in enumerate(zip(names, sorted(profiles)), 1)]
+        return answer(lines, sorted(profiles))
+
+    return None
+
+
+def _fan_out_candidates(question: str, session_id: str, fan_out=None, sources=None):
+    """Candidates to answer one by one, or None for a single retrieval + LLM call"""
+    if fan_out is False or (fan_out is None and FAN_OUT_MODE == "never"):
+        return None
+    candidates = session_candidates(session_id)
+    if sources is not None:
+        candidates = [candidate for candidate in candidates if set(candidate.paths) & set(sources)]
+    if fan_out is None and not should_fan_out(question, len(candidates)):
+        return None
+    return candidates or None
+
+
+def _format_context(docs: List["Document"]) -> str:
+    """Join documents the way a "stuff" chain does"""
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+def _sources(docs: List["Document"]) -> List[str]:
+    return list(dict.fromkeys(
+        doc.metadata.get("source", "Unknown")
+        for doc in docs
+        if doc.metadata.get("type") != "header"
+    ))
+
+
+class AnswerStream:
+    """Iterates over answer text as it is generated; `response` and `sources` are final once exhausted"""
+
+    def __init__(self, question: str, session_id: str, fan_out=None):
+        self.question = question
+        self.session_id = session_id
+        self.fan_out = fan_out
+        self.response = ""
+        self.sources = []
+        self.cached = False
+        self.routed = False
+        self.candidates = 0
+        self.trace = None
+        self.done = False
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            with trace("question", self.session_id) as question_trace:
+                self.trace = question_trace
+                yield from self._answer()
+        except Exception as e:
+            _log_error(e, self.session_id)
+            raise e
+        finally:
+            self.done = True
+
+    def _answer(self) -> Iterator[str]:
+        routed = route_question(self.question, self.session_id)
+        if routed:
+            count("routed")
+            self.routed = True
+            self.response, self.sources = routed["response"], routed["sources"]
+            yield self.response
+            return
+
+        generation = _cache_generation(self.session_id)
+        candidates = _fan_out_candidates(self.question, self.session_id, self.fan_out)
+        if candidates:
+            yield from self._stream_fan_out(candidates, generation)
+            return
+
+        docs, question_vector, chunk_ids = retrieve_context(self.question, self.session_id)
         if not docs:
-            return {
-                "response": "I couldn't find any relevant information in the uploaded documents.",
-                "sources": []
-            }
-        
-        # Create retriever and get LLM chain
-        retriever = SimpleRetriever(docs)
-        chain = get_llm_chain(retriever)
-        
-        # Get answer
-        result = chain.invoke({"query": question})
-        
-        # Extract sources
-        source_docs = result.get("source_documents", [])
-        sources = list(set([
-            doc.metadata.get("source", "Unknown") 
-            for doc in source_docs 
-            if doc.metadata.get("type") != "header"
-        ]))
-        
+            self.response = NO_DOCUMENTS_RESPONSE
+            yield self.response
+            return
+
+        hit = _cached_answer(self.session_id, question_vector, chunk_ids)
+        if hit:
+            self.cached = True
+            self.response, self.sources = hit["response"], hit["sources"]
+            yield self.response
+            return
+
+        self.sources = _sources(docs)
+        parts = []
+        for token in stream_answer(_format_context(docs), self.question):
+            parts.append(token)
+            yield token
+        self.response = "".join(parts)
+        _remember_answer(
+            self.question, self.session_id, question_vector, chunk_ids,
+            self.response, self.sources, generation
+        )
+
+    def _stream_fan_out(self, candidates, generation) -> Iterator[str]:
+        candidates, question_vector, chunk_ids = retrieve_candidates(self.question, self.session_id, candidates)
+        self.candidates = len(candidates)
+        if not chunk_ids:
+            self.response = NO_DOCUMENTS_RESPONSE
+            yield self.response
+            return
+
+        hit = _cached_answer(self.session_id, question_vector, chunk_ids)
+        if hit:
+            self.cached = True
+            self.response, self.sources = hit["response"], hit["sources"]
+            yield self.response
+            return
+
+        self.sources = candidate_sources(candidates)
+        parts = []
+        for section in stream_candidates(candidates, self.question):
+            parts.append(section)
+            yield section
+        self.response = "".join(parts)
+        _remember_answer(
+            self.question, self.session_id, question_vector, chunk_ids,
+            self.response, self.sources, generation
+        )
+
+
+def _log_question(question: str, session_id: str):
+    log_event(f"🔍 User query: {question} (Session: {session_id[:8]}...)",
+              event="question.received", session_id=session_id, question=question)
+
+
+def _log_error(error: Exception, session_id: str):
+    log_event(f"❌ Error processing question: {str(error)}", event="question.error",
+              level=logging.ERROR, session_id=session_id, error=repr(error))
+
+
+def stream_question(question: str, session_id: str, fan_out=None) -> AnswerStream:
+    """Answer a question token by token (session-isolated)"""
+    _log_question(question, session_id)
+    return AnswerStream(question, session_id, fan_out)
+
+
+def _ask_fan_out(question: str, session_id: str, candidates, generation):
+    candidates, question_vector, chunk_ids = retrieve_candidates(question, session_id, candidates)
+    if not chunk_ids:
+        return {
+            "response": NO_DOCUMENTS_RESPONSE,
+            "sources": []
+        }
+
+    hit = _cached_answer(session_id, question_vector, chunk_ids)
+    if hit:
         return {
-            "response": result["result"],
-            "sources": sources
+            "response": hit["response"],
+            "sources": hit["sources"],
+            "cached": True,
+            "candidates": len(candidates)
         }
-        
+
+    response = map_candidates(candidates, question)
+    sources = candidate_sources(candidates)
+    _remember_answer(question, session_id, question_vector, chunk_ids, response, sources, generation)
+    return {
+        "response": response,
+        "sources": sources,
+        "candidates": len(candidates)
+    }
+
+
+def ask_question(question: str, session_id: str, fan_out=None, sources: List[str] = None):
+    """Process a question and return answer with sources (session-isolated)
+
+    Comparison and all-candidate questions are answered per candidate and merged
+    (see FAN_OUT_MODE); pass fan_out=True/False to force either path. `sources`
+    (paths in the session folder) answers from those files only, e.g. one resume.
+    """
+    try:
+        _log_question(question, session_id)
+        with trace("question", session_id):
+            return _ask(question, session_id, fan_out, sources)
     except Exception as e:
-        print(f"❌ Error processing question: {str(e)}")
+        _log_error(e, session_id)
         raise e
+
+
+def _ask(question: str, session_id: str, fan_out=None, sources=None):
+    routed = route_question(question, session_id, sources)
+    if routed:
+        count("routed")
+        log_event("📇 Answered from resume profiles", event="question.routed", session_id=session_id)
+        routed["routed"] = True
+        return routed
+
+    generation = _cache_generation(session_id)
+    candidates = _fan_out_candidates(question, session_id, fan_out, sources)
+    if candidates:
+        return _ask_fan_out(question, session_id, candidates, generation)
+
+    docs, question_vector, chunk_ids = retrieve_context(question, session_id, sources=sources)
+
+    if not docs:
+        return {
+            "response": NO_DOCUMENTS_RESPONSE,
+            "sources": []
+        }
+
+    hit = _cached_answer(session_id, question_vector, chunk_ids)
+    if hit:
+        return {
+            "response": hit["response"],
+            "sources": hit["sources"],
+            "cached": True
+        }
+
+    response = generate_answer(_format_context(docs), question)
+    sources = _sources(docs)
+    _remember_answer(question, session_id, question_vector, chunk_ids, response, sources, generation)
+
+    return {
+        "response": response,
+        "sources": sources
+    }
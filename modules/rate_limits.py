@@ -0,0 +1,188 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dotenv import load_dotenv
+from modules.telemetry import get_metrics, log_event
+
+load_dotenv()
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "0"))
+PINECONE_REQUESTS_PER_SECOND = float(os.getenv("PINECONE_REQUESTS_PER_SECOND", "0"))
+PINECONE_MAX_IN_FLIGHT = int(os.getenv("PINECONE_MAX_IN_FLIGHT", "0"))
+RATE_LIMIT_BACKOFF_SECONDS = float(os.getenv("RATE_LIMIT_BACKOFF_SECONDS", "2"))
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = ("RateLimit", "Timeout", "Connection", "ServiceUnavailable", "InternalServer")
+
+
+class TokenBucket:
+    """Allows `rate` units per second on average with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount):
+        """Take `amount` now if possible; otherwise return how long to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # A request larger than the bucket waits for a full bucket rather than forever
+            amount = min(amount, self.capacity)
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def acquire(self, amount=1.0):
+        """Block until `amount` is available; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            delay = self._reserve(amount)
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Hand out nothing for `seconds`, e.g. after the server answered 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class CallLimit:
+    """Caps calls to one backend: requests per second, tokens per second and calls in flight
+
+    Each limit is off when its setting is 0. Every thread (and event loop) in the process
+    shares the instance, so the interactive app and a batch run in the same process stay
+    within one budget. A rate-limit error raised inside `slot()` pauses the request bucket
+    for everyone, instead of each caller discovering it separately.
+    """
+
+    def __init__(self, name, requests_per_second=0.0, tokens_per_second=0.0, max_in_flight=0):
+        self.name = name
+        self.configure(requests_per_second, tokens_per_second, max_in_flight)
+
+    def configure(self, requests_per_second=0.0, tokens_per_second=0.0, max_in_flight=0):
+        self.requests = TokenBucket(requests_per_second, requests_per_second) if requests_per_second > 0 else None
+        # A minute's worth of tokens may be spent at once, like the providers' per-minute quotas
+        self.tokens = TokenBucket(tokens_per_second, tokens_per_second * 60) if tokens_per_second > 0 else None
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight > 0 else None
+
+    def _acquire(self, tokens):
+        started = time.perf_counter()
+        if self._in_flight is not None:
+            self._in_flight.acquire()
+        try:
+            if self.requests is not None:
+                self.requests.acquire()
+            if self.tokens is not None and tokens:
+                self.tokens.acquire(tokens)
+        except BaseException:
+            self._release()
+            raise
+        waited = time.perf_counter() - started
+        if waited > 0.001:
+            get_metrics().observe(self.name, waited, operation="rate_limit_wait")
+
+    def _release(self):
+        if self._in_flight is not None:
+            self._in_flight.release()
+
+    def _failed(self, error):
+        if not is_rate_limited(error):
+            return
+        pause = retry_after(error) or RATE_LIMIT_BACKOFF_SECONDS
+        get_metrics().inc("rate_limited", backend=self.name)
+        log_event(f"🚦 {self.name} rate limit hit; pausing new calls for {pause:g}s", event="rate_limit.hit",
+                  backend=self.name, pause_seconds=pause)
+        if self.requests is not None:
+            self.requests.pause(pause)
+
+    @contextmanager
+    def slot(self, tokens=0):
+        """Hold one call's place; `tokens` is its estimated size for the tokens-per-minute budget"""
+        self._acquire(tokens)
+        try:
+            yield
+        except Exception as e:
+            self._failed(e)
+            raise
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, tokens=0):
+        """`slot()` for coroutines; waiting happens in a worker thread so the event loop keeps running"""
+        await asyncio.to_thread(self._acquire, tokens)
+        try:
+            yield
+        except Exception as e:
+            self._failed(e)
+            raise
+        finally:
+            self._release()
+
+
+_limits = {
+    "llm": CallLimit("llm", LLM_REQUESTS_PER_MINUTE / 60, LLM_TOKENS_PER_MINUTE / 60, LLM_MAX_IN_FLIGHT),
+    "pinecone": CallLimit("pinecone", PINECONE_REQUESTS_PER_SECOND, 0, PINECONE_MAX_IN_FLIGHT),
+}
+
+
+def get_call_limit(name):
+    """The process-wide limit for a backend ("llm" or "pinecone")"""
+    return _limits[name]
+
+
+def _status(error):
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limited(error):
+    return _status(error) == 429 or "RateLimit" in type(error).__name__
+
+
+def is_retryable(error):
+    """Whether a failed backend call is worth repeating: rate limits, timeouts, dropped connections, 5xx"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = _status(error)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    return any(name in type(error).__name__ for name in _RETRYABLE_NAMES)
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait (Retry-After header), if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+
+def backoff_delay(attempt, base=1.0, maximum=60.0, error=None):
+    """Delay before retry number `attempt` (1-based): Retry-After if given, else exponential with full jitter"""
+    hinted = retry_after(error) if error is not None else None
+    if hinted is not None:
+        return min(hinted, maximum)
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from dotenv import load_dotenv
+from modules.blob_store import get_blob_store
+from modules.manifest import UPLOAD_ROOT, get_session_dir, session_lock
+from modules.sessions import (
+    SESSION_TTL_HOURS, UPLOAD_DISK_QUOTA_MB, forget_activity, last_modified, list_sessions, session_info
+)
+from modules.telemetry import get_metrics, log_event
+from modules.vector_index import get_vector_index
+from modules.vectorstore import clear_session_data
+
+load_dotenv()
+
+REAPER_INTERVAL_SECONDS = float(os.getenv("REAPER_INTERVAL_SECONDS", "900"))
+REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", "20"))
+REAPER_BATCH_PAUSE_SECONDS = float(os.getenv("REAPER_BATCH_PAUSE_SECONDS", "1"))
+# Under global quota pressure, sessions idle at least this long are evicted before their TTL
+REAPER_EVICT_MIN_IDLE_MINUTES = float(os.getenv("REAPER_EVICT_MIN_IDLE_MINUTES", "30"))
+# Only safe when this host's upload folder holds every session of the vector index (one replica,
+# or a shared volume); otherwise other replicas' live sessions look like orphans
+REAPER_ORPHAN_NAMESPACES = os.getenv("REAPER_ORPHAN_NAMESPACES", "false").lower() == "true"
+REAPER_ORPHAN_MIN_AGE_MINUTES = float(os.getenv("REAPER_ORPHAN_MIN_AGE_MINUTES", "60"))
+# Processes without the app's job queue (the reaper CLI) treat sessions written to this recently as busy
+REAPER_BUSY_MINUTES = float(os.getenv("REAPER_BUSY_MINUTES", "10"))
+
+TTL = "ttl"
+GLOBAL_QUOTA = "global_quota"
+ORPHAN = "orphan_namespace"
+
+# Session namespaces are uuid4s; anything else in a shared index belongs to someone else
+_SESSION_ID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$")
+_ORPHANS_FILENAME = ".orphan_namespaces.json"
+
+
+def modified_within(seconds):
+    """A busy check for processes that cannot see the app's job queue: sessions written to in the last `seconds`"""
+    def is_busy(session_id):
+        return time.time() - last_modified(session_id) < seconds
+    return is_busy
+
+
+class SessionReaper:
+    """Deletes idle sessions' uploaded files and vector namespaces
+
+    A session is reaped once it has been idle for `ttl_seconds`. While all uploads together
+    exceed `global_quota_bytes`, the least recently active sessions idle for at least
+    `evict_min_idle_seconds` are reaped too. With `orphan_namespaces`, namespaces without an
+    upload directory (left behind by crashes or manual cleanup) are deleted as orphans once
+    they have been seen without one for `orphan_min_age_seconds`; when they were first seen
+    is kept in the upload root, so separate runs of the CLI share it. Deletions run in
+    batches with a pause in between, so a large backlog does not flood the vector index.
+    """
+
+    def __init__(self, ttl_seconds=SESSION_TTL_HOURS * 3600, global_quota_bytes=UPLOAD_DISK_QUOTA_MB * 1024 * 1024,
+                 evict_min_idle_seconds=REAPER_EVICT_MIN_IDLE_MINUTES * 60, batch_size=REAPER_BATCH_SIZE,
+                 batch_pause=REAPER_BATCH_PAUSE_SECONDS, orphan_namespaces=REAPER_ORPHAN_NAMESPACES,
+                 orphan_min_age_seconds=REAPER_ORPHAN_MIN_AGE_MINUTES * 60, is_busy=None, index=None,
+                 root=UPLOAD_ROOT):
+        self.ttl_seconds = ttl_seconds
+        self.global_quota_bytes = global_quota_bytes
+        self.evict_min_idle_seconds = evict_min_idle_seconds
+        self.batch_size = max(1, batch_size)
+        self.batch_pause = batch_pause
+        self.orphan_namespaces = orphan_namespaces
+        self.orphan_min_age_seconds = orphan_min_age_seconds
+        self.is_busy = is_busy or (lambda session_id: False)
+        self.index = index
+        self.root = root
+
+    def _index(self):
+        return self.index or get_vector_index()
+
+    @property
+    def _orphans_path(self):
+        return os.path.join(self.root, _ORPHANS_FILENAME)
+
+    def _orphans_first_seen(self):
+        try:
+            with open(self._orphans_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _orphans(self, known, now):
+        stats = self._index().describe_index_stats()
+        vectors = {
+            namespace: summary["vector_count"] for namespace, summary in stats["namespaces"].items()
+            if namespace not in known and _SESSION_ID_RE.match(namespace)
+        }
+        # A namespace only counts as an orphan after it has gone without an upload folder for a while
+        previous = self._orphans_first_seen()
+        first_seen = {namespace: previous.get(namespace, now) for namespace in vectors}
+        if first_seen != previous:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{self._orphans_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(first_seen, f)
+            os.replace(tmp_path, self._orphans_path)
+        return [
+            {"session_id": namespace, "reason": ORPHAN, "bytes": 0, "vectors": count, "idle_seconds": None}
+            for namespace, count in vectors.items()
+            if now - first_seen[namespace] >= self.orphan_min_age_seconds
+        ]
+
+    def plan(self, now=None):
+        """Sessions to reap and why, without deleting anything"""
+        now = now or time.time()
+        sessions = [s for s in list_sessions(self.root) if not self.is_busy(s["session_id"])]
+        for session in sessions:
+            session["idle_seconds"] = round(now - session["last_active"], 1)
+
+        doomed = []
+        for session in sessions:
+            if session["idle_seconds"] >= self.ttl_seconds:
+                doomed.append(dict(session, reason=TTL))
+
+        if self.global_quota_bytes > 0:
+            remaining = sum(s["bytes"] for s in sessions) - sum(s["bytes"] for s in doomed)
+            reaped = {s["session_id"] for s in doomed}
+            for session in sorted(sessions, key=lambda s: s["last_active"]):
+                if remaining <= self.global_quota_bytes:
+                    break
+                if session["session_id"] in reaped or session["idle_seconds"] < self.evict_min_idle_seconds:
+                    continue
+                doomed.append(dict(session, reason=GLOBAL_QUOTA))
+                remaining -= session["bytes"]
+
+        if self.orphan_namespaces:
+            doomed.extend(self._orphans({s["session_id"] for s in list_sessions(self.root)}, now))
+        return doomed
+
+    def _still_reapable(self, session, now):
+        if session["reason"] == ORPHAN:
+            return not os.path.isdir(get_session_dir(session["session_id"])) and not self.is_busy(session["session_id"])
+        if self.is_busy(session["session_id"]):
+            return False
+        # The user may have come back since the plan was made
+        idle = now - session_info(session["session_id"])["last_active"]
+        limit = self.ttl_seconds if session["reason"] == TTL else self.evict_min_idle_seconds
+        return idle >= limit
+
+    def _delete(self, session):
+        session_id = session["session_id"]
+        with session_lock(session_id):
+            if not self._still_reapable(session, time.time()):
+                return False
+            clear_session_data(session_id)
+            shutil.rmtree(get_session_dir(session_id), ignore_errors=True)
+            forget_activity(session_id)
+        return True
+
+    def run(self, dry_run=False):
+        """Reap what `plan` finds and return a report of what was (or would be) deleted"""
+        started = time.perf_counter()
+        doomed = self.plan()
+        report = {"dry_run": dry_run, "planned": len(doomed), "sessions": [], "skipped": 0, "errors": 0,
+                  "bytes_freed": 0, "vectors_deleted": 0}
+        if dry_run:
+            report["sessions"] = doomed
+            report["bytes_freed"] = sum(s["bytes"] for s in doomed)
+            report["vectors_deleted"] = sum(s["vectors"] for s in doomed)
+            log_event(f"🧹 Dry run: would reap {len(doomed)} session(s), freeing {report['bytes_freed']} bytes",
+                      event="reaper.dry_run", planned=len(doomed), bytes=report["bytes_freed"])
+            return report
+
+        metrics = get_metrics()
+        for start in range(0, len(doomed), self.batch_size):
+            if start:
+                time.sleep(self.batch_pause)
+            for session in doomed[start:start + self.batch_size]:
+                try:
+                    if not self._delete(session):
+                        report["skipped"] += 1
+                        continue
+                except Exception as e:
+                    report["errors"] += 1
+                    metrics.inc("sessions_reap_errors")
+                    log_event(f"❌ Failed to reap session {session['session_id'][:8]}...: {e}",
+                              event="reaper.failed", level=logging.ERROR, session_id=session["session_id"],
+                              error=repr(e))
+                    continue
+                report["sessions"].append(session)
+                report["bytes_freed"] += session["bytes"]
+                report["vectors_deleted"] += session["vectors"]
+                metrics.inc("sessions_reaped", reason=session["reason"])
+                metrics.inc("session_bytes_reaped", session["bytes"])
+                metrics.inc("session_vectors_reaped", session["vectors"])
+
+        # Uploads no remaining session links to leave the shared store too
+        report["blobs_deleted"], report["blob_bytes_freed"] = get_blob_store().collect_garbage()
+        metrics.inc("blobs_reaped", report["blobs_deleted"])
+        metrics.inc("blob_bytes_reaped", report["blob_bytes_freed"])
+
+        metrics.observe("reap", time.perf_counter() - started, operation="reaper")
+        log_event(
+            f"🧹 Reaped {len(report['sessions'])} session(s), freed {report['bytes_freed']} bytes and "
+            f"{report['vectors_deleted']} vectors ({report['blobs_deleted']} stored upload(s) no longer used)",
+            event="reaper.run", deleted=len(report["sessions"]), skipped=report["skipped"], errors=report["errors"],
+            bytes=report["bytes_freed"], vectors=report["vectors_deleted"], blobs=report["blobs_deleted"]
+        )
+        return report
+
+
+_reaper_thread = None
+_reaper_lock = threading.Lock()
+
+
+def _reap_forever(reaper, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            reaper.run()
+        except Exception as e:
+            log_event(f"❌ Session reaper pass failed: {e}", event="reaper.failed", level=logging.ERROR,
+                      error=repr(e))
+
+
+def start_reaper_in_background(interval=REAPER_INTERVAL_SECONDS) -> threading.Thread:
+    """Reap idle sessions every `interval` seconds in a daemon thread (once per process)"""
+    global _reaper_thread
+    from modules.jobs import get_job_queue
+
+    with _reaper_lock:
+        if _reaper_thread is None:
+            reaper = SessionReaper(is_busy=get_job_queue().has_active)
+            _reaper_thread = threading.Thread(
+                target=_reap_forever, args=(reaper, interval), name="session-reaper", daemon=True
+            )
+            _reaper_thread.start()
+    return _reaper_thread
@@ -0,0 +1,115 @@
+import os
+import re
+from dotenv import load_dotenv
+from modules.context_packing import estimate_tokens
+from modules.profiles import DATE_RANGE_RE, section_for_heading
+
+load_dotenv()
+
+RESUME_CHUNK_MAX_TOKENS = int(os.getenv("RESUME_CHUNK_MAX_TOKENS", "160"))
+
+_BULLET_RE = re.compile(r"^\s*(?:[-•*▪●◦‣–]|\d{1,2}[.)])\s+")
+
+
+def _is_bullet(line):
+    return bool(_BULLET_RE.match(line))
+
+
+def _entries(lines):
+    """Split one section's (line, page) pairs into entries: a role, degree or project line and its bullets
+
+    An entry ends at a blank line after bullets, or where a new dated line (such as
+    "Data Engineer, Globex, Jan 2021 - Dec 2023") follows bullets or another date.
+    Wrapped bullet lines stay with their bullet.
+    """
+    entries = []
+    current = []
+    has_bullet = has_date = False
+    for line, page in lines:
+        if not line.strip():
+            if has_bullet:
+                entries.append(current)
+                current, has_bullet, has_date = [], False, False
+            continue
+        dated = not _is_bullet(line) and DATE_RANGE_RE.search(line) is not None
+        if dated and current and (has_bullet or has_date):
+            entries.append(current)
+            current, has_bullet, has_date = [], False, False
+        current.append((line.strip(), page))
+        has_bullet = has_bullet or _is_bullet(line)
+        has_date = has_date or dated
+    if current:
+        entries.append(current)
+    return entries
+
+
+def _pieces(entry, max_tokens):
+    """An entry too long for one chunk, cut at line boundaries (and inside very long lines)"""
+    pieces = []
+    current = []
+    for line, page in entry:
+        while estimate_tokens(line) > max_tokens:
+            cut = line.rfind(" ", 0, max_tokens * 4)
+            cut = cut if cut > 0 else max_tokens * 4
+            if current:
+                pieces.append(current)
+                current = []
+            pieces.append([(line[:cut], page)])
+            line = line[cut:].strip()
+        if current and estimate_tokens("\n".join(text for text, _ in current + [(line, page)])) > max_tokens:
+            pieces.append(current)
+            current = []
+        if line:
+            current.append((line, page))
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _chunks(sections, max_tokens):
+    """Pack entries into chunks; small neighbouring sections (contact, summary, skills) may share one"""
+    chunks = []
+    current = []
+    current_sections = []
+
+    def flush():
+        if current:
+            chunks.append(("\n".join(text for text, _ in current), current[0][1], list(current_sections)))
+            current.clear()
+            current_sections.clear()
+
+    for section, lines in sections:
+        for entry in _entries(lines):
+            pieces = [entry] if estimate_tokens("\n".join(t for t, _ in entry)) <= max_tokens \
+                else _pieces(entry, max_tokens)
+            for piece in pieces:
+                if current and estimate_tokens("\n".join(t for t, _ in current + piece)) > max_tokens:
+                    flush()
+                current.extend(piece)
+                if section not in current_sections:
+                    current_sections.append(section)
+    flush()
+    return chunks
+
+
+def split_resume(pages, max_tokens=RESUME_CHUNK_MAX_TOKENS):
+    """Chunk (text, page) pages along resume structure; returns (text, page, sections) tuples
+
+    Sections start at the headings the QA prompt lists (see profiles.SECTION_HEADINGS); text
+    before the first heading is the "header" (name and contact details). Whole entries (a role
+    and its bullets, a degree, a project) are packed together up to `max_tokens`, so an entry
+    is only split when it alone exceeds the cap. `sections` lists the sections a chunk covers.
+    """
+    sections = []
+    section, lines = "header", []
+    for text, page in pages:
+        for line in text.splitlines():
+            heading = section_for_heading(line)
+            if heading:
+                if any(l.strip() for l, _ in lines):
+                    sections.append((section, lines))
+                section, lines = heading, []
+            lines.append((line, page))
+    if any(l.strip() for l, _ in lines):
+        sections.append((section, lines))
+    return _chunks(sections, max_tokens)
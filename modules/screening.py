@@ -0,0 +1,204 @@
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from modules.rate_limits import backoff_delay, is_retryable
+from modules.telemetry import get_metrics, log_event
+
+OK = "ok"
+ERROR = "error"
+
+RESULT_FIELDS = ["resume", "resume_sha256", "question_index", "question", "status", "answer", "sources",
+                 "routed", "cached", "attempts", "seconds", "error", "finished_at"]
+
+
+class ScreeningTask:
+    """One question asked about one resume (or about the whole namespace when `resume` is None)"""
+
+    def __init__(self, question_index, question, resume=None, paths=None, sha256=None):
+        self.question_index = question_index
+        self.question = question
+        self.resume = resume
+        self.paths = paths
+        self.sha256 = sha256
+
+    @property
+    def key(self):
+        # Keyed by contents rather than file name, so a changed resume is screened again
+        return (self.sha256 or "", self.question)
+
+
+def load_questions(path):
+    """Questions from a text file, one per line; blank lines and lines starting with # are skipped"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _row_key(row):
+    return (row.get("resume_sha256") or "", row.get("question") or "")
+
+
+class ResultWriter:
+    """Appends one row per finished task to a JSONL or CSV file, flushed as each row is written
+
+    Rows already in the file count as done when their status is "ok", so an interrupted run
+    picks up where it stopped; failed tasks are tried again and their new row appended.
+    Readers should keep the last row per (resume_sha256, question).
+    """
+
+    def __init__(self, path, restart=False):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self._lock = threading.Lock()
+        self.completed = set() if restart else {_row_key(row) for row in self._read() if row.get("status") == OK}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not restart and os.path.exists(path) and os.path.getsize(path):
+            self._file = open(path, "a", encoding="utf-8", newline="")
+            self._terminate_partial_line()
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="")
+            if self.format == "csv":
+                csv.writer(self._file).writerow(RESULT_FIELDS)
+        self._csv = csv.DictWriter(self._file, RESULT_FIELDS) if self.format == "csv" else None
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            if self.format == "csv":
+                return list(csv.DictReader(f))
+            rows = []
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # A line cut short when the previous run was killed
+                    continue
+            return rows
+
+    def _terminate_partial_line(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                self._file.write("\n")
+
+    def write(self, row):
+        with self._lock:
+            if self._csv is not None:
+                self._csv.writerow({
+                    field: ";".join(value) if isinstance(value, list) else value
+                    for field, value in row.items()
+                })
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._file.flush()
+            if row["status"] == OK:
+                self.completed.add(_row_key(row))
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class BatchScheduler:
+    """Runs tasks on a bounded thread pool, retrying failures that are worth retrying
+
+    Concurrency here only bounds the tasks in progress; the calls each task makes to the
+    LLM and Pinecone are further capped and rate limited by modules.rate_limits, which is
+    what keeps a large batch inside the providers' quotas. Retryable errors (rate limits,
+    timeouts, 5xx) are retried with exponential backoff and jitter, honouring Retry-After.
+    """
+
+    def __init__(self, concurrency=8, max_attempts=4, backoff_base=1.0, backoff_max=60.0):
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stopping = threading.Event()
+
+    def stop(self):
+        """Start no further tasks or retries; tasks already running finish"""
+        self._stopping.set()
+
+    def _attempt(self, task, fn):
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return OK, fn(task), None, attempt, time.perf_counter() - started
+            except Exception as e:
+                if attempt >= self.max_attempts or not is_retryable(e) or self._stopping.is_set():
+                    return ERROR, None, e, attempt, time.perf_counter() - started
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, e)
+                get_metrics().inc("screening_retries")
+                log_event(f"🔁 Retrying '{task.question}' for {task.resume or 'all resumes'} in {delay:.1f}s "
+                          f"(attempt {attempt} failed: {e!r})", event="screening.retry",
+                          resume=task.resume, attempt=attempt, delay_seconds=round(delay, 2), error=repr(e))
+                # Wakes early on stop() so an interrupted run exits promptly
+                self._stopping.wait(delay)
+
+    def run(self, tasks, fn, on_result):
+        """Call fn(task) for every task; on_result(task, status, result, error, attempts, seconds) as each finishes
+
+        Tasks are submitted a few at a time rather than all at once, so a stop() leaves
+        nothing queued. On Ctrl-C the tasks already running are finished and reported
+        before KeyboardInterrupt is re-raised. Returns the number of tasks that finished.
+        """
+        tasks = iter(tasks)
+        finished = 0
+        interrupted = False
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="screening") as executor:
+            pending = {}
+
+            def refill():
+                while len(pending) < self.concurrency * 2 and not self._stopping.is_set():
+                    task = next(tasks, None)
+                    if task is None:
+                        return
+                    pending[executor.submit(self._attempt, task, fn)] = task
+
+            refill()
+            while pending:
+                try:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    interrupted = True
+                    self.stop()
+                    for future in [f for f in pending if f.cancel()]:
+                        del pending[future]
+                    continue
+                for future in done:
+                    task = pending.pop(future)
+                    status, result, error, attempts, seconds = future.result()
+                    get_metrics().inc("screening_tasks", status=status)
+                    on_result(task, status, result, error, attempts, seconds)
+                    finished += 1
+                refill()
+        if interrupted:
+            raise KeyboardInterrupt
+        return finished
+
+
+def result_row(task, status, result, error, attempts, seconds):
+    """The output row for one finished task"""
+    result = result or {}
+    return {
+        "resume": task.resume,
+        "resume_sha256": task.sha256,
+        "question_index": task.question_index,
+        "question": task.question,
+        "status": status,
+        "answer": result.get("response"),
+        "sources": [os.path.basename(source) for source in result.get("sources", [])],
+        "routed": bool(result.get("routed")),
+        "cached": bool(result.get("cached")),
+        "attempts": attempts,
+        "seconds": round(seconds, 3),
+        "error": repr(error) if error is not None else None,
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
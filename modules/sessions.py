@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from modules.manifest import UPLOAD_ROOT, SessionManifest, get_session_dir
+
+load_dotenv()
+
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "24"))
+SESSION_DISK_QUOTA_MB = float(os.getenv("SESSION_DISK_QUOTA_MB", "50"))
+UPLOAD_DISK_QUOTA_MB = float(os.getenv("UPLOAD_DISK_QUOTA_MB", "5000"))
+SESSION_ACTIVITY_WRITE_SECONDS = float(os.getenv("SESSION_ACTIVITY_WRITE_SECONDS", "60"))
+SESSION_FILENAME = ".session.json"
+
+_last_written = {}
+_last_written_lock = threading.Lock()
+
+
+class QuotaExceededError(Exception):
+    """Raised when an upload would take a session (or all sessions together) over its disk quota"""
+
+
+def _session_path(session_id):
+    return os.path.join(get_session_dir(session_id), SESSION_FILENAME)
+
+
+def record_activity(session_id, force=False):
+    """Note that the session is in use; the reaper deletes sessions idle for longer than the TTL
+
+    Only sessions with uploads have a directory (and data to reap), so visitors who never
+    upload are not registered. Writes are throttled to one per SESSION_ACTIVITY_WRITE_SECONDS.
+    """
+    directory = get_session_dir(session_id)
+    now = time.time()
+    with _last_written_lock:
+        if not force and now - _last_written.get(session_id, 0) < SESSION_ACTIVITY_WRITE_SECONDS:
+            return
+        if not os.path.isdir(directory):
+            return
+        _last_written[session_id] = now
+    record = read_activity(session_id) or {"created": now}
+    record["last_active"] = now
+    tmp_path = f"{_session_path(session_id)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(tmp_path, _session_path(session_id))
+
+
+def read_activity(session_id):
+    try:
+        with open(_session_path(session_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def forget_activity(session_id):
+    with _last_written_lock:
+        _last_written.pop(session_id, None)
+
+
+def directory_bytes(path):
+    """Total size of the regular files under `path`, counting hard-linked uploads once"""
+    total = 0
+    seen = set()
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                stat = os.stat(os.path.join(root, filename))
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+    return total
+
+
+def last_modified(session_id):
+    """Newest modification time of anything in the session's upload folder (0 if it has none)"""
+    newest = 0
+    for root, dirnames, filenames in os.walk(get_session_dir(session_id)):
+        for name in dirnames + filenames:
+            try:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime)
+            except OSError:
+                continue
+    return newest
+
+
+def session_info(session_id):
+    """Last activity, disk usage and vector count of one session"""
+    directory = get_session_dir(session_id)
+    record = read_activity(session_id) or {}
+    # Sessions from before the registry fall back to their directory's modification time
+    last_active = record.get("last_active")
+    if last_active is None:
+        try:
+            last_active = os.path.getmtime(directory)
+        except OSError:
+            last_active = 0
+    return {
+        "session_id": session_id,
+        "last_active": last_active,
+        "bytes": directory_bytes(directory),
+        "vectors": sum(entry["chunks"] for entry in SessionManifest(session_id).files.values()),
+    }
+
+
+def list_sessions(root=UPLOAD_ROOT):
+    """Every session that has an upload directory"""
+    if not os.path.isdir(root):
+        return []
+    # Dot folders (the shared upload store) are not sessions
+    return [
+        session_info(name) for name in sorted(os.listdir(root))
+        if not name.startswith(".") and os.path.isdir(os.path.join(root, name))
+    ]
+
+
+def check_upload_quota(session_id, files, root=UPLOAD_ROOT):
+    """Raise QuotaExceededError if saving `files` ((filename, size) pairs) would exceed a quota"""
+    directory = get_session_dir(session_id)
+    # Re-uploading a file replaces it, so its current size is freed
+    replaced = sum(
+        os.path.getsize(os.path.join(directory, filename))
+        for filename, _ in files
+        if os.path.isfile(os.path.join(directory, filename))
+    )
+    incoming = sum(size for _, size in files) - replaced
+    mb = 1024 * 1024
+
+    if SESSION_DISK_QUOTA_MB > 0:
+        used = directory_bytes(directory)
+        if used + incoming > SESSION_DISK_QUOTA_MB * mb:
+            raise QuotaExceededError(
+                f"Your session is limited to {SESSION_DISK_QUOTA_MB:g} MB of documents "
+                f"({used / mb:.1f} MB used); remove some files first"
+            )
+    if UPLOAD_DISK_QUOTA_MB > 0:
+        used = directory_bytes(root)
+        if used + incoming > UPLOAD_DISK_QUOTA_MB * mb:
+            raise QuotaExceededError("Document storage is full right now; try again later")
@@ -0,0 +1,317 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TELEMETRY_LOG_FORMAT = os.getenv("TELEMETRY_LOG_FORMAT", "text").lower()
+TELEMETRY_LOG_LEVEL = os.getenv("TELEMETRY_LOG_LEVEL", "INFO").upper()
+TELEMETRY_PROMETHEUS_PATH = os.getenv("TELEMETRY_PROMETHEUS_PATH", "")
+TELEMETRY_EXPORT_INTERVAL_SECONDS = float(os.getenv("TELEMETRY_EXPORT_INTERVAL_SECONDS", "10"))
+TELEMETRY_DEBUG_PANEL = os.getenv("TELEMETRY_DEBUG_PANEL", "false").lower() == "true"
+
+METRIC_PREFIX = "resume_bot"
+# Histogram buckets for stage durations, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TRACES_KEPT_PER_SESSION = 5
+
+logger = logging.getLogger("resume_bot")
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": getattr(record, "event", None) or "log",
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _configure_logging():
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    if TELEMETRY_LOG_FORMAT == "json":
+        handler.setFormatter(_JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(TELEMETRY_LOG_LEVEL)
+    # Streamlit configures the root logger; keep our lines from being printed twice
+    logger.propagate = False
+
+
+_configure_logging()
+
+
+def log_event(message, event=None, level=logging.INFO, **fields):
+    """Log a human readable message; with TELEMETRY_LOG_FORMAT=json it is one JSON object per line"""
+    logger.log(level, message, extra={"event": event, "fields": fields})
+
+
+class Metrics:
+    """Process-wide counters and stage duration histograms, exported in Prometheus text format
+
+    Session IDs are kept out of the labels (they would make every session a new time series);
+    per-session numbers live in the traces instead.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage, seconds, operation):
+        key = (stage, operation)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def render_prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_labels(dict(labels))} {value:g}")
+
+        metric = f"{METRIC_PREFIX}_stage_seconds"
+        if histograms:
+            lines.append(f"# HELP {metric} Time spent per stage of uploads and questions")
+            lines.append(f"# TYPE {metric} histogram")
+        for (stage, operation), histogram in histograms:
+            labels = {"operation": operation, "stage": stage}
+            for bound, count in zip(self.buckets, histogram["buckets"]):
+                lines.append(f"{metric}_bucket{_labels(dict(labels, le=f'{bound:g}'))} {count}")
+            lines.append(f"{metric}_bucket{_labels(dict(labels, le='+Inf'))} {histogram['count']}")
+            lines.append(f"{metric}_sum{_labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Trace:
+    """Timing spans and counters for one upload or question of a session"""
+
+    def __init__(self, operation, session_id, **attributes):
+        self.operation = operation
+        self.session_id = session_id
+        self.attributes = attributes
+        self.started = time.perf_counter()
+        self.timestamp = time.time()
+        self.spans = []
+        self.counters = {}
+        self.error = None
+        self.wall_ms = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - started, started)
+
+    def add_span(self, name, seconds, started=None):
+        """Record a stage duration; stages measured elsewhere (e.g. in worker processes) pass just the total"""
+        offset = (started - self.started) * 1000 if started is not None else None
+        with self._lock:
+            self.spans.append({"name": name, "ms": round(seconds * 1000, 2),
+                               "start_ms": round(offset, 2) if offset is not None else None})
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, **attributes):
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def stages(self):
+        """Total milliseconds and call count per stage, in first-seen order"""
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = totals.setdefault(span["name"], {"ms": 0.0, "calls": 0})
+            stage["ms"] = round(stage["ms"] + span["ms"], 2)
+            stage["calls"] += 1
+        return totals
+
+    def summary(self):
+        with self._lock:
+            counters = dict(self.counters)
+            attributes = dict(self.attributes)
+        return {
+            "operation": self.operation,
+            "session_id": self.session_id,
+            "timestamp": round(self.timestamp, 3),
+            "wall_ms": self.wall_ms,
+            "stages": self.stages(),
+            "counters": counters,
+            "attributes": attributes,
+            "error": self.error,
+        }
+
+    def finish(self, error=None):
+        self.wall_ms = round((time.perf_counter() - self.started) * 1000, 2)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        _record(self)
+
+
+_current = contextvars.ContextVar("resume_bot_trace", default=None)
+_metrics = Metrics()
+_recent = {}
+_recent_lock = threading.Lock()
+_last_export = 0.0
+
+
+def get_metrics():
+    return _metrics
+
+
+def current_trace():
+    """The trace of the upload or question running in this context, if any"""
+    return _current.get()
+
+
+@contextmanager
+def trace(operation, session_id, **attributes):
+    """Trace one upload or question; spans and counts recorded inside attach to it"""
+    active = Trace(operation, session_id, **attributes)
+    token = _current.set(active)
+    error = None
+    try:
+        yield active
+    except BaseException as e:
+        if not isinstance(e, GeneratorExit):
+            error = e
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Reset from another context (a generator closed elsewhere); nothing to restore
+            pass
+        active.finish(error)
+
+
+@contextmanager
+def span(name):
+    """Time a stage of the current trace (no-op outside a trace)"""
+    active = current_trace()
+    if active is None:
+        yield
+        return
+    with active.span(name):
+        yield
+
+
+def count(name, value=1):
+    """Add to a counter of the current trace (no-op outside a trace)"""
+    active = current_trace()
+    if active is not None and value:
+        active.count(name, value)
+
+
+def _record(finished):
+    summary = finished.summary()
+    with _recent_lock:
+        traces = _recent.setdefault((finished.session_id, finished.operation), [])
+        traces.append(summary)
+        del traces[:-TRACES_KEPT_PER_SESSION]
+
+    _metrics.inc("operations", operation=finished.operation)
+    if finished.error:
+        _metrics.inc("errors", operation=finished.operation)
+    for name, stage in summary["stages"].items():
+        _metrics.observe(name, stage["ms"] / 1000, finished.operation)
+    for name, value in summary["counters"].items():
+        _metrics.inc(name, value)
+
+    stages = ", ".join(f"{name} {stage['ms']:.0f}ms" for name, stage in summary["stages"].items())
+    log_event(
+        f"⏱️ {finished.operation} took {summary['wall_ms']:.0f}ms ({stages or 'no stages'})",
+        event=f"{finished.operation}.trace",
+        level=logging.WARNING if finished.error else logging.INFO,
+        **summary
+    )
+    _maybe_export()
+
+
+def last_trace(session_id, operation="question"):
+    """Summary of the session's most recent finished trace of this kind"""
+    with _recent_lock:
+        traces = _recent.get((session_id, operation))
+        return dict(traces[-1]) if traces else None
+
+
+def forget_session(session_id):
+    with _recent_lock:
+        for key in [key for key in _recent if key[0] == session_id]:
+            del _recent[key]
+
+
+def write_prometheus(path=TELEMETRY_PROMETHEUS_PATH):
+    """Write the metrics file atomically (e.g. for node_exporter's textfile collector)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(_metrics.render_prometheus())
+    os.replace(tmp_path, path)
+
+
+def _maybe_export():
+    global _last_export
+    if not TELEMETRY_PROMETHEUS_PATH:
+        return
+    now = time.monotonic()
+    with _recent_lock:
+        if now - _last_export < TELEMETRY_EXPORT_INTERVAL_SECONDS:
+            return
+        _last_export = now
+    try:
+        write_prometheus(TELEMETRY_PROMETHEUS_PATH)
+    except OSError as e:
+        log_event(f"⚠️ Could not write metrics to {TELEMETRY_PROMETHEUS_PATH}: {e}",
+                  event="metrics.export_failed", level=logging.WARNING)
@@ -0,0 +1,448 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from modules.rate_limits import get_call_limit
+
+load_dotenv()
+
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "./vector_index")
+EMBEDDING_DIMENSION = 384  # all-MiniLM-L6-v2 dimension
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+UPSERT_PARALLELISM = int(os.getenv("UPSERT_PARALLELISM", "4"))
+
+
+class VectorIndex:
+    """Operations the app needs from a vector store, mirroring the Pinecone Index API"""
+
+    def __init__(self, upsert_parallelism=UPSERT_PARALLELISM):
+        self.upsert_parallelism = max(1, upsert_parallelism)
+        self._in_flight = threading.BoundedSemaphore(self.upsert_parallelism * 2)
+        self._latencies_ms = deque(maxlen=1000)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def upsert(self, vectors, namespace=None):
+        raise NotImplementedError
+
+    def query(self, vector, top_k, namespace=None, filter=None, include_metadata=True, include_values=False):
+        """Return {"matches": [{"id", "score", "metadata", "values"}]} best match first"""
+        raise NotImplementedError
+
+    def delete(self, ids=None, delete_all=False, namespace=None, filter=None):
+        raise NotImplementedError
+
+    def update_metadata(self, ids, metadata, namespace=None):
+        """Set these metadata fields on existing vectors, leaving their values and other fields"""
+        raise NotImplementedError
+
+    def describe_index_stats(self):
+        raise NotImplementedError
+
+    def _upsert_pool(self):
+        """Executor shared by every upload to this index; caps upsert requests in flight"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.upsert_parallelism, thread_name_prefix="vector-upsert"
+                    )
+        return self._executor
+
+    def _timed_upsert(self, vectors, namespace):
+        started = time.perf_counter()
+        try:
+            self.upsert(vectors=vectors, namespace=namespace)
+        finally:
+            self._in_flight.release()
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._latencies_ms.append(latency_ms)
+        return latency_ms
+
+    def submit_upsert(self, vectors, namespace=None):
+        """Queue one batch for upsert; blocks while too many batches are already in flight"""
+        executor = self._upsert_pool()
+        self._in_flight.acquire()
+        try:
+            return executor.submit(self._timed_upsert, vectors, namespace)
+        except Exception:
+            self._in_flight.release()
+            raise
+
+    def upsert_batches(self, vectors, namespace=None, batch_size=UPSERT_BATCH_SIZE):
+        """Upsert vectors in concurrent batches and report per-batch latency"""
+        futures = [
+            self.submit_upsert(vectors[i:i + batch_size], namespace)
+            for i in range(0, len(vectors), batch_size)
+        ]
+        latencies = [future.result() for future in futures]
+        return {
+            "vectors": len(vectors),
+            "batches": len(latencies),
+            "batch_latency_ms": [round(latency, 1) for latency in latencies]
+        }
+
+    def upsert_stats(self):
+        """Latency summary over the most recent upsert batches"""
+        latencies = sorted(self._latencies_ms)
+        if not latencies:
+            return {"batches": 0}
+        return {
+            "batches": len(latencies),
+            "p50_ms": round(latencies[len(latencies) // 2], 1),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+            "max_ms": round(latencies[-1], 1)
+        }
+
+
+class PineconeVectorIndex(VectorIndex):
+    """Pinecone serverless index"""
+
+    def __init__(self, index_name=None):
+        super().__init__()
+        self.index_name = index_name or os.getenv("PINECONE_INDEX_NAME", "babybot-medical-index")
+        pc = get_pinecone_client()
+
+        # Create index if it doesn't exist (checked once per process via the registry)
+        existing_indexes = [index['name'] for index in pc.list_indexes()]
+
+        if self.index_name not in existing_indexes:
+            from pinecone import ServerlessSpec
+
+            pc.create_index(
+                name=self.index_name,
+                dimension=EMBEDDING_DIMENSION,
+                metric="dotproduct",
+                spec=ServerlessSpec(
+                    cloud="aws",
+                    region=os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
+                )
+            )
+
+        # The index handle keeps its HTTP connection pool for the life of the process
+        self._index = pc.Index(self.index_name, pool_threads=max(1, UPSERT_PARALLELISM))
+
+    # Every request goes through the process-wide Pinecone limit (PINECONE_* settings)
+    def upsert(self, vectors, namespace=None):
+        with get_call_limit("pinecone").slot():
+            return self._index.upsert(vectors=vectors, namespace=namespace, show_progress=False)
+
+    def query(self, vector, top_k, namespace=None, filter=None, include_metadata=True, include_values=False):
+        with get_call_limit("pinecone").slot():
+            return self._index.query(
+                vector=vector,
+                top_k=top_k,
+                namespace=namespace,
+                filter=filter,
+                include_metadata=include_metadata,
+                include_values=include_values
+            )
+
+    def delete(self, ids=None, delete_all=False, namespace=None, filter=None):
+        with get_call_limit("pinecone").slot():
+            if delete_all:
+                return self._index.delete(delete_all=True, namespace=namespace)
+            return self._index.delete(ids=ids, namespace=namespace, filter=filter)
+
+    def update_metadata(self, ids, metadata, namespace=None):
+        # Pinecone updates one vector per request
+        for vector_id in ids:
+            with get_call_limit("pinecone").slot():
+                self._index.update(id=vector_id, set_metadata=metadata, namespace=namespace)
+
+    def describe_index_stats(self):
+        return self._index.describe_index_stats()
+
+
+def _matches_filter(metadata, filter):
+    """Evaluate the subset of Pinecone metadata filters the app uses ($eq, $ne, $in, $nin)"""
+    for field, condition in filter.items():
+        if field == "$and":
+            if not all(_matches_filter(metadata, part) for part in condition):
+                return False
+            continue
+        value = metadata.get(field)
+        # Like Pinecone, a list field matches when any of its elements does
+        values = value if isinstance(value, list) else [value]
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            if op == "$eq" and expected not in values:
+                return False
+            if op == "$ne" and expected in values:
+                return False
+            if op == "$in" and not any(v in expected for v in values):
+                return False
+            if op == "$nin" and any(v in expected for v in values):
+                return False
+    return True
+
+
+class _LocalNamespace:
+    """Vectors of one namespace: a float32 matrix plus parallel ID and metadata lists"""
+
+    def __init__(self, directory, dimension):
+        import numpy as np
+
+        self.directory = directory
+        self.dimension = dimension
+        self.ids = []
+        self.metadata = []
+        self.rows = {}
+        self.matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._load()
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.directory, "vectors.f32")
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.directory, "meta.json")
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dimension = meta["dimension"]
+        self.ids = meta["ids"]
+        self.metadata = meta["metadata"]
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self._map_matrix()
+
+    def _map_matrix(self):
+        import numpy as np
+
+        if self.ids:
+            # Searches read straight from the page cache; writes replace the mapping
+            self.matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r",
+                shape=(len(self.ids), self.dimension)
+            )
+        else:
+            self.matrix = np.zeros((0, self.dimension), dtype=np.float32)
+
+    def _save_meta(self):
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dimension": self.dimension, "ids": self.ids, "metadata": self.metadata}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _save_all(self):
+        import numpy as np
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._vectors_path + ".tmp"
+        np.ascontiguousarray(self.matrix, dtype=np.float32).tofile(tmp_path)
+        os.replace(tmp_path, self._vectors_path)
+        self._save_meta()
+        self._map_matrix()
+
+    def upsert(self, vectors):
+        import numpy as np
+
+        if not self.ids and vectors:
+            # An empty namespace takes the dimension of whatever is stored first
+            self.dimension = len(vectors[0]["values"])
+        values = np.asarray([v["values"] for v in vectors], dtype=np.float32).reshape(-1, self.dimension)
+        appended = {}
+        rewrite = False
+        for v, row_values in zip(vectors, values):
+            row = self.rows.get(v["id"])
+            if row is None:
+                appended[v["id"]] = (v, row_values)
+            else:
+                if not rewrite:
+                    self.matrix = np.array(self.matrix)
+                    rewrite = True
+                self.matrix[row] = row_values
+                self.metadata[row] = v.get("metadata", {})
+
+        os.makedirs(self.directory, exist_ok=True)
+        if appended:
+            new_rows = np.stack([row_values for _, row_values in appended.values()])
+            for vector_id, (v, _) in appended.items():
+                self.rows[vector_id] = len(self.ids)
+                self.ids.append(vector_id)
+                self.metadata.append(v.get("metadata", {}))
+            if rewrite:
+                self.matrix = np.vstack([self.matrix, new_rows])
+            else:
+                # New IDs only: append rows to the file instead of rewriting it
+                with open(self._vectors_path, "ab") as f:
+                    f.write(np.ascontiguousarray(new_rows, dtype=np.float32).tobytes())
+                self._save_meta()
+                self._map_matrix()
+                return len(vectors)
+        if rewrite:
+            self._save_all()
+        return len(vectors)
+
+    def delete(self, ids=None, filter=None):
+        import numpy as np
+
+        doomed = set()
+        if ids:
+            doomed.update(self.rows[vector_id] for vector_id in ids if vector_id in self.rows)
+        if filter:
+            doomed.update(row for row, meta in enumerate(self.metadata) if _matches_filter(meta, filter))
+        if not doomed:
+            return
+        keep = [row for row in range(len(self.ids)) if row not in doomed]
+        self.matrix = np.array(self.matrix[keep]) if keep else np.zeros((0, self.dimension), dtype=np.float32)
+        self.ids = [self.ids[row] for row in keep]
+        self.metadata = [self.metadata[row] for row in keep]
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self._save_all()
+
+    def update_metadata(self, ids, metadata):
+        rows = [self.rows[vector_id] for vector_id in ids if vector_id in self.rows]
+        if not rows:
+            return
+        for row in rows:
+            self.metadata[row] = dict(self.metadata[row], **metadata)
+        self._save_meta()
+
+    def query(self, vector, top_k, filter=None, include_metadata=True, include_values=False):
+        import numpy as np
+
+        if not self.ids:
+            return []
+        query_vector = np.asarray(vector, dtype=np.float32)
+        scores = self.matrix @ query_vector
+        if filter:
+            allowed = np.fromiter(
+                (_matches_filter(meta, filter) for meta in self.metadata), dtype=bool, count=len(self.ids)
+            )
+            scores = np.where(allowed, scores, -np.inf)
+            top_k = min(top_k, int(allowed.sum()))
+        top_k = min(top_k, len(self.ids))
+        if top_k <= 0:
+            return []
+        if top_k < len(self.ids):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(self.ids))
+        best = candidates[np.argsort(-scores[candidates])]
+
+        matches = []
+        for row in best:
+            match = {"id": self.ids[row], "score": float(scores[row])}
+            if include_metadata:
+                match["metadata"] = self.metadata[row]
+            if include_values:
+                match["values"] = self.matrix[row].tolist()
+            matches.append(match)
+        return matches
+
+
+class LocalVectorIndex(VectorIndex):
+    """In-process index: one NumPy matrix per namespace, dot-product search, memory-mapped on disk"""
+
+    def __init__(self, directory=LOCAL_INDEX_DIR, dimension=EMBEDDING_DIMENSION):
+        super().__init__()
+        self.directory = directory
+        self.dimension = dimension
+        self._namespaces = {}
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _namespace_dir(self, namespace):
+        namespace = namespace or "__default__"
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", namespace) or namespace in (".", ".."):
+            namespace = hashlib.sha256(namespace.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, namespace)
+
+    def _namespace(self, namespace):
+        key = namespace or ""
+        if key not in self._namespaces:
+            self._namespaces[key] = _LocalNamespace(self._namespace_dir(namespace), self.dimension)
+        return self._namespaces[key]
+
+    def upsert(self, vectors, namespace=None):
+        with self._lock:
+            return {"upserted_count": self._namespace(namespace).upsert(vectors)}
+
+    def query(self, vector, top_k, namespace=None, filter=None, include_metadata=True, include_values=False):
+        with self._lock:
+            matches = self._namespace(namespace).query(
+                vector, top_k, filter=filter,
+                include_metadata=include_metadata, include_values=include_values
+            )
+        return {"matches": matches, "namespace": namespace or ""}
+
+    def delete(self, ids=None, delete_all=False, namespace=None, filter=None):
+        with self._lock:
+            if delete_all:
+                self._namespaces.pop(namespace or "", None)
+                shutil.rmtree(self._namespace_dir(namespace), ignore_errors=True)
+            else:
+                self._namespace(namespace).delete(ids=ids, filter=filter)
+        return {}
+
+    def update_metadata(self, ids, metadata, namespace=None):
+        with self._lock:
+            self._namespace(namespace).update_metadata(ids, metadata)
+
+    def describe_index_stats(self):
+        with self._lock:
+            namespaces = {}
+            for name in os.listdir(self.directory):
+                if os.path.isdir(os.path.join(self.directory, name)):
+                    namespace = "" if name == "__default__" else name
+                    namespaces[namespace] = {"vector_count": len(self._namespace(namespace).ids)}
+        return {
+            "dimension": self.dimension,
+            "namespaces": namespaces,
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values())
+        }
+
+
+_clients = {}
+_indexes = {}
+_index_lock = threading.RLock()
+
+
+def get_pinecone_client():
+    """Return the process-wide Pinecone client for the configured API key"""
+    api_key = os.getenv("PINECONE_API_KEY")
+    with _index_lock:
+        if api_key not in _clients:
+            from pinecone import Pinecone
+
+            _clients[api_key] = Pinecone(api_key=api_key, pool_threads=max(1, UPSERT_PARALLELISM))
+        return _clients[api_key]
+
+
+def get_vector_index(backend=None, name=None):
+    """Return the shared index for a backend (VECTOR_BACKEND=pinecone|local), creating it once"""
+    backend = (backend or VECTOR_BACKEND).lower()
+    key = (backend, name)
+    index = _indexes.get(key)
+    if index is None:
+        with _index_lock:
+            index = _indexes.get(key)
+            if index is None:
+                if backend == "local":
+                    index = LocalVectorIndex(name or LOCAL_INDEX_DIR)
+                elif backend == "pinecone":
+                    index = PineconeVectorIndex(name)
+                else:
+                    raise ValueError(f"Unknown VECTOR_BACKEND: {backend}")
+                _indexes[key] = index
+    return index
+
+
+def register_vector_index(index, backend=None, name=None):
+    """Install a ready-made index (e.g. a fake in tests or benchmarks) for get_vector_index()"""
+    with _index_lock:
+        _indexes[((backend or VECTOR_BACKEND).lower(), name)] = index
+    return index
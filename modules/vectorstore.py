@@ -1,112 +1,200 @@
 import os
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from pinecone import Pinecone, ServerlessSpec
-import streamlit as st
+from modules.answer_cache import forget_session_answers, invalidate_session_answers
+from modules.bm25_index import BM25_INDEX_ENABLED, forget_bm25_index, get_bm25_index
+from modules.chunk_store import CHUNK_STORE_ENABLED, forget_chunk_store, get_chunk_store
+from modules.embeddings import get_embedding_service
+from modules.ingest_pipeline import IngestPipeline
+from modules.manifest import SessionManifest, chunk_id, file_sha256, session_lock, source_id
+from modules.parse_cache import get_parse_cache
+from modules.sessions import record_activity
+from modules.telemetry import forget_session, log_event, trace
+from modules.vector_index import get_vector_index
 
 load_dotenv()
 
 def get_embeddings():
-    """Initialize HuggingFace embeddings"""
-    return HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
-        model_kwargs={'device': 'cpu'},
-        encode_kwargs={'normalize_embeddings': True}
-    )
-
-def get_pinecone_index():
-    """Initialize and return Pinecone index"""
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    index_name = os.getenv("PINECONE_INDEX_NAME", "babybot-medical-index")
-    
-    # Create index if it doesn't exist
-    existing_indexes = [index['name'] for index in pc.list_indexes()]
-    
-    if index_name not in existing_indexes:
-        pc.create_index(
-            name=index_name,
-            dimension=384,  # all-MiniLM-L6-v2 dimension
-            metric="dotproduct",
-            spec=ServerlessSpec(
-                cloud="aws",
-                region=os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
-            )
-        )
-    
-    return pc.Index(index_name)
+    """Return the process-wide embedding service"""
+    return get_embedding_service()
 
 def get_session_id():
     """Get or create a unique session ID for this user"""
+    import streamlit as st
+
     if 'session_id' not in st.session_state:
         import uuid
         st.session_state.session_id = str(uuid.uuid4())
+    record_activity(st.session_state.session_id)
     return st.session_state.session_id
 
 def clear_session_data(session_id):
-    """Delete all vectors for this session from Pinecone"""
-    index = get_pinecone_index()
-    # Delete all vectors in this namespace (session)
-    index.delete(delete_all=True, namespace=session_id)
-    print(f"🗑️ Cleared all data for session: {session_id}")
-
-def upload_pdfs_to_vectorstore(file_paths, session_id):
-    """Process PDFs and upload to Pinecone with session isolation"""
+    """Delete all vectors for this session from the vector index"""
+    index = get_vector_index()
+    with session_lock(session_id):
+        # Delete all vectors in this namespace (session)
+        index.delete(delete_all=True, namespace=session_id)
+        forget_chunk_store(session_id)
+        forget_bm25_index(session_id)
+        SessionManifest(session_id).clear()
+        forget_session_answers(session_id)
+        forget_session(session_id)
+    log_event(f"🗑️ Cleared all data for session: {session_id}", event="session.cleared", session_id=session_id)
+
+def _delete_vectors(index, ids, session_id, batch_size=1000):
+    """Delete vectors by ID in batches"""
+    for i in range(0, len(ids), batch_size):
+        index.delete(ids=ids[i:i + batch_size], namespace=session_id)
+    get_chunk_store(session_id).delete(ids)
+    get_bm25_index(session_id).delete(ids)
+
+def _retag_vectors(index, ids, filename, session_id):
+    """Point shared vectors at another file with the same contents"""
+    metadata = {"source": source_id(filename)}
+    index.update_metadata(ids, metadata, namespace=session_id)
+    get_bm25_index(session_id).update_metadata(ids, metadata)
+
+def _forget_file(index, manifest, filename, session_id):
+    """Drop a file from the manifest and delete vectors no other file shares
+
+    Identical files share the vectors of the first of them indexed, which carry its name
+    as their source. When that file goes and a copy stays, the vectors move to the copy.
+    """
+    ids = manifest.vector_ids(filename)
+    entry = manifest.get(filename)
+    held = entry is not None and manifest.find_by_hash(entry["sha256"]) == filename
+    manifest.remove(filename)
+    if entry and ids:
+        survivor = manifest.find_by_hash(entry["sha256"])
+        if survivor is None:
+            _delete_vectors(index, ids, session_id)
+        elif held:
+            _retag_vectors(index, ids, survivor, session_id)
+    return len(ids)
+
+def delete_document(file_path, session_id):
+    """Remove a single file's vectors from this session"""
+    index = get_vector_index()
+    filename = os.path.basename(file_path)
+    with session_lock(session_id):
+        manifest = SessionManifest(session_id)
+        removed = _forget_file(index, manifest, filename, session_id)
+        manifest.save()
+        invalidate_session_answers(session_id)
+    log_event(f"🗑️ Removed {filename} ({removed} chunks) from session: {session_id[:8]}...",
+              event="document.removed", session_id=session_id, filename=filename, chunks=removed)
+    return removed
+
+def _build_record(job, ordinal, text, page, sections=None):
+    """Vector ID, text and metadata for one chunk of an uploaded file
+
+    The pipeline moves the text out of the metadata into the chunk store when one is in use.
+    """
+    metadata = {
+        "source": source_id(job["path"]),
+        "text": text,
+        "page": page,
+        "chunk": ordinal
+    }
+    if sections:
+        # Resume sections the chunk covers, e.g. ["experience"]; filter with {"section": {"$in": [...]}}
+        metadata["section"] = sections
+    return {
+        "id": chunk_id(job["sha256"], ordinal),
+        "text": text,
+        "metadata": metadata
+    }
+
+def upload_pdfs_to_vectorstore(file_paths, session_id, on_progress=None):
+    """Index new or changed PDFs into the vector index with session isolation"""
+    with trace("upload", session_id, files=len(file_paths)) as upload_trace:
+        result = _upload_pdfs(file_paths, session_id, on_progress)
+        stats = result["stats"]
+        # Worker time summed over the parse processes and upsert threads, not wall time
+        for stage in ("pdf_load", "split", "embed", "upsert"):
+            if stats["stage_seconds"][stage]:
+                upload_trace.add_span(stage, stats["stage_seconds"][stage])
+        upload_trace.count("files_indexed", result["files_count"])
+        upload_trace.count("files_skipped", len(result["skipped_files"]))
+        upload_trace.count("files_parse_cached", stats["files_parse_cached"])
+        upload_trace.count("pages", stats["pages"])
+        upload_trace.count("chunks", stats["chunks_parsed"])
+        upload_trace.count("vectors_upserted", stats["vectors_upserted"])
+    return result
+
+def _upload_pdfs(file_paths, session_id, on_progress=None):
     embed_model = get_embeddings()
-    index = get_pinecone_index()
-    
-    # First, clear any existing data for this session
-    clear_session_data(session_id)
-    
-    all_texts = []
-    all_metadatas = []
-    
-    for file_path in file_paths:
-        # Load PDF
-        loader = PyPDFLoader(file_path)
-        docs = loader.load()
-        
-        # Split into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50
-        )
-        chunks = text_splitter.split_documents(docs)
-        
-        # Prepare texts and metadata
-        for chunk in chunks:
-            all_texts.append(chunk.page_content)
-            all_metadatas.append({
-                "source": file_path,
-                "text": chunk.page_content,
-                "page": chunk.metadata.get("page", 0)
-            })
-        
-        print(f"📄 Processed {os.path.basename(file_path)}: {len(chunks)} chunks")
-    
-    # Generate embeddings
-    print(f"🔢 Generating embeddings for {len(all_texts)} chunks...")
-    embeddings = embed_model.embed_documents(all_texts)
-    
-    # Prepare vectors for Pinecone
-    vectors = []
-    for i, (embedding, metadata) in enumerate(zip(embeddings, all_metadatas)):
-        vectors.append({
-            "id": f"doc_{i}_{hash(metadata['source'])}",
-            "values": embedding,
-            "metadata": metadata
-        })
-    
-    # Upload to Pinecone in batches with session namespace
-    batch_size = 100
-    for i in range(0, len(vectors), batch_size):
-        batch = vectors[i:i + batch_size]
-        index.upsert(vectors=batch, namespace=session_id)
-    
-    print(f"✅ Successfully uploaded {len(file_paths)} file(s) with {len(all_texts)} total chunks to Pinecone (Session: {session_id[:8]}...)")
-    
+    index = get_vector_index()
+
+    with session_lock(session_id):
+        manifest = SessionManifest(session_id)
+
+        jobs = []
+        batch_hashes = {}
+        duplicates = []
+        replaced = []
+        skipped = []
+
+        for file_path in file_paths:
+            filename = os.path.basename(file_path)
+            content_hash = file_sha256(file_path)
+            entry = manifest.get(filename)
+
+            if entry and entry["sha256"] == content_hash:
+                skipped.append(filename)
+                log_event(f"⏭️ Skipping unchanged {filename}", event="upload.skipped",
+                          session_id=session_id, filename=filename)
+                continue
+
+            if entry:
+                # Same name, new contents: drop the old version's vectors first
+                _forget_file(index, manifest, filename, session_id)
+                replaced.append(filename)
+
+            duplicate = manifest.find_by_hash(content_hash)
+            if duplicate:
+                # Identical bytes already indexed under another name share its vectors
+                original = manifest.get(duplicate)
+                manifest.add(filename, content_hash, original["chunks"], original.get("profile"))
+                skipped.append(filename)
+                log_event(f"⏭️ {filename} has the same contents as {duplicate}", event="upload.duplicate",
+                          session_id=session_id, filename=filename, duplicate_of=duplicate)
+                continue
+            if content_hash in batch_hashes:
+                duplicates.append((filename, batch_hashes[content_hash]))
+                skipped.append(filename)
+                continue
+
+            batch_hashes[content_hash] = {"key": filename, "path": file_path, "sha256": content_hash}
+            jobs.append(batch_hashes[content_hash])
+
+        # Parse, embed and upsert concurrently
+        pipeline = IngestPipeline(index, session_id, embed_model, _build_record, parse_cache=get_parse_cache(),
+                                  chunk_store=get_chunk_store(session_id) if CHUNK_STORE_ENABLED else None,
+                                  sparse_index=get_bm25_index(session_id) if BM25_INDEX_ENABLED else None)
+        try:
+            stats = pipeline.run(jobs, on_progress=on_progress)
+        finally:
+            # Record files only once all of their vectors are stored
+            for job in pipeline.completed_files:
+                manifest.add(job["key"], job["sha256"], job["chunks"], job.get("profile"))
+                log_event(f"📄 Indexed {job['key']}: {job['chunks']} chunks", event="upload.file_indexed",
+                          session_id=session_id, filename=job["key"], chunks=job["chunks"])
+            for filename, job in duplicates:
+                if job in pipeline.completed_files:
+                    manifest.add(filename, job["sha256"], job["chunks"], job.get("profile"))
+            manifest.save()
+            if jobs or replaced:
+                invalidate_session_answers(session_id)
+
+    log_event(
+        f"✅ Indexed {len(jobs)} new file(s) with {stats['chunks_parsed']} total chunks, skipped {len(skipped)} in {stats['wall_seconds']}s (Session: {session_id[:8]}...)",
+        event="upload.finished", session_id=session_id, files=len(jobs), chunks=stats["chunks_parsed"],
+        skipped=len(skipped), wall_seconds=stats["wall_seconds"]
+    )
+
     return {
-        "files_count": len(file_paths),
-        "total_chunks": len(all_texts)
+        "files_count": len(jobs),
+        "total_chunks": stats["chunks_parsed"],
+        "skipped_files": skipped,
+        "stats": stats
     }
@@ -0,0 +1,62 @@
+"""Delete idle sessions' uploaded files and vector namespaces
+
+    python scripts/reap_sessions.py --dry-run
+    python scripts/reap_sessions.py --ttl-hours 12 --global-quota-mb 2000
+
+Uses the same settings as the app's background reaper (SESSION_TTL_HOURS, UPLOAD_DISK_QUOTA_MB,
+REAPER_*); flags override them. Run it from cron with REAPER_INTERVAL_SECONDS=0 on the app.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.reaper import (  # noqa: E402
+    REAPER_BATCH_PAUSE_SECONDS, REAPER_BATCH_SIZE, REAPER_BUSY_MINUTES, REAPER_EVICT_MIN_IDLE_MINUTES,
+    REAPER_ORPHAN_MIN_AGE_MINUTES, REAPER_ORPHAN_NAMESPACES, SessionReaper, modified_within
+)
+from modules.sessions import SESSION_TTL_HOURS, UPLOAD_DISK_QUOTA_MB  # noqa: E402
+
+parser = argparse.ArgumentParser(description="Reap idle sessions")
+parser.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+parser.add_argument("--ttl-hours", type=float, default=SESSION_TTL_HOURS)
+parser.add_argument("--global-quota-mb", type=float, default=UPLOAD_DISK_QUOTA_MB, help="0 disables")
+parser.add_argument("--evict-min-idle-minutes", type=float, default=REAPER_EVICT_MIN_IDLE_MINUTES)
+parser.add_argument("--batch-size", type=int, default=REAPER_BATCH_SIZE)
+parser.add_argument("--batch-pause", type=float, default=REAPER_BATCH_PAUSE_SECONDS)
+parser.add_argument("--orphans", action="store_true", default=REAPER_ORPHAN_NAMESPACES,
+                    help="also delete namespaces without an upload directory (single host or shared uploads only)")
+parser.add_argument("--orphan-min-age-minutes", type=float, default=REAPER_ORPHAN_MIN_AGE_MINUTES,
+                    help="how long a namespace must be seen without an upload directory first")
+parser.add_argument("--busy-minutes", type=float, default=REAPER_BUSY_MINUTES,
+                    help="skip sessions with files written this recently (an upload may be running in the app)")
+parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+args = parser.parse_args()
+
+reaper = SessionReaper(
+    ttl_seconds=args.ttl_hours * 3600,
+    global_quota_bytes=args.global_quota_mb * 1024 * 1024,
+    evict_min_idle_seconds=args.evict_min_idle_minutes * 60,
+    batch_size=args.batch_size,
+    batch_pause=args.batch_pause,
+    orphan_namespaces=args.orphans,
+    orphan_min_age_seconds=args.orphan_min_age_minutes * 60,
+    # The app's job queue is in another process; recent writes are the sign of an upload in progress
+    is_busy=modified_within(args.busy_minutes * 60),
+)
+report = reaper.run(dry_run=args.dry_run)
+
+if args.json:
+    print(json.dumps(report, indent=2))
+else:
+    verb = "Would delete" if args.dry_run else "Deleted"
+    for session in report["sessions"]:
+        idle = f"{session['idle_seconds'] / 3600:.1f}h idle" if session["idle_seconds"] is not None else "no uploads"
+        print(f"{verb} {session['session_id']} ({session['reason']}, {idle}, "
+              f"{session['bytes'] / (1024 * 1024):.1f} MB, {session['vectors']} vectors)")
+    print(f"{verb} {len(report['sessions'])} session(s): {report['bytes_freed'] / (1024 * 1024):.1f} MB, "
+          f"{report['vectors_deleted']} vectors; {report['skipped']} skipped, {report['errors']} errors")
+
+sys.exit(1 if report["errors"] else 0)
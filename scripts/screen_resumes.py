@@ -0,0 +1,145 @@
+"""Screen a folder of resumes against a list of questions without the UI
+
+    python scripts/screen_resumes.py ./resumes questions.txt --output results.jsonl
+    python scripts/screen_resumes.py ./resumes questions.txt --output results.csv --scope namespace
+
+Indexes every PDF in the folder into one namespace (unchanged files are skipped, as in the app),
+then asks each question about each resume (--scope resume, the default) or once about all of them
+(--scope namespace). Rows are appended to the output as answers arrive; running the same command
+again skips the rows already answered, so an interrupted run resumes where it stopped.
+
+LLM and Pinecone calls are rate limited and capped process-wide (LLM_*/PINECONE_* settings, or the
+flags below); failed calls that are worth retrying are retried with exponential backoff.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.rate_limits import (  # noqa: E402
+    LLM_MAX_IN_FLIGHT, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, PINECONE_MAX_IN_FLIGHT,
+    PINECONE_REQUESTS_PER_SECOND, get_call_limit
+)
+
+parser = argparse.ArgumentParser(description="Screen resumes against a list of questions")
+parser.add_argument("resumes", help="folder of PDF resumes")
+parser.add_argument("questions", help="text file with one question per line (# starts a comment)")
+parser.add_argument("--namespace", help="vector namespace to index into (default: screen-<folder name>)")
+parser.add_argument("--output", default="screening.jsonl", help="results file; .csv writes CSV, anything else JSONL")
+parser.add_argument("--scope", choices=["resume", "namespace"], default="resume",
+                    help="ask every question about each resume, or once across all resumes")
+parser.add_argument("--restart", action="store_true", help="overwrite the output instead of resuming it")
+parser.add_argument("--skip-ingest", action="store_true", help="use the namespace as already indexed")
+parser.add_argument("--concurrency", type=int, default=8, help="questions in progress at once")
+parser.add_argument("--max-attempts", type=int, default=4, help="tries per question for retryable errors")
+parser.add_argument("--backoff-base", type=float, default=1.0, help="seconds before the first retry (doubles)")
+parser.add_argument("--backoff-max", type=float, default=60.0)
+parser.add_argument("--llm-rpm", type=float, default=LLM_REQUESTS_PER_MINUTE or 30,
+                    help="LLM requests per minute (0 = unlimited)")
+parser.add_argument("--llm-tpm", type=float, default=LLM_TOKENS_PER_MINUTE,
+                    help="LLM prompt tokens per minute (0 = unlimited)")
+parser.add_argument("--llm-in-flight", type=int, default=LLM_MAX_IN_FLIGHT or 4, help="0 = unlimited")
+parser.add_argument("--pinecone-rps", type=float, default=PINECONE_REQUESTS_PER_SECOND or 20,
+                    help="Pinecone requests per second (0 = unlimited)")
+parser.add_argument("--pinecone-in-flight", type=int, default=PINECONE_MAX_IN_FLIGHT or 8, help="0 = unlimited")
+args = parser.parse_args()
+
+# Before the app modules start making calls
+get_call_limit("llm").configure(args.llm_rpm / 60, args.llm_tpm / 60, args.llm_in_flight)
+get_call_limit("pinecone").configure(args.pinecone_rps, 0, args.pinecone_in_flight)
+
+from modules.blob_store import get_blob_store  # noqa: E402
+from modules.fan_out import session_candidates  # noqa: E402
+from modules.manifest import file_sha256, get_session_dir  # noqa: E402
+from modules.query_handler import ask_question  # noqa: E402
+from modules.screening import BatchScheduler, ResultWriter, ScreeningTask, load_questions, result_row  # noqa: E402
+from modules.sessions import record_activity  # noqa: E402
+from modules.vectorstore import upload_pdfs_to_vectorstore  # noqa: E402
+
+namespace = args.namespace or "screen-" + re.sub(r"[^A-Za-z0-9_-]+", "-", os.path.basename(
+    os.path.abspath(args.resumes))).strip("-")
+questions = load_questions(args.questions)
+if not questions:
+    sys.exit(f"No questions in {args.questions}")
+
+if not args.skip_ingest:
+    pdfs = sorted(
+        os.path.join(args.resumes, filename) for filename in os.listdir(args.resumes)
+        if filename.lower().endswith(".pdf") and os.path.isfile(os.path.join(args.resumes, filename))
+    )
+    if not pdfs:
+        sys.exit(f"No PDFs in {args.resumes}")
+    # Copy into the namespace's upload folder like the app does, so sources and fan-out resolve
+    session_dir = get_session_dir(namespace)
+    os.makedirs(session_dir, exist_ok=True)
+    store = get_blob_store()
+    paths = []
+    for pdf in pdfs:
+        dest = os.path.join(session_dir, os.path.basename(pdf))
+        if not os.path.exists(dest) or file_sha256(dest) != file_sha256(pdf):
+            with open(pdf, "rb") as f:
+                store.save(f, dest)
+        paths.append(dest)
+
+    def progress(update):
+        print(f"\rIndexing: parsed {update['files_parsed']}/{update['files_total']} files, "
+              f"stored {update['vectors_upserted']} vectors", end="", flush=True)
+
+    started = time.perf_counter()
+    result = upload_pdfs_to_vectorstore(paths, namespace, on_progress=progress)
+    print(f"\rIndexed {result['files_count']} file(s) into '{namespace}' ({result['total_chunks']} chunks, "
+          f"{len(result['skipped_files'])} unchanged) in {time.perf_counter() - started:.1f}s")
+record_activity(namespace, force=True)
+
+writer = ResultWriter(args.output, restart=args.restart)
+if args.scope == "resume":
+    # Identical files are one candidate and are screened once
+    candidates = session_candidates(namespace)
+    if not args.skip_ingest:
+        candidates = [candidate for candidate in candidates if set(candidate.paths) & set(paths)]
+    tasks = [
+        ScreeningTask(i, question, resume=", ".join(candidate.filenames), paths=candidate.paths,
+                      sha256=file_sha256(candidate.paths[0]))
+        for candidate in candidates for i, question in enumerate(questions)
+    ]
+else:
+    tasks = [ScreeningTask(i, question) for i, question in enumerate(questions)]
+todo = [task for task in tasks if task.key not in writer.completed]
+print(f"{len(tasks)} question(s) to answer, {len(tasks) - len(todo)} already in {args.output}")
+
+
+def answer(task):
+    return ask_question(task.question, namespace, fan_out=False if task.paths else None, sources=task.paths)
+
+
+totals = {"ok": 0, "error": 0}
+started = time.perf_counter()
+
+
+def on_result(task, status, result, error, attempts, seconds):
+    writer.write(result_row(task, status, result, error, attempts, seconds))
+    totals[status] += 1
+    done = totals["ok"] + totals["error"]
+    where = f" [{task.resume}]" if task.resume else ""
+    detail = f" ({error!r})" if error is not None else ""
+    print(f"[{done}/{len(todo)}] {status}{where} {task.question} ({seconds:.1f}s, {attempts} attempt(s)){detail}",
+          flush=True)
+
+
+scheduler = BatchScheduler(args.concurrency, args.max_attempts, args.backoff_base, args.backoff_max)
+try:
+    scheduler.run(todo, answer, on_result)
+except KeyboardInterrupt:
+    print(f"Interrupted; run the same command again to continue ({totals['ok']} answered this run)")
+    sys.exit(130)
+finally:
+    writer.close()
+    record_activity(namespace, force=True)
+
+elapsed = time.perf_counter() - started
+print(f"Answered {totals['ok']}, failed {totals['error']} in {elapsed:.1f}s "
+      f"({totals['ok'] / elapsed if elapsed else 0:.2f} answers/s); results in {args.output}")
+sys.exit(1 if totals["error"] else 0)
@@ -0,0 +1,12 @@
+"""Every test runs against the offline backends: local vector index, fake embeddings and fake LLM"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import configure_offline  # noqa: E402
+
+# Before any modules.* import, since they read their settings at import time
+configure_offline(tempfile.mkdtemp(prefix="tests-"), PARSE_CACHE_PATH="")
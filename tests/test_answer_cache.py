@@ -0,0 +1,29 @@
+from modules.answer_cache import AnswerCache
+
+VECTOR = [1.0, 0.0]
+
+
+def _store(cache, session_id, generation):
+    cache.store(session_id, "Who knows Go?", VECTOR, ["c1"], "Ada", ["a.pdf"], generation=generation)
+    return cache.lookup(session_id, VECTOR, ["c1"])
+
+
+def test_forget_drops_in_flight_answers_of_that_session_only():
+    cache = AnswerCache(threshold=0.9)
+    forgotten = cache.generation("gone")
+    kept = cache.generation("kept")
+
+    cache.forget("gone")
+
+    assert _store(cache, "gone", forgotten) is None
+    assert _store(cache, "kept", kept)["response"] == "Ada"
+
+
+def test_forgotten_session_caches_again_with_a_fresh_generation():
+    cache = AnswerCache(threshold=0.9)
+    _store(cache, "s", cache.generation("s"))
+
+    cache.forget("s")
+
+    assert cache.lookup("s", VECTOR, ["c1"]) is None
+    assert _store(cache, "s", cache.generation("s"))["response"] == "Ada"
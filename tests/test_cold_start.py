@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.cold_start import HEAVY_PACKAGES, ROOT
+
+# Generous for shared CI runners; the benchmark measures about half a second locally
+BUDGET_SECONDS = 10
+
+# Records what is imported when app.py asks for the background preload, then renders once
+_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import modules.preload
+loaded = {}
+def preload_in_background():
+    loaded.update(dict.fromkeys(sorted(sys.modules)))
+modules.preload.preload_in_background = preload_in_background
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60)
+app.run()
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "preload_called": bool(loaded),
+    "modules": list(loaded),
+    "exceptions": [str(e.value) for e in app.exception],
+}))
+"""
+
+
+def test_app_renders_before_heavy_imports():
+    pytest.importorskip("streamlit.testing.v1")
+    env = dict(os.environ, STARTUP_PRELOAD="true", EMBEDDING_WARMUP="false", REAPER_INTERVAL_SECONDS="0")
+    completed = subprocess.run([sys.executable, "-c", _SCRIPT], cwd=ROOT, env=env, capture_output=True,
+                               text=True, timeout=BUDGET_SECONDS * 3)
+    assert completed.returncode == 0, completed.stderr
+    run = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert not run["exceptions"]
+    assert run["preload_called"]
+    heavy = set(HEAVY_PACKAGES) | {"numpy"}
+    imported = sorted(name for name in run["modules"]
+                      if name.split(".")[0] in heavy or name.startswith("langchain"))
+    assert not imported, f"imported before preload: {imported[:10]}"
+    assert run["seconds"] < BUDGET_SECONDS
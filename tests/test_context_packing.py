@@ -0,0 +1,42 @@
+from modules.context_packing import pack_context
+
+
+def _match(vector_id, source, page, chunk, text, score):
+    return {"id": vector_id, "score": score,
+            "metadata": {"source": source, "page": page, "chunk": chunk, "text": text}}
+
+
+def test_pack_context_embeds_only_sources_mmr_orders():
+    embedded = []
+
+    def embed_many(texts):
+        embedded.extend(texts)
+        return [[1.0, 0.0] if "Go" in text else [0.0, 1.0] for text in texts]
+
+    matches = [
+        _match("a0", "a.pdf", 0, 0, "Ada wrote Go services.", 0.9),
+        _match("a1", "a.pdf", 1, 4, "Ada also wrote Go services.", 0.8),
+        _match("a2", "a.pdf", 1, 9, "Ada ran a chess club.", 0.7),
+        _match("b0", "b.pdf", 0, 0, "Bob wrote Go services.", 0.6),
+        _match("b1", "b.pdf", 0, 1, "Bob ran a chess club.", 0.5),
+    ]
+
+    packed = dict(pack_context(matches, [1.0, 0.0], embed_many=embed_many))
+
+    # b.pdf merges into one segment, so only a.pdf's chunks needed vectors
+    assert sorted(embedded) == sorted(match["metadata"]["text"] for match in matches[:3])
+    # The second Go chunk duplicates the first and is dropped
+    assert [segment.ids for segment in packed["a.pdf"]] == [["a0"], ["a2"]]
+    assert [segment.ids for segment in packed["b.pdf"]] == [["b0", "b1"]]
+
+
+def test_pack_context_keeps_vectors_it_was_given():
+    def embed_many(texts):
+        raise AssertionError(f"embedded {texts}")
+
+    matches = [dict(_match("a0", "a.pdf", 0, 0, "Go", 0.9), values=[1.0, 0.0]),
+               dict(_match("a1", "a.pdf", 1, 0, "Chess", 0.8), values=[0.0, 1.0])]
+
+    packed = pack_context(matches, [1.0, 0.0], embed_many=embed_many)
+
+    assert [segment.ids for _, segments in packed for segment in segments] == [["a0"], ["a1"]]
@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+
+from benchmarks.synthetic_resumes import generate_resumes
+
+
+def _scored_vector(match):
+    from pinecone.core.openapi.data.models import ScoredVector
+
+    return ScoredVector(id=match["id"], score=match["score"], values=match.get("values") or [],
+                        metadata=match.get("metadata"))
+
+
+def test_fuse_accepts_pinecone_matches():
+    pytest.importorskip("pinecone")
+    from modules.query_handler import _fuse
+
+    dense = [_scored_vector({"id": "a", "score": 0.9, "values": [1.0, 0.0], "metadata": {"source": "a.pdf"}}),
+             _scored_vector({"id": "b", "score": 0.8, "values": [0.0, 1.0], "metadata": {"source": "b.pdf"}})]
+    sparse = [{"id": "c", "score": 7.0, "metadata": {"source": "c.pdf"}},
+              {"id": "a", "score": 3.0, "metadata": {"source": "a.pdf"}}]
+
+    fused = _fuse(dense, sparse, top_k=3, rrf_k=60)
+
+    assert [match["id"] for match in fused] == ["a", "c", "b"]
+    assert all(type(match) is dict for match in fused)
+    assert fused[0]["values"] == [1.0, 0.0] and fused[0]["metadata"] == {"source": "a.pdf"}
+    assert fused[1]["values"] is None
+    assert fused[0]["score"] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_fuse_keeps_local_matches_untouched():
+    from modules.query_handler import _fuse
+
+    metadata = {"source": "a.pdf"}
+    dense = [{"id": "a", "score": 0.9, "values": [1.0], "metadata": metadata}]
+
+    fused = _fuse(dense, [], top_k=5, rrf_k=60)
+
+    fused[0]["metadata"]["text"] = "filled in later"
+    assert metadata == {"source": "a.pdf"}
+    assert dense[0]["score"] == 0.9
+
+
+def test_hybrid_retrieval_with_pinecone_shaped_index():
+    pytest.importorskip("pinecone")
+    from modules import query_handler
+    from modules.manifest import get_session_dir
+    from modules.vector_index import LOCAL_INDEX_DIR, LocalVectorIndex, get_vector_index, register_vector_index
+    from modules.vectorstore import upload_pdfs_to_vectorstore
+
+    class PineconeShapedIndex(LocalVectorIndex):
+        """Local index answering queries with ScoredVector models, as pinecone-client does"""
+
+        def query(self, *args, **kwargs):
+            res = super().query(*args, **kwargs)
+            return {"matches": [_scored_vector(match) for match in res["matches"]]}
+
+    session_id = str(uuid.uuid4())
+    paths = generate_resumes(get_session_dir(session_id), 2, 1, 0)
+    original = get_vector_index()
+    register_vector_index(PineconeShapedIndex(LOCAL_INDEX_DIR))
+    try:
+        upload_pdfs_to_vectorstore(paths, session_id)
+        docs, _, chunk_ids = query_handler.retrieve_context("Who knows CI/CD and Kubernetes?", session_id)
+    finally:
+        register_vector_index(original)
+
+    assert chunk_ids
+    assert any(doc.page_content.strip() for doc in docs)
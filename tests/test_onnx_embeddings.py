@@ -0,0 +1,54 @@
+import pytest
+
+TEXTS = [
+    "Senior backend engineer with 8 years of Python, Go and PostgreSQL.",
+    "Built CI/CD pipelines on GitHub Actions and deployed services to Kubernetes.",
+    "AWS Certified Solutions Architect (SAA-C03).",
+    "B.Sc. Computer Science, University of Toronto, 2016",
+    "Skills: C++, C#, Node.js, scikit-learn, TCP/IP",
+    "Led a team of five; cut p95 latency from 900 ms to 120 ms.",
+    "",
+    " ".join(["distributed systems"] * 300),  # past the 256-token truncation
+]
+
+
+@pytest.fixture(scope="module")
+def onnx_directory(tmp_path_factory):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    pytest.importorskip("sentence_transformers")
+    from huggingface_hub import try_to_load_from_cache
+    from modules.embeddings import EMBEDDING_MODEL_NAME
+    from modules.onnx_embeddings import export_onnx
+
+    if not isinstance(try_to_load_from_cache(EMBEDDING_MODEL_NAME, "config.json"), str):
+        pytest.skip(f"{EMBEDDING_MODEL_NAME} is not in the Hugging Face cache")
+    # Writes both the fp32 and the int8 model
+    return export_onnx(EMBEDDING_MODEL_NAME, str(tmp_path_factory.mktemp("onnx")), quantize="int8")
+
+
+@pytest.fixture(scope="module")
+def reference(onnx_directory):
+    import numpy as np
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from modules.embeddings import EMBEDDING_MODEL_NAME
+
+    model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME, model_kwargs={'device': 'cpu'},
+                                  encode_kwargs={'normalize_embeddings': True})
+    return np.asarray(model.embed_documents(TEXTS), dtype=np.float32)
+
+
+@pytest.mark.parametrize("quantize, min_cosine", [("none", 0.9999), ("int8", 0.98)])
+def test_onnx_matches_torch(onnx_directory, reference, quantize, min_cosine):
+    import numpy as np
+    from modules.embeddings import EMBEDDING_MODEL_NAME
+    from modules.onnx_embeddings import OnnxEmbeddings
+
+    model = OnnxEmbeddings(EMBEDDING_MODEL_NAME, onnx_directory, quantize=quantize, batch_size=3)
+    vectors = np.asarray(model.embed_documents(TEXTS), dtype=np.float32)
+
+    assert vectors.shape == reference.shape
+    norms = np.linalg.norm(vectors, axis=1)
+    assert np.abs(norms - 1).max() < 1e-4
+    cosine = (vectors * reference).sum(axis=1) / norms
+    assert cosine.min() >= min_cosine, dict(zip(TEXTS, cosine.round(5)))
@@ -0,0 +1,7 @@
+from modules.profiles import _split_skills
+
+
+def test_split_skills_keeps_slashed_names_whole():
+    lines = ["Tools: CI/CD, TCP/IP; PL/SQL | Git", "Python / Go - Rust"]
+
+    assert _split_skills(lines) == ["CI/CD", "TCP/IP", "PL/SQL", "Git", "Python", "Go", "Rust"]
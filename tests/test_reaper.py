@@ -0,0 +1,16 @@
+import os
+import uuid
+
+from modules.manifest import get_session_dir
+from modules.reaper import SessionReaper
+
+
+def test_plan_only_sees_sessions_under_its_root(tmp_path):
+    os.makedirs(get_session_dir(str(uuid.uuid4())))
+    mine = str(uuid.uuid4())
+    (tmp_path / mine).mkdir()
+    (tmp_path / ".blobs").mkdir()
+
+    planned = SessionReaper(ttl_seconds=0, global_quota_bytes=0, root=str(tmp_path)).plan()
+
+    assert [session["session_id"] for session in planned] == [mine]
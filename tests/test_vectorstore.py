@@ -0,0 +1,55 @@
+import os
+import shutil
+import uuid
+
+from benchmarks.synthetic_resumes import generate_resumes
+
+
+def _sources(docs):
+    return {os.path.basename(doc.metadata.get("source", "")) for doc in docs}
+
+
+def test_duplicate_keeps_its_vectors_after_the_original_is_deleted():
+    from modules import query_handler
+    from modules.manifest import SessionManifest, get_session_dir
+    from modules.vectorstore import delete_document, upload_pdfs_to_vectorstore
+
+    session_id = str(uuid.uuid4())
+    original = generate_resumes(get_session_dir(session_id), 1, 1, 0)[0]
+    duplicate = os.path.join(os.path.dirname(original), "copy-" + os.path.basename(original))
+    shutil.copyfile(original, duplicate)
+    upload_pdfs_to_vectorstore([original], session_id)
+    upload_pdfs_to_vectorstore([duplicate], session_id)
+
+    delete_document(original, session_id)
+    os.remove(original)
+
+    assert list(SessionManifest(session_id).files) == [os.path.basename(duplicate)]
+    for mode in ("dense", "hybrid"):
+        query_handler.RETRIEVAL_MODE, previous = mode, query_handler.RETRIEVAL_MODE
+        try:
+            docs, _, chunk_ids = query_handler.retrieve_context("What are the skills?", session_id,
+                                                                sources=[duplicate])
+        finally:
+            query_handler.RETRIEVAL_MODE = previous
+        assert chunk_ids, mode
+        assert _sources(docs) == {os.path.basename(duplicate)}, mode
+        assert all(doc.page_content.strip() for doc in docs), mode
+
+
+def test_deleting_the_duplicate_keeps_the_original():
+    from modules import query_handler
+    from modules.manifest import get_session_dir
+    from modules.vectorstore import delete_document, upload_pdfs_to_vectorstore
+
+    session_id = str(uuid.uuid4())
+    original = generate_resumes(get_session_dir(session_id), 1, 1, 0)[0]
+    duplicate = os.path.join(os.path.dirname(original), "copy-" + os.path.basename(original))
+    shutil.copyfile(original, duplicate)
+    upload_pdfs_to_vectorstore([original, duplicate], session_id)
+
+    delete_document(duplicate, session_id)
+
+    docs, _, chunk_ids = query_handler.retrieve_context("What are the skills?", session_id, sources=[original])
+    assert chunk_ids
+    assert _sources(docs) == {os.path.basename(original)}